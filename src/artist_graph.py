@@ -0,0 +1,241 @@
+import os
+import time
+import sqlite3
+import threading
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+
+class ArtistGraphStore:
+    """
+    Persistent, SQLite-backed graph of related artists. Each node is an
+    artist uri, with the time its related artists were fetched; each edge
+    points from an artist to one of its (up to 20) related artists, in the
+    order Spotify ranked them. Recommendations are computed from the stored
+    graph, so only artists that were never fetched (or are stale) need an
+    artist_related_artists request.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "output/cache/artist_graph.sqlite",
+        max_age: float = 3 * 7 * 24 * 60 * 60
+    ) -> None:
+        """
+        Initializes the ArtistGraphStore instance.
+
+        Parameters:
+            db_path (str): Path of the SQLite database file.
+            max_age (float): Seconds before a node's related artists are
+                considered stale and fetched again. None to never refetch.
+        """
+
+        self.max_age = max_age
+        self.lock = threading.Lock()
+
+        # Create directory for the database if it DNE yet
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS artists (
+                uri TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                popularity INTEGER,
+                fetched_at REAL -- NULL if related artists never fetched
+            );
+            CREATE TABLE IF NOT EXISTS edges (
+                src TEXT NOT NULL,
+                dst TEXT NOT NULL,
+                rank INTEGER NOT NULL,
+                PRIMARY KEY (src, dst)
+            );
+            """
+        )
+        self.conn.commit()
+
+
+    def missing(self, artist_uris: List[str]) -> List[str]:
+        """
+        Returns the artist uris whose related artists were never fetched or
+        are stale, in input order (without duplicates).
+
+        Parameters:
+            artist_uris (List[str]): Artist uris (IDs).
+
+        Returns:
+            List[str]: Uris that need an artist_related_artists request.
+        """
+
+        min_fetched_at = (
+            time.time() - self.max_age if self.max_age is not None else 0
+        )
+        fresh = set()
+        with self.lock:
+            for i in range(0, len(artist_uris), 500):
+                chunk = artist_uris[i : i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self.conn.execute(
+                    f"SELECT uri FROM artists WHERE uri IN ({placeholders}) "
+                    f"AND fetched_at >= ?",
+                    [*chunk, min_fetched_at]
+                ).fetchall()
+                fresh.update(uri for (uri,) in rows)
+
+        return [
+            uri for uri in dict.fromkeys(artist_uris) if uri not in fresh
+        ]
+
+
+    def add_related(self, related_by_uri: Dict[str, Dict]) -> None:
+        """
+        Stores (or replaces) the related artists of many artists.
+
+        Parameters:
+            related_by_uri (Dict[str, Dict]): Artist uri (ID) ->
+                artist_related_artists API response. None responses (failed
+                requests) are skipped.
+        """
+
+        now = time.time()
+        with self.lock:
+            for src, related in related_by_uri.items():
+                if related is None:
+                    continue
+
+                # Related artists become nodes (not fetched yet themselves)
+                self.conn.executemany(
+                    "INSERT INTO artists (uri, name, popularity) "
+                    "VALUES (?, ?, ?) ON CONFLICT (uri) DO UPDATE SET "
+                    "name = excluded.name, popularity = excluded.popularity",
+                    [
+                        (
+                            artist['uri'].split(':')[-1],
+                            artist['name'],
+                            artist.get('popularity')
+                        )
+                        for artist in related['artists']
+                    ]
+                )
+
+                # Replace this artist's edges and mark it as fetched
+                self.conn.execute("DELETE FROM edges WHERE src = ?", (src,))
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO edges VALUES (?, ?, ?)",
+                    [
+                        (src, artist['uri'].split(':')[-1], rank)
+                        for rank, artist in enumerate(related['artists'])
+                    ]
+                )
+                self.conn.execute(
+                    "INSERT INTO artists (uri, name, fetched_at) "
+                    "VALUES (?, '', ?) ON CONFLICT (uri) DO UPDATE SET "
+                    "fetched_at = excluded.fetched_at",
+                    (src, now)
+                )
+            self.conn.commit()
+
+
+    def get_edges(self, artist_uris: List[str]) -> pd.DataFrame:
+        """
+        Gets the stored edges of the given artists.
+
+        Parameters:
+            artist_uris (List[str]): Artist uris (IDs).
+
+        Returns:
+            pd.DataFrame: One row per edge, ordered by artist_uris order then
+                Spotify's rank. Columns: src, dst, name, popularity.
+        """
+
+        frames = [pd.DataFrame(
+            columns=['src', 'dst', 'rank', 'name', 'popularity']
+        )]
+        with self.lock:
+            for i in range(0, len(artist_uris), 500):
+                chunk = artist_uris[i : i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                frames.append(pd.read_sql_query(
+                    f"SELECT e.src, e.dst, e.rank, a.name, a.popularity "
+                    f"FROM edges e JOIN artists a ON a.uri = e.dst "
+                    f"WHERE e.src IN ({placeholders})",
+                    self.conn,
+                    params=chunk
+                ))
+        df_edges = pd.concat(frames, ignore_index=True)
+
+        # Order edges like artist_uris, then by rank (same order as the API)
+        src_order = {
+            uri: i for i, uri in enumerate(dict.fromkeys(artist_uris))
+        }
+        df_edges['src_order'] = df_edges['src'].map(src_order)
+        df_edges = df_edges.sort_values(['src_order', 'rank'], kind='stable')
+
+        return df_edges[['src', 'dst', 'name', 'popularity']].reset_index(
+            drop=True
+        )
+
+
+    def recommend(
+        self,
+        artist_uris: List[str],
+        exclude_names: List[str] = (),
+        num_recs: int = 3,
+        popularity_weight: float = 0.0
+    ) -> List[str]:
+        """
+        Recommends artists that are related to many of the given artists,
+        using the stored graph only (no API requests).
+
+        Parameters:
+            artist_uris (List[str]): Uris (IDs) of the playlist's artists.
+            exclude_names (List[str]): Artist names to never recommend (ex:
+                playlist artists). Playlist artist uris are also excluded.
+            num_recs (int): Number of recommended artists to return.
+            popularity_weight (float): 0 ranks recommendations by how many
+                playlist artists they're related to only. Higher values add
+                popularity_weight * (popularity / 100) to each count, so
+                more popular artists win close calls.
+
+        Returns:
+            List[str]: List of recommended artist names.
+        """
+
+        df_edges = self.get_edges(list(artist_uris))
+        if df_edges.empty:
+            return []
+
+        # Drop playlist artists (by uri and by name)
+        df_edges = df_edges[
+            ~df_edges['dst'].isin(list(artist_uris))
+            & ~df_edges['name'].isin(list(exclude_names))
+        ]
+
+        # Count occurrences of each related artist. Codes are in order of
+        # first appearance, so ties keep the same order as the API results.
+        codes, uniques = pd.factorize(df_edges['dst'])
+        counts = np.bincount(codes, minlength=len(uniques)).astype(float)
+        scores = counts
+        if popularity_weight:
+            popularity = (
+                df_edges.groupby(codes)['popularity'].first()
+                .reindex(range(len(uniques))).fillna(0).to_numpy()
+            )
+            scores = counts + popularity_weight * popularity / 100
+
+        # Highest scores first (stable sort keeps first-appearance order)
+        top_codes = np.argsort(-scores, kind='stable')[:num_recs]
+        names = df_edges.groupby(codes)['name'].first()
+
+        return [names[code] for code in top_codes]
+
+
+    def close(self) -> None:
+        """Closes the database connection."""
+        self.conn.close()
@@ -0,0 +1,337 @@
+###############################################################################
+#
+# This file contains ArtistResolutionIndex, a persistent, SQLite-backed
+# index from lineup artist names to Spotify artists, so artists resolved by
+# a previous run are never searched for again (repeat lineups resolve
+# without any search requests):
+#   - fold_artist_name converts a name to the form it's indexed by, so
+#      spelling variants and lineup qualifiers (ex: '(DJ set)', 'b2b X')
+#      share one entry
+#   - score_candidate/choose_artist pick the best of several search
+#      results, instead of blindly taking the top result (unless the
+#      lineup name just adds words to the top result's name)
+#   - ArtistResolutionIndex maps folded names and learned aliases (lineup
+#      names that differ from the artist's Spotify name) to artist uris
+#
+# Ex: 'Tiesto', 'TIËSTO' and ' tiësto ' all fold to 'tiesto', and
+# 'Mumford and Sons' and 'Mumford & Sons' both fold to 'mumford and sons'.
+#
+###############################################################################
+
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+import unicodedata
+from difflib import SequenceMatcher
+from typing import Dict, List, Tuple
+
+# Number of search results scored for each artist name
+ARTIST_SEARCH_LIMIT = 5
+
+# Min score (0-1) of a search result to be accepted as the searched artist
+MIN_MATCH_SCORE = 0.8
+
+# Lineup qualifiers dropped from artist names before matching. Ex:
+# 'Kaskade (Redux set)', 'Arya [Serbia]', 'Dom Dolla b2b John Summit'
+_QUALIFIER_PATTERN = re.compile(
+    r"\s+[\(\[][^\)\]]*[\)\]]|\s+b[23]b\s.*$|\s+(?:dj|live) set$"
+)
+
+
+def fold_artist_name(artist_name: str) -> str:
+    """
+    Converts an artist name to its folded form: accents removed, casefolded,
+    lineup qualifiers dropped (ex: '(DJ set)', 'b2b X'), '&' and '+' spelled
+    as 'and', a leading 'the' dropped, and punctuation and whitespace
+    collapsed to single spaces.
+
+    Parameters:
+        artist_name (str): Artist name, ex: 'The Chainsmokers'.
+
+    Returns:
+        str: Folded name, ex: 'chainsmokers'.
+    """
+
+    # Split accented chars into char + accent, then drop the accents
+    decomposed = unicodedata.normalize("NFKD", artist_name)
+    folded = "".join(
+        char for char in decomposed if not unicodedata.combining(char)
+    ).casefold()
+
+    # Drop lineup qualifiers, but not a whole name. Ex: '(DJ set)'
+    unqualified = _QUALIFIER_PATTERN.sub("", folded).strip()
+    if unqualified:
+        folded = unqualified
+
+    # Spell out 'and', then collapse punctuation and whitespace
+    folded = re.sub(r"\s*[&+]\s*", " and ", folded)
+    folded = re.sub(r"[^\w$]+", " ", folded).strip()
+
+    # Drop a leading 'the' (ex: 'The Chainsmokers'), but not a whole name
+    return re.sub(r"^the\s+", "", folded)
+
+
+def score_candidate(artist_name: str, candidate: Dict) -> float:
+    """
+    Scores how closely a search result matches a searched artist name.
+
+    Parameters:
+        artist_name (str): Artist name, as searched.
+        candidate (Dict): Artist dict from a Spotify API search result.
+
+    Returns:
+        float: 1.0 if the folded names are equal, else their similarity
+            ratio (between 0-1).
+    """
+
+    folded_name = fold_artist_name(artist_name)
+    folded_candidate = fold_artist_name(candidate["name"])
+    if folded_name == folded_candidate:
+        return 1.0
+
+    return SequenceMatcher(None, folded_name, folded_candidate).ratio()
+
+
+def choose_artist(
+    artist_name: str,
+    candidates: List[Dict],
+    min_score: float = MIN_MATCH_SCORE
+) -> Tuple[Dict, float]:
+    """
+    Chooses the search result that best matches a searched artist name.
+    Ties keep Spotify's ranking. If no result scores at least min_score,
+    Spotify's top result is still chosen when its folded name is the start
+    of the searched name's (whole words), ex: 'Kaskade' for 'Kaskade Redux'.
+
+    Parameters:
+        artist_name (str): Artist name, as searched.
+        candidates (List[Dict]): Artist dicts of a Spotify API search
+            result, in ranked order.
+        min_score (float): Min score of the chosen result.
+
+    Returns:
+        Dict: Chosen artist dict, or None if no result scores at least
+            min_score (and the top result isn't a prefix match).
+        float: Score of the chosen result, else of the best result (0.0 if
+            no results).
+    """
+
+    best_candidate, best_score = None, 0.0
+    for candidate in candidates:
+        score = score_candidate(artist_name, candidate)
+        if score > best_score:
+            best_candidate, best_score = candidate, score
+
+    # Fall back to the top result if the searched name starts with its name
+    if best_score < min_score and candidates:
+        name_words = fold_artist_name(artist_name).split()
+        top_words = fold_artist_name(candidates[0]["name"]).split()
+        if top_words and name_words[:len(top_words)] == top_words:
+            return candidates[0], score_candidate(artist_name, candidates[0])
+
+    if best_score < min_score:
+        return None, best_score
+
+    return best_candidate, best_score
+
+
+class ArtistResolutionIndex:
+    """
+    Persistent, SQLite-backed index of resolved artists. Each artist (uri,
+    Spotify name and images) is indexed by its own folded name and by any
+    aliases: folded lineup names it was resolved from by a search, or added
+    with add_alias. Genres and popularity aren't stored, since they change;
+    they're refreshed by uri (see spotipy_utils.resolve_artists).
+    """
+
+    def __init__(
+        self,
+        db_path: str = "output/cache/artist_index.sqlite"
+    ) -> None:
+        """
+        Initializes the ArtistResolutionIndex instance.
+
+        Parameters:
+            db_path (str): Path of the SQLite database file. ":memory:"
+                to only share resolved artists within this run.
+        """
+
+        self.lock = threading.Lock()
+
+        # Create directory for the database if it DNE yet
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS artists (
+                uri TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                images TEXT NOT NULL, -- JSON list of image dicts
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS aliases (
+                alias TEXT PRIMARY KEY, -- Folded name
+                uri TEXT NOT NULL,
+                source TEXT NOT NULL, -- 'name', 'search' or 'manual'
+                score REAL NOT NULL
+            );
+            """
+        )
+
+
+    def lookup(self, artist_names: List[str]) -> Dict[str, Dict]:
+        """
+        Looks up previously resolved artists by folded name or alias.
+
+        Parameters:
+            artist_names (List[str]): Artist names, ex: a festival lineup.
+
+        Returns:
+            Dict[str, Dict]: Artist name -> dict with name, uri and images,
+                for every indexed name.
+        """
+
+        folded_names = {name: fold_artist_name(name) for name in artist_names}
+        unique_folded = list(set(folded_names.values()))
+
+        # Query in chunks, to stay under SQLite's max number of parameters
+        artists_by_alias = {}
+        with self.lock:
+            for i in range(0, len(unique_folded), 500):
+                chunk = unique_folded[i : i + 500]
+                rows = self.conn.execute(
+                    "SELECT aliases.alias, artists.uri, artists.name, "
+                    "artists.images FROM aliases JOIN artists "
+                    "ON aliases.uri = artists.uri "
+                    f"WHERE aliases.alias IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                for alias, uri, name, images in rows:
+                    artists_by_alias[alias] = {
+                        "name": name,
+                        "uri": uri,
+                        "images": json.loads(images),
+                    }
+
+        return {
+            name: artists_by_alias[folded]
+            for name, folded in folded_names.items()
+            if folded in artists_by_alias
+        }
+
+
+    def _artist_rows(self, artist_infos: List[Dict]) -> List[Tuple]:
+        """Converts artist dicts to rows of the artists table."""
+
+        now = time.time()
+        artist_rows = {
+            artist_info["uri"]: (
+                artist_info["uri"],
+                artist_info["name"],
+                json.dumps(artist_info.get("images", [])),
+                now
+            )
+            for artist_info in artist_infos
+        }
+
+        return list(artist_rows.values())
+
+
+    def update_artists(self, artist_infos: List[Dict]) -> None:
+        """Updates the Spotify names and images of artists (ex: refreshed by
+        uri), without changing any aliases."""
+
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO artists VALUES (?, ?, ?, ?)",
+                self._artist_rows(artist_infos)
+            )
+
+
+    def learn(
+        self,
+        artist_infos: Dict[str, Dict],
+        scores: Dict[str, float] = None
+    ) -> None:
+        """
+        Stores artists resolved by a search, indexed by the names they were
+        searched by (learned aliases) and by their own Spotify names.
+
+        Parameters:
+            artist_infos (Dict[str, Dict]): Artist name -> artist dict
+                (Spotify API format) it resolved to.
+            scores (Dict[str, float], optional): Artist name -> match score
+                (see choose_artist). Defaults to 1.0.
+        """
+
+        scores = scores or {}
+        own_name_rows = [
+            (fold_artist_name(artist_info["name"]), artist_info["uri"])
+            for artist_info in artist_infos.values()
+        ]
+        alias_rows = [
+            (
+                fold_artist_name(name),
+                artist_info["uri"],
+                scores.get(name, 1.0)
+            )
+            for name, artist_info in artist_infos.items()
+        ]
+
+        # Own names never replace an alias; aliases never replace a manual
+        # alias
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO artists VALUES (?, ?, ?, ?)",
+                self._artist_rows(list(artist_infos.values()))
+            )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO aliases VALUES (?, ?, 'name', 1.0)",
+                own_name_rows
+            )
+            self.conn.executemany(
+                "INSERT INTO aliases VALUES (?, ?, 'search', ?) "
+                "ON CONFLICT(alias) DO UPDATE SET uri = excluded.uri, "
+                "source = excluded.source, score = excluded.score "
+                "WHERE aliases.source != 'manual'",
+                alias_rows
+            )
+
+
+    def add_alias(self, alias: str, artist_name: str) -> None:
+        """
+        Adds an alias of an indexed artist, ex: a festival's spelling that
+        search can't match. Manual aliases are never replaced by searches.
+
+        Parameters:
+            alias (str): Name to resolve to the artist.
+            artist_name (str): Name (or alias) the artist is indexed by.
+        """
+
+        artist = self.lookup([artist_name]).get(artist_name)
+        if artist is None:
+            raise KeyError(f"Artist {artist_name} is not in the index.")
+
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO aliases VALUES (?, ?, 'manual', 1.0)",
+                (fold_artist_name(alias), artist["uri"])
+            )
+
+
+    def forget(self, artist_name: str) -> None:
+        """Removes the alias of an artist name (ex: a wrong match), so it is
+        searched for again on the next run."""
+
+        with self.lock, self.conn:
+            self.conn.execute(
+                "DELETE FROM aliases WHERE alias = ?",
+                (fold_artist_name(artist_name),)
+            )
@@ -0,0 +1,803 @@
+###############################################################################
+#
+# This file contains asyncio versions of the Spotify API functions in
+# spotipy_utils. Every request goes through one aiohttp connection pool, so
+# hundreds of requests can be in flight at once on a single event loop:
+#   - AsyncSpotifyClient owns the connection pool, concurrency limit and a
+#      shared 429 cooldown. Requests are retried by the same RetryEngine
+#      (budgets and circuit breaker) as the Spotipy requests
+#   - search_for_artists_async, resolve_artists_async,
+#      get_top_tracks_async, recommend_artists_async and
+#      create_playlist_async are awaitable equivalents of the
+#      spotipy_utils functions
+#   - search_for_artists, resolve_artists, get_top_tracks,
+#      recommend_artists and create_playlist are sync wrappers with the
+#      same signatures as the spotipy_utils functions, so they can be used
+#      as drop-in replacements
+#
+# Requires aiohttp (pip install aiohttp).
+#
+###############################################################################
+
+import os
+import asyncio
+from typing import Any, Dict, List, Union
+
+import pandas as pd
+from spotipy import Spotify, SpotifyException
+
+try:
+    import aiohttp
+except ImportError: # Optional dependency, only needed for this module
+    aiohttp = None
+
+from http_transport import get_spotify_api_url
+from rate_limiter import RateLimiter, AsyncCooldown
+from retry_engine import (
+    RetryEngine, RequestOutcome, HTTPStatusError, TransportError
+)
+from spotify_cache import SpotifyCache
+from token_manager import TokenManager, TokenHeader
+from artist_graph import ArtistGraphStore
+from artist_index import (
+    ArtistResolutionIndex, choose_artist, ARTIST_SEARCH_LIMIT
+)
+import spotipy_utils
+from spotipy_utils import create_df_artists, count_artist_recs
+from song_store import SongStore
+
+
+class AsyncSpotifyClient:
+    """
+    Minimal asyncio Spotify Web API client. All requests share one aiohttp
+    session (connection pool) and one 429 cooldown, and are retried by a
+    RetryEngine, same as spotipy_utils.retry_spotify_request. Use as an
+    async context manager so the session is closed when done.
+    """
+
+    def __init__(
+        self,
+        auth_header: Dict[str, str],
+        max_concurrency: int = 100,
+        api_url: str = None,
+        retry_engine: RetryEngine = None
+    ) -> None:
+        """
+        Initializes the AsyncSpotifyClient instance.
+
+        Parameters:
+            auth_header (Dict[str, str]): Bearer token header. Either the
+                search header from get_token_header or a user token header
+                (needed for creating playlists). Read on every request, so
+                a refreshing header (see token_manager.TokenHeader) never
+                sends an expired token.
+            max_concurrency (int): Max requests in flight at once.
+            api_url (str, optional): Base url of the Spotify Web API.
+                Defaults to http_transport.get_spotify_api_url().
+            retry_engine (RetryEngine, optional): Engine used to retry
+                requests. Defaults to spotipy_utils.DEFAULT_RETRY_ENGINE.
+        """
+
+        if aiohttp is None:
+            raise ImportError(
+                "aiohttp is required for the asyncio Spotify client. "
+                "Install it with: pip install aiohttp"
+            )
+
+        self.auth_header = auth_header
+        self.max_concurrency = max_concurrency
+        self.api_url = (api_url or get_spotify_api_url()).rstrip("/")
+        self.retry_engine = retry_engine or spotipy_utils.DEFAULT_RETRY_ENGINE
+        self.session = None
+        self.semaphore = None
+        self.cooldown = AsyncCooldown() # Shared by all in-flight requests
+
+
+    async def __aenter__(self) -> "AsyncSpotifyClient":
+        # Session and semaphore must be created inside the running loop
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=30)
+        )
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self
+
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.session.close()
+
+
+    async def request_outcome(
+        self,
+        method: str,
+        path: str,
+        params: Dict[str, Any] = None,
+        json: Dict[str, Any] = None,
+        idempotent: bool = True
+    ) -> RequestOutcome:
+        """
+        Makes an API request through the RetryEngine: 429s wait out a
+        cooldown shared by every request, 5xx responses, connection errors
+        and timeouts are retried with backoff, and each request is bounded
+        by the engine's attempts and time budgets.
+
+        Parameters:
+            method (str): HTTP method, ex: "GET".
+            path (str): Endpoint path, ex: "/artists/{id}/top-tracks".
+            params (Dict[str, Any], optional): Query parameters.
+            json (Dict[str, Any], optional): JSON request body.
+            idempotent (bool): Flag indicating whether the request can be
+                repeated without side effects. If False (playlist writes),
+                it's only retried after a 429 or a failed connection (see
+                RetryEngine.call).
+
+        Returns:
+            RequestOutcome: Outcome of the request. outcome.value holds the
+                parsed JSON response if outcome.ok.
+        """
+
+        return await self.retry_engine.call_async(
+            self._request_once,
+            method,
+            path,
+            params,
+            json,
+            rate_limiter=self.cooldown,
+            idempotent=idempotent
+        )
+
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: Dict[str, Any] = None,
+        json: Dict[str, Any] = None
+    ) -> Any:
+        """
+        Makes an API request (see request_outcome). A failed request is
+        printed and returns None, so one failure never aborts the other
+        requests of an asyncio.gather (same as map_spotify_requests).
+
+        Returns:
+            Any: Parsed JSON response, or None if unsuccessful.
+        """
+
+        outcome = await self.request_outcome(method, path, params, json)
+
+        # If request failed, print error
+        if not outcome.ok:
+            print(f"Spotify request failed: {outcome} {outcome.error or ''}")
+
+        return outcome.value
+
+
+    async def request_or_raise(
+        self,
+        method: str,
+        path: str,
+        params: Dict[str, Any] = None,
+        json: Dict[str, Any] = None,
+        idempotent: bool = True
+    ) -> Any:
+        """
+        Same as request, but raises a SpotifyException if the request fails
+        (same as spotipy_utils.retry_spotify_request_or_raise). Used for
+        playlist requests, where skipping a failed request would leave the
+        playlist incomplete.
+
+        Returns:
+            Any: Parsed JSON response.
+        """
+
+        outcome = await self.request_outcome(
+            method, path, params, json, idempotent
+        )
+        if not outcome.ok:
+            raise SpotifyException(
+                outcome.status or -1,
+                -1,
+                f"{outcome.reason}: {outcome.error or ''}"
+            )
+
+        return outcome.value
+
+
+    async def _get_auth_header(self) -> Dict[str, str]:
+        """Returns the auth header for the next request. A TokenHeader's
+        token is refreshed in a worker thread, so the event loop is never
+        blocked by a token request."""
+
+        if isinstance(self.auth_header, TokenHeader):
+            token_manager = self.auth_header.token_manager
+            token = await token_manager.get_access_token_async()
+            return {"Authorization": "Bearer " + token}
+
+        return dict(self.auth_header)
+
+
+    async def _request_once(
+        self,
+        method: str,
+        path: str,
+        params: Dict[str, Any] = None,
+        json: Dict[str, Any] = None
+    ) -> Any:
+        """Makes one attempt of a request. Raises HTTPStatusError on an
+        error response, or TransportError on a connection error, timeout or
+        unreadable response."""
+
+        try:
+            async with self.semaphore:
+                async with self.session.request(
+                    method,
+                    self.api_url + path,
+                    params=params,
+                    json=json,
+                    headers=await self._get_auth_header()
+                ) as response:
+                    if response.status >= 400:
+                        raise HTTPStatusError(
+                            response.status,
+                            response.headers,
+                            await response.text()
+                        )
+
+                    return await response.json()
+
+        # No connection could be made, so the request was never sent
+        except aiohttp.ClientConnectorError as e:
+            raise TransportError(
+                f"{type(e).__name__}: {e}", failed_to_connect=True
+            ) from e
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            raise TransportError(f"{type(e).__name__}: {e}") from e
+
+
+    async def get(self, path: str, params: Dict[str, Any] = None) -> Any:
+        """Makes a GET request. See request."""
+        return await self.request("GET", path, params=params)
+
+
+    async def post(self, path: str, json: Dict[str, Any] = None) -> Any:
+        """Makes a POST request. See request."""
+        return await self.request("POST", path, json=json)
+
+
+    async def get_cached(
+        self,
+        paths: Dict[str, str],
+        cache: SpotifyCache = None,
+        kind: str = None,
+        params: Dict[str, Any] = None
+    ) -> Dict[str, Any]:
+        """
+        Makes concurrent GET requests, skipping any response already in the
+        cache. New successful responses are saved to the cache.
+
+        Parameters:
+            paths (Dict[str, str]): Cache key (ex: artist uri) -> path.
+            cache (SpotifyCache, optional): Cache of Spotify API responses.
+            kind (str, optional): Kind of cached response. See
+                spotify_cache.DEFAULT_TTLS.
+            params (Dict[str, Any], optional): Query parameters.
+
+        Returns:
+            Dict[str, Any]: Cache key -> response (None if unsuccessful).
+        """
+
+        cached = cache.get_many(kind, list(paths)) if cache else {}
+        missing_keys = [key for key in paths if key not in cached]
+        responses = await asyncio.gather(*(
+            self.get(paths[key], params=params) for key in missing_keys
+        ))
+        fetched = dict(zip(missing_keys, responses))
+
+        # Save new successful responses to cache
+        if cache:
+            cache.set_many(kind, {
+                key: response
+                for key, response in fetched.items()
+                if response is not None
+            })
+
+        return {**cached, **fetched}
+
+
+async def search_for_artists_async(
+    client: AsyncSpotifyClient,
+    artist_names: List[str],
+    cache: SpotifyCache = None,
+    index: ArtistResolutionIndex = None
+) -> pd.DataFrame:
+    """
+    Awaitable version of spotipy_utils.search_for_artists. All artist
+    searches are made concurrently.
+
+    Parameters:
+        client (AsyncSpotifyClient): Open async Spotify client.
+        artist_names (List[str]): List of artist names.
+        cache (SpotifyCache, optional): Cache of Spotify API responses.
+        index (ArtistResolutionIndex, optional): Index of previously
+            resolved artist names.
+
+    Returns:
+        pd.DataFrame: DataFrame with artist information. See
+            spotipy_utils.create_df_artists for columns.
+    """
+
+    # If a single artist name is entered as a string, convert it to list
+    if isinstance(artist_names, str):
+        artist_names = [artist_names]
+
+    artist_infos = await resolve_artists_async(
+        client,
+        artist_names,
+        cache,
+        index
+    )
+
+    found_names = [name for name in artist_names if name in artist_infos]
+    return create_df_artists(
+        found_names,
+        [artist_infos[artist_name] for artist_name in found_names]
+    )
+
+
+async def resolve_artists_async(
+    client: AsyncSpotifyClient,
+    artist_names: List[str],
+    cache: SpotifyCache = None,
+    index: ArtistResolutionIndex = None
+) -> Dict[str, Dict]:
+    """
+    Awaitable version of spotipy_utils.resolve_artists. All artist
+    searches (and refreshes of resolved artists by uri) are made
+    concurrently.
+
+    Parameters:
+        client (AsyncSpotifyClient): Open async Spotify client.
+        artist_names (List[str]): List of artist names.
+        cache (SpotifyCache, optional): Cache of Spotify API responses.
+        index (ArtistResolutionIndex, optional): Index of previously
+            resolved artist names.
+
+    Returns:
+        Dict[str, Dict]: Artist name -> artist info, for every artist found.
+    """
+
+    # Find artists resolved by previous searches (see
+    # spotipy_utils.resolve_artists), then get their info from cache
+    if index is not None:
+        resolved_artists = index.lookup(artist_names)
+    elif cache:
+        resolved_artists = cache.get_resolved_artists(artist_names)
+    else:
+        resolved_artists = {}
+    artist_infos = cache.complete_artists(resolved_artists) if cache else {}
+
+    # Refresh resolved artists missing from cache by uri, 50 at a time
+    stale_ids = list(dict.fromkeys(
+        artist["uri"].split(":")[-1]
+        for artist_name, artist in resolved_artists.items()
+        if artist_name not in artist_infos
+    ))
+    responses = await asyncio.gather(*(
+        client.get(
+            "/artists",
+            params={"ids": ",".join(stale_ids[i : i + 50])}
+        )
+        for i in range(0, len(stale_ids), 50)
+    ))
+    refreshed = {
+        artist_info["id"]: artist_info
+        for response in responses if response
+        for artist_info in response["artists"] if artist_info
+    }
+    refreshed_infos = {
+        artist_name: refreshed[artist["uri"].split(":")[-1]]
+        for artist_name, artist in resolved_artists.items()
+        if artist_name not in artist_infos
+        and artist["uri"].split(":")[-1] in refreshed
+    }
+    if refreshed_infos:
+        if cache:
+            cache.set_artists(
+                list(refreshed_infos),
+                list(refreshed_infos.values())
+            )
+        if index is not None:
+            index.update_artists(list(refreshed_infos.values()))
+    artist_infos.update(refreshed_infos)
+
+    # Only search for artists that aren't resolved yet
+    searched_names = [
+        artist_name for artist_name in dict.fromkeys(artist_names)
+        if artist_name not in artist_infos
+    ]
+    responses = await asyncio.gather(*(
+        client.get(
+            "/search",
+            params={
+                "q": artist_name,
+                "type": "artist",
+                "limit": ARTIST_SEARCH_LIMIT,
+            }
+        )
+        for artist_name in searched_names
+    ))
+
+    # Pick the closest match among each artist's search results. Skip
+    # artists whose search failed or returned no close match.
+    searched, searched_scores = {}, {}
+    for artist_name, response in zip(searched_names, responses):
+        if not response or not response["artists"]["items"]:
+            print(f"Warning: No search result for {artist_name}. Skipping.")
+            continue
+        artist_info, score = choose_artist(
+            artist_name,
+            response["artists"]["items"]
+        )
+        if artist_info is None:
+            print(f"Warning: No close match for {artist_name}. Skipping.")
+            continue
+        searched[artist_name] = artist_info
+        searched_scores[artist_name] = score
+    artist_infos.update(searched)
+
+    # Save newly searched artists to cache and index
+    if cache and searched:
+        cache.set_artists(list(searched), list(searched.values()))
+    if index is not None and searched:
+        index.learn(searched, searched_scores)
+
+    return artist_infos
+
+
+async def recommend_artists_async(
+    client: AsyncSpotifyClient,
+    df_artists: pd.DataFrame,
+    num_recs: int = 3,
+    cache: SpotifyCache = None,
+    graph: ArtistGraphStore = None,
+    popularity_weight: float = 0.0
+) -> List[str]:
+    """
+    Awaitable version of spotipy_utils.recommend_artists. Related artists
+    for every artist are requested concurrently.
+
+    Parameters:
+        client (AsyncSpotifyClient): Open async Spotify client.
+        df_artists (pd.DataFrame): Can be df_songs or df_artists.
+        num_recs (int): Number of recommended artists to return.
+        cache (SpotifyCache, optional): Cache of Spotify API responses.
+        graph (ArtistGraphStore, optional): Graph of related artists. Only
+            artists missing from it (or stale) are requested.
+        popularity_weight (float): Weight of popularity when using a graph.
+
+    Returns:
+        List[str]: List of recommended artist names.
+    """
+
+    artist_uris = list(df_artists['Artist uri'].unique()) # Unique Artist URIs
+
+    # Request only artists missing from the graph, then use the stored graph
+    if graph is not None:
+        missing_related = await client.get_cached(
+            {
+                artist_uri: f"/artists/{artist_uri}/related-artists"
+                for artist_uri in graph.missing(artist_uris)
+            },
+            cache,
+            "artist_related_artists"
+        )
+        graph.add_related(missing_related)
+        return graph.recommend(
+            artist_uris,
+            df_artists['Artist'].unique(),
+            num_recs,
+            popularity_weight
+        )
+
+    related_by_uri = await client.get_cached(
+        {
+            artist_uri: f"/artists/{artist_uri}/related-artists"
+            for artist_uri in artist_uris
+        },
+        cache,
+        "artist_related_artists"
+    )
+    all_related = [related_by_uri[artist_uri] for artist_uri in artist_uris]
+
+    return count_artist_recs(df_artists, all_related, num_recs)
+
+
+async def get_top_tracks_async(
+    client: AsyncSpotifyClient,
+    df_artists: pd.DataFrame,
+    tracks_per_artist: int = 10,
+    market: str = "US",
+    cache: SpotifyCache = None,
+    as_store: bool = False
+) -> Union[pd.DataFrame, SongStore]:
+    """
+    Awaitable version of spotipy_utils.get_top_tracks. Top tracks for every
+    artist are requested concurrently, then audio features are requested
+    concurrently in batches of 100 tracks.
+
+    Parameters:
+        client (AsyncSpotifyClient): Open async Spotify client.
+        df_artists (pd.DataFrame): DataFrame containing artist info.
+        tracks_per_artist (int): Number of tracks per artist to include.
+        market (str): Market for top tracks (same default as Spotipy).
+        cache (SpotifyCache, optional): Cache of Spotify API responses.
+        as_store (bool): If True, return a normalized SongStore instead.
+
+    Returns:
+        pd.DataFrame: DataFrame with song metadata. See
+            spotipy_utils.get_top_tracks for columns.
+    """
+
+    # Get top tracks for every artist (in df_artists row order)
+    artist_uris = df_artists['Artist uri'].tolist()
+    top_tracks_by_uri = await client.get_cached(
+        {
+            artist_uri: f"/artists/{artist_uri}/top-tracks"
+            for artist_uri in artist_uris
+        },
+        cache,
+        "artist_top_tracks",
+        params={"market": market}
+    )
+    all_top_tracks = [top_tracks_by_uri[uri] for uri in artist_uris]
+
+    # Get features for every unique track, 100 track IDs per request
+    track_ids = list(dict.fromkeys(
+        track['uri'].split(':')[-1]
+        for top_tracks in all_top_tracks if top_tracks
+        for track in top_tracks['tracks'][:tracks_per_artist]
+    ))
+
+    # Only request features of tracks that aren't in the cache
+    cached_features = (
+        cache.get_many("audio_features", track_ids) if cache else {}
+    )
+    track_ids = [
+        track_id for track_id in track_ids if track_id not in cached_features
+    ]
+    id_batches = [
+        track_ids[i : i + 100] for i in range(0, len(track_ids), 100)
+    ]
+    responses = await asyncio.gather(*(
+        client.get("/audio-features", params={"ids": ",".join(batch_ids)})
+        for batch_ids in id_batches
+    ))
+
+    features_by_id = {}
+    for batch_ids, response in zip(id_batches, responses):
+        batch_features = (
+            response["audio_features"] if response
+            else [None] * len(batch_ids)
+        ) # Features left as None if request error
+        for track_id, features in zip(batch_ids, batch_features):
+            features_by_id[track_id] = features
+
+    # Save new features to cache (tracks without features are not saved)
+    if cache:
+        cache.set_many("audio_features", {
+            track_id: features
+            for track_id, features in features_by_id.items()
+            if features
+        })
+    features_by_id.update(cached_features)
+
+    song_store = SongStore.from_top_tracks(
+        df_artists,
+        all_top_tracks,
+        features_by_id,
+        tracks_per_artist
+    )
+
+    return song_store if as_store else song_store.to_df_songs()
+
+
+async def create_playlist_async(
+    client: AsyncSpotifyClient,
+    playlist_name: str,
+    df_songs: pd.DataFrame
+) -> str:
+    """
+    Awaitable version of spotipy_utils.create_playlist. The client must use
+    a user token header (Authorization Code Flow), not the search header.
+    Raises a SpotifyException if any request fails (same as
+    spotipy_utils.create_playlist), instead of leaving the playlist
+    incomplete.
+
+    Parameters:
+        client (AsyncSpotifyClient): Open async Spotify client.
+        playlist_name (str): Name of the new playlist.
+        df_songs (pd.DataFrame): DataFrame with song metadata.
+
+    Returns:
+        str: Playlist ID.
+    """
+
+    # Get the user's Spotify ID
+    user = os.getenv("SPOTIFY_USER")
+
+    # Create a new playlist and get playlist ID. Playlist writes are never
+    # replayed after they may have been applied (see RetryEngine.call).
+    playlist = await client.request_or_raise(
+        "POST",
+        f"/users/{user}/playlists",
+        json={
+            "name": playlist_name,
+            "public": True,
+            "description": "Created using Spotipy."
+        },
+        idempotent=False
+    )
+    playlist_id = playlist['id']
+
+    # Get list of song URIs from df_songs
+    song_uris = [
+        f"spotify:track:{song_uri}" for song_uri in df_songs['Song uri']
+    ]
+
+    # Add songs to playlist in batches of 100. Batches are sent one after
+    # another (not concurrently) so that song order is kept.
+    batch_size = 100
+    for i in range(0, len(song_uris), batch_size):
+        batch_uris = song_uris[i : i + batch_size]
+        await client.request_or_raise(
+            "POST",
+            f"/playlists/{playlist_id}/tracks",
+            json={"uris": batch_uris},
+            idempotent=False
+        )
+
+    return playlist_id
+
+
+def get_auth_header(spot: Spotify) -> Dict[str, str]:
+    """
+    Gets a bearer token header from an authenticated Spotipy instance, so
+    the async client can reuse its (cached) token.
+
+    Parameters:
+        spot (Spotify): Authenticated Spotify instance.
+
+    Returns:
+        Dict[str, str]: Bearer token header for Spotify API.
+    """
+
+    # A TokenManager's header refreshes itself (see TokenHeader)
+    if isinstance(spot.auth_manager, TokenManager):
+        return spot.auth_manager.get_token_header()
+
+    token = spot.auth_manager.get_access_token(as_dict=False)
+    return {"Authorization": "Bearer " + token}
+
+
+async def _with_client(
+    auth_header: Dict[str, str],
+    retry_engine: RetryEngine,
+    func,
+    *args
+) -> Any:
+    """Runs an async function with a new client, then closes the client."""
+    async with AsyncSpotifyClient(
+        auth_header, retry_engine=retry_engine
+    ) as client:
+        return await func(client, *args)
+
+
+def search_for_artists(
+    search_header: Dict[str, str],
+    artist_names: List[str],
+    cache: SpotifyCache = None,
+    rate_limiter: RateLimiter = None,
+    retry_engine: RetryEngine = None,
+    index: ArtistResolutionIndex = None
+) -> pd.DataFrame:
+    """Sync wrapper of search_for_artists_async. Same signature as
+    spotipy_utils.search_for_artists. rate_limiter is ignored (the client
+    limits requests in flight instead)."""
+    return asyncio.run(_with_client(
+        search_header,
+        retry_engine,
+        search_for_artists_async,
+        artist_names,
+        cache,
+        index
+    ))
+
+
+def resolve_artists(
+    search_header: Dict[str, str],
+    artist_names: List[str],
+    cache: SpotifyCache = None,
+    rate_limiter: RateLimiter = None,
+    retry_engine: RetryEngine = None,
+    index: ArtistResolutionIndex = None
+) -> Dict[str, Dict]:
+    """Sync wrapper of resolve_artists_async. Same signature as
+    spotipy_utils.resolve_artists. rate_limiter is ignored."""
+    return asyncio.run(_with_client(
+        search_header,
+        retry_engine,
+        resolve_artists_async,
+        artist_names,
+        cache,
+        index
+    ))
+
+
+def recommend_artists(
+    spot: Spotify,
+    df_artists: pd.DataFrame,
+    num_recs: int = 3,
+    max_workers: int = 1,
+    rate_limiter: RateLimiter = None,
+    cache: SpotifyCache = None,
+    retry_engine: RetryEngine = None,
+    graph: ArtistGraphStore = None,
+    popularity_weight: float = 0.0
+) -> List[str]:
+    """Sync wrapper of recommend_artists_async. Same signature as
+    spotipy_utils.recommend_artists. max_workers and rate_limiter are
+    ignored (requests run concurrently on one event loop)."""
+    return asyncio.run(_with_client(
+        get_auth_header(spot),
+        retry_engine,
+        recommend_artists_async,
+        df_artists,
+        num_recs,
+        cache,
+        graph,
+        popularity_weight
+    ))
+
+
+def get_top_tracks(
+    spot: Spotify,
+    df_artists: pd.DataFrame,
+    tracks_per_artist: int = 10,
+    batch_features: bool = True,
+    max_workers: int = 1,
+    rate_limiter: RateLimiter = None,
+    cache: SpotifyCache = None,
+    retry_engine: RetryEngine = None,
+    as_store: bool = False
+) -> Union[pd.DataFrame, SongStore]:
+    """Sync wrapper of get_top_tracks_async. Same signature as
+    spotipy_utils.get_top_tracks. batch_features, max_workers and
+    rate_limiter are ignored (audio features are always fetched in
+    batches, concurrently on one event loop)."""
+    return asyncio.run(_with_client(
+        get_auth_header(spot),
+        retry_engine,
+        get_top_tracks_async,
+        df_artists,
+        tracks_per_artist,
+        "US",
+        cache,
+        as_store
+    ))
+
+
+def create_playlist(
+    playlist_name: str,
+    spot: Spotify,
+    df_songs: pd.DataFrame
+) -> str:
+    """Sync wrapper of create_playlist_async. Same signature as
+    spotipy_utils.create_playlist."""
+    return asyncio.run(_with_client(
+        get_auth_header(spot),
+        None,
+        create_playlist_async,
+        playlist_name,
+        df_songs
+    ))
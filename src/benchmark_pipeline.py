@@ -0,0 +1,166 @@
+###############################################################################
+#
+# This file contains a benchmark harness for the Spotify fetch pipeline. It
+# runs artist search, top tracks/audio features, related artists and
+# playlist creation against the local stand-in server (see
+# spotify_stub_server), so throughput and 429 handling can be measured
+# reproducibly without hitting the real API:
+#   - stub_environment points the project at a stand-in server
+#   - run_benchmark runs the fetch pipeline once and reports wall time per
+#      stage, requests made and requests/sec
+#   - print_benchmark_results prints a table of benchmark results
+#
+###############################################################################
+
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+
+import pandas as pd
+
+import spotipy_utils
+from retry_engine import RetryEngine
+from spotify_stub_server import SpotifyStubServer
+from token_manager import TokenManager
+
+
+@contextmanager
+def stub_environment(stub: SpotifyStubServer) -> Iterator[None]:
+    """Sets the environment variables that point Spotify requests at a
+    stand-in server, restoring the previous values afterwards."""
+
+    stub_env = {
+        "SPOTIFY_API_URL": stub.api_url,
+        "SPOTIFY_ACCOUNTS_URL": stub.accounts_url,
+        "SPOTIFY_USER": "benchmark-user",
+    }
+    old_env = {name: os.environ.get(name) for name in stub_env}
+    os.environ.update(stub_env)
+    try:
+        yield
+    finally:
+        for name, value in old_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def run_benchmark(
+    stub: SpotifyStubServer,
+    artist_names: List[str],
+    use_async_client: bool = False,
+    max_workers: int = 1,
+    tracks_per_artist: int = 10
+) -> Dict[str, Any]:
+    """
+    Runs the fetch pipeline once against a running stand-in server. No
+    SpotifyCache is used, so every run makes every request.
+
+    Parameters:
+        stub (SpotifyStubServer): Running stand-in server.
+        artist_names (List[str]): Artist names to search for.
+        use_async_client (bool): Flag indicating whether to use the asyncio
+            client (async_spotipy_utils) instead of Spotipy.
+        max_workers (int): Number of threads making Spotipy requests.
+            Ignored by the asyncio client.
+        tracks_per_artist (int): Number of top tracks per artist.
+
+    Returns:
+        Dict[str, Any]: Benchmark results: name, seconds per stage, wall
+            time, requests made, 429s served, requests/sec and number of
+            artists and songs found.
+    """
+
+    if use_async_client:
+        import async_spotipy_utils as spotify_api
+        name = "async"
+    else:
+        spotify_api = spotipy_utils
+        name = f"spotipy x{max_workers}"
+
+    # Both clients take the same arguments (the asyncio functions ignore
+    # max_workers). Each run gets a fresh RetryEngine, so budgets used by
+    # one run never affect the next.
+    search_kwargs = {"retry_engine": RetryEngine()}
+    fetch_kwargs = {**search_kwargs, "max_workers": max_workers}
+
+    stub.reset_stats()
+    stage_times = {}
+    with stub_environment(stub):
+        # New token manager, so the real token cache is never touched
+        token_manager = TokenManager("stub-client", "stub-secret")
+        search_header = token_manager.get_token_header()
+        read_spot = token_manager.spotify_client()
+
+        # Run each stage of the fetch pipeline, timing each one
+        start = time.perf_counter()
+        df_artists = spotify_api.search_for_artists(
+            search_header,
+            artist_names,
+            **search_kwargs
+        )
+        stage_times["search"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        df_songs = spotify_api.get_top_tracks(
+            read_spot, df_artists, tracks_per_artist, **fetch_kwargs
+        )
+        stage_times["top_tracks"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        spotify_api.recommend_artists(read_spot, df_artists, **fetch_kwargs)
+        stage_times["related_artists"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        spotify_api.create_playlist("Benchmark Playlist", read_spot, df_songs)
+        stage_times["playlist"] = time.perf_counter() - start
+
+    wall_time = sum(stage_times.values())
+    stats = stub.stats()
+
+    return {
+        "name": name,
+        **stage_times,
+        "wall_time": wall_time,
+        "requests": stats["requests"],
+        "rate_limited": stats["rate_limited"],
+        "requests_per_sec": stats["requests"] / wall_time,
+        "artists": len(df_artists),
+        "songs": len(df_songs),
+    }
+
+
+def print_benchmark_results(results: List[Dict[str, Any]]) -> None:
+    """Prints benchmark results (from run_benchmark) as a table."""
+
+    df_results = pd.DataFrame(results).set_index("name")
+    with pd.option_context("display.float_format", "{:.2f}".format):
+        print(df_results.to_string())
+
+
+if __name__ == '__main__':
+    # Lineup of a sample festival
+    artist_names = pd.read_csv(
+        "output/sample_data/EdcOrlando2023Artists.csv"
+    )['Artist'].tolist()
+
+    # Compare clients with realistic latency, then with injected 429s
+    for rate_limit_prob in (0.0, 0.02):
+        print(
+            f"\n{len(artist_names)} artists, 50 +/- 20 ms latency, "
+            f"{rate_limit_prob:.0%} of requests rate limited:"
+        )
+        with SpotifyStubServer(
+            latency=0.05,
+            jitter=0.02,
+            rate_limit_prob=rate_limit_prob,
+            retry_after=1
+        ) as stub:
+            results = [
+                run_benchmark(stub, artist_names, max_workers=1),
+                run_benchmark(stub, artist_names, max_workers=8),
+                run_benchmark(stub, artist_names, use_async_client=True),
+            ]
+        print_benchmark_results(results)
@@ -0,0 +1,147 @@
+###############################################################################
+#
+# This file contains a benchmark harness for DataFrame operations on songs
+# (playlist_mods, playlist_analytics), on synthetic inputs of up to millions
+# of rows, so their scaling can be checked without any API requests:
+#   - make_synthetic_songs creates a df_songs of any size
+#   - time_function times a function's best of several runs
+#   - run_scaling_benchmark times a function on increasing input sizes and
+#      reports time per row, which stays flat if the function is linear
+#
+###############################################################################
+
+import time
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from playlist_mods import (
+    filter_songs_by_artist_popularity, remove_remixes_and_edits
+)
+from playlist_analytics import summarize_artists
+
+
+def make_synthetic_songs(
+    num_songs: int,
+    songs_per_artist: int = 10,
+    seed: int = 0
+) -> pd.DataFrame:
+    """
+    Creates a synthetic df_songs (same columns as
+    spotipy_utils.get_top_tracks), with each artist's songs in a row.
+
+    Parameters:
+        num_songs (int): Number of rows.
+        songs_per_artist (int): Number of songs of each artist.
+        seed (int): Random seed, so runs are reproducible.
+
+    Returns:
+        pd.DataFrame: Synthetic df_songs.
+    """
+
+    rng = np.random.default_rng(seed)
+    num_artists = -(-num_songs // songs_per_artist)
+    artist_keys = np.arange(num_songs) // songs_per_artist
+
+    # Artist info, repeated in each of the artist's song rows
+    artist_names = np.array(
+        [f"Artist {i:07d}" for i in range(num_artists)], dtype=object
+    )
+    artist_popularities = rng.integers(1, 101, num_artists)
+    genre_choices = [
+        ["EDM"], ["House", "Tech House"], ["Dubstep", "Brostep"], [],
+    ]
+    artist_genres = [
+        genre_choices[i] for i in rng.integers(0, 4, num_artists)
+    ]
+
+    # Song titles, with some remixes/edits of other songs by the artist
+    base_titles = rng.integers(0, songs_per_artist, num_songs)
+    is_remix = rng.random(num_songs) < 0.2
+    songs = [
+        f"Song {artist_key}-{title}" + (" - Remix" if remix else "")
+        for artist_key, title, remix in zip(artist_keys, base_titles, is_remix)
+    ]
+
+    return pd.DataFrame({
+        'Song': songs,
+        'Artist': artist_names[artist_keys],
+        'Song Popularity': rng.integers(1, 101, num_songs),
+        'Danceability': rng.random(num_songs, dtype=np.float32),
+        'Energy': rng.random(num_songs, dtype=np.float32),
+        'Tempo': rng.normal(125, 15, num_songs).astype(np.float32),
+        'Speechiness': rng.random(num_songs, dtype=np.float32) / 4,
+        'Song Duration': rng.integers(120_000, 360_000, num_songs),
+        'Artist Genres': [artist_genres[key] for key in artist_keys],
+        'Artist Popularity': artist_popularities[artist_keys],
+        'Artist uri': [f"artist{key:07d}" for key in artist_keys],
+        'Song uri': [f"song{i:09d}" for i in range(num_songs)],
+        'Artist Image url': None,
+    })
+
+
+def time_function(
+    func: Callable,
+    *args,
+    repeat: int = 3,
+    **kwargs
+) -> float:
+    """Returns the best wall time (seconds) of several calls of func."""
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+def run_scaling_benchmark(
+    func: Callable[[pd.DataFrame], Any],
+    sizes: List[int],
+    repeat: int = 3
+) -> List[Dict[str, Any]]:
+    """
+    Times func on synthetic df_songs of increasing sizes.
+
+    Parameters:
+        func (Callable[[pd.DataFrame], Any]): Function of df_songs.
+        sizes (List[int]): Numbers of rows.
+        repeat (int): Runs per size (the best is kept).
+
+    Returns:
+        List[Dict[str, Any]]: For each size: rows, seconds and nanoseconds
+            per row.
+    """
+
+    results = []
+    for size in sizes:
+        df_songs = make_synthetic_songs(size)
+        seconds = time_function(func, df_songs, repeat=repeat)
+        results.append({
+            "function": func.__name__,
+            "rows": size,
+            "seconds": seconds,
+            "ns_per_row": seconds / size * 1e9,
+        })
+
+    return results
+
+
+if __name__ == '__main__':
+    sizes = [125_000, 250_000, 500_000, 1_000_000]
+
+    # Artist summaries are per playlist: 500 artists / 5,000 songs and up
+    summary_sizes = [5_000, 10_000, 20_000, 40_000]
+
+    results = [
+        *run_scaling_benchmark(filter_songs_by_artist_popularity, sizes),
+        *run_scaling_benchmark(remove_remixes_and_edits, sizes),
+        *run_scaling_benchmark(summarize_artists, summary_sizes),
+    ]
+
+    df_results = pd.DataFrame(results)
+    with pd.option_context("display.float_format", "{:.3f}".format):
+        print(df_results.to_string(index=False))
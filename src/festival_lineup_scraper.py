@@ -1,37 +1,127 @@
-from typing import Tuple, List
+import re
+from typing import Dict, Tuple, List
+from concurrent.futures import ThreadPoolExecutor
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from http_transport import http_get
+from page_cache import PageCache
+
+# Parse with lxml if installed (much faster), else Python's html.parser
+try:
+    import lxml # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+# Request headers for songkick.com pages
+SCRAPER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:52.0) '
+    'Gecko/20100101 Firefox/52.0'
+}
+
+# Only the lineup (<ul class="festival">) is parsed: the page is sliced to
+# the lineup's tag when it can be found without parsing, and anything else
+# left is skipped by the parser
+LINEUP_STRAINER = SoupStrainer(
+    "ul", class_=re.compile(r"(?:^|\s)festival(?:\s|$)")
+)
+_LINEUP_START = re.compile(
+    rb"<ul\b[^>]*\bclass=[\"']?(?:[^\"'>]*\s)?festival[\s\"'>]",
+    re.IGNORECASE
+)
+
+
+def fetch_page(url: str, cache: PageCache = None) -> bytes:
+    """
+    Gets a web page's html. Cached pages are revalidated with a conditional
+    GET (If-None-Match/If-Modified-Since), so an unchanged page is reused
+    after a single 304 response with no body.
+
+    Parameters:
+        url (str): Page URL.
+        cache (PageCache, optional): Cache of previously retrieved pages.
 
-import requests
-from bs4 import BeautifulSoup
+    Returns:
+        bytes: Page html.
+    """
 
+    cached_body, validator_headers = cache.get(url) if cache else (None, {})
+    response = http_get(url, headers={**SCRAPER_HEADERS, **validator_headers})
+
+    # Edge case if page didn't change since it was cached
+    if response.status_code == 304 and cached_body is not None:
+        cache.touch(url)
+        return cached_body
+
+    response.raise_for_status()
+    if cache:
+        cache.set(
+            url,
+            response.content,
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified")
+        )
 
-def get_artist_names(songkick_url: str) -> Tuple[str, List[str]]:
+    return response.content
+
+
+def parse_artist_names(html: bytes) -> List[str]:
     """
-    Retrieves a list of artists performing in a specific music festival.
+    Extracts the artist names in a songkick.com festival page's lineup,
+    parsing only the lineup's <ul class="festival"> tag.
 
     Parameters:
-        songkick_url (str): The URL of the music festival page on Songkick.com.
+        html (bytes): Festival page html.
 
     Returns:
-        str: Festival name, extracted from the URL.
-        List[str]: Sorted list of artist names in festival lineup, extracted
-            from the user-provided festival web page.
+        List[str]: Artist names, in page order.
     """
 
-    # Get web page and its html contents using bs4
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:52.0) '
-        'Gecko/20100101 Firefox/52.0'
-    }
-    req = requests.get(songkick_url, headers)
-    soup = BeautifulSoup(req.content, 'html.parser')
+    # Slice the page to the lineup's tag, unless the lineup contains nested
+    # lists (then only the start of the page is skipped)
+    lineup_start = _LINEUP_START.search(html)
+    if lineup_start:
+        start = lineup_start.start()
+        end = html.find(b"</ul>", start)
+        if end == -1 or html.find(b"<ul", start + 1, end) != -1:
+            html = html[start:]
+        else:
+            html = html[start : end + len(b"</ul>")]
+
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=LINEUP_STRAINER)
 
     # Extract artist names from html
     html_ul_tag = soup.find("ul", class_="festival") # Tag with all artists
-    artist_names = [
+    if html_ul_tag is None:
+        raise ValueError("No festival lineup found in page.")
+
+    # html_a_tag sample: <a href="/artists/29315-foo-fighters">Foo Fighters</a>
+    return [
         html_a_tag.contents[0] for html_a_tag in html_ul_tag.find_all("a")
     ] # List of every artist in the web page's lineup
 
-    # html_a_tag sample: <a href="/artists/29315-foo-fighters">Foo Fighters</a>
+
+def get_artist_names(
+    songkick_url: str,
+    cache: PageCache = None
+) -> Tuple[str, List[str]]:
+    """
+    Retrieves a list of artists performing in a specific music festival.
+
+    Parameters:
+        songkick_url (str): The URL of the music festival page on Songkick.com.
+        cache (PageCache, optional): Cache of previously retrieved pages.
+            Cached pages are only downloaded again if they changed.
+
+    Returns:
+        str: Festival name, extracted from the URL.
+        List[str]: Sorted list of artist names in festival lineup, extracted
+            from the user-provided festival web page.
+    """
+
+    # Get web page (revalidating any cached copy) and parse its lineup
+    artist_names = parse_artist_names(fetch_page(songkick_url, cache))
 
     # Extract and format festival name from URL
     try:
@@ -45,6 +135,45 @@ def get_artist_names(songkick_url: str) -> Tuple[str, List[str]]:
     return festival_name, sorted(artist_names)
 
 
+def get_many_artist_names(
+    songkick_urls: List[str],
+    max_workers: int = 8,
+    cache: PageCache = None
+) -> Dict[str, Tuple[str, List[str]]]:
+    """
+    Retrieves the lineups of many music festivals concurrently. Festivals
+    whose page can't be retrieved or parsed are skipped (with a printed
+    warning).
+
+    Parameters:
+        songkick_urls (List[str]): URLs of music festival pages on
+            Songkick.com.
+        max_workers (int): Number of pages retrieved at once.
+        cache (PageCache, optional): Cache of previously retrieved pages.
+
+    Returns:
+        Dict[str, Tuple[str, List[str]]]: songkick_url -> (festival name,
+            sorted list of artist names), in songkick_urls order.
+    """
+
+    def scrape(songkick_url):
+        try:
+            return get_artist_names(songkick_url, cache)
+        except Exception as e: # Network error or unexpected page layout
+            print(f"Warning: Could not get lineup from {songkick_url} ({e}).")
+            return None
+
+    songkick_urls = list(dict.fromkeys(songkick_urls))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        lineups = list(executor.map(scrape, songkick_urls))
+
+    return {
+        songkick_url: lineup
+        for songkick_url, lineup in zip(songkick_urls, lineups)
+        if lineup is not None
+    }
+
+
 def test_get_artist_names(test_url=None):
     """
     Tests the get_artist_names function by fetching artist names and festival
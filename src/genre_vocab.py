@@ -0,0 +1,299 @@
+###############################################################################
+#
+# This file contains GenreVocabulary, which interns Spotify genres as int
+# IDs. Each raw genre (ex: 'uk garage') is capitalized once (see
+# spotipy_utils.capitalize_genre) and its display form ('UK Garage') is
+# cached, so artists' genres can be counted with np.bincount and filtered
+# with bitwise tests instead of comparing strings:
+#   - GenreList is an artist's genre list ('Artist Genres' cell) that also
+#      holds the genres' IDs, so each artist is encoded once, when
+#      df_artists is built or loaded
+#   - intern/intern_many get (or assign) the ID of raw genres
+#   - display_names gets the cached display form of genre IDs
+#   - encode gets the IDs of display-form genres
+#   - genre_list/encode_list build a GenreList from raw or display-form
+#      genres
+#   - top_genres counts genres across artists and returns the most common
+#   - genre_bitsets/has_any_genre test artists' genres against a set of
+#      genres, one bit per genre
+#   - get_default_genre_vocabulary returns the vocabulary shared by a run
+#
+###############################################################################
+
+from threading import Lock
+from typing import Callable, Iterable, List
+
+import numpy as np
+
+
+class GenreList(list):
+    """
+    Display-form genres of one artist, with their genre IDs (ids, int32)
+    and bitset (bits, an int with bit i set for genre ID i) from the
+    vocabulary that encoded them. Behaves as a plain list everywhere else
+    (CSV repr, Parquet, ", ".join), and rows of a df keep the same list
+    objects when filtered or joined, so genres are never re-encoded.
+    """
+
+    def __init__(
+        self,
+        genres: Iterable[str],
+        genre_ids: Iterable[int],
+        vocabulary: "GenreVocabulary"
+    ) -> None:
+        super().__init__(genres)
+        self.ids = np.asarray(genre_ids, dtype=np.int32)
+        self.bits = 0
+        for genre_id in self.ids.tolist():
+            self.bits |= 1 << genre_id
+        self.vocabulary = vocabulary
+
+
+    def __reduce__(self) -> tuple:
+        # Pickled (and deep copied) as a plain list: IDs are only valid
+        # within this process's vocabulary
+        return (list, (list(self),))
+
+
+class GenreVocabulary:
+    """
+    Interned genres. Genre IDs are assigned in order of first use and never
+    change, so IDs (and bitsets) from the same vocabulary can be compared.
+    """
+
+    def __init__(self, display_func: Callable[[str], str] = None) -> None:
+        """
+        Initializes the GenreVocabulary instance.
+
+        Parameters:
+            display_func (Callable[[str], str], optional): Converts a raw
+                genre to its display form. Defaults to capitalize_genre.
+        """
+
+        if display_func is None:
+            from spotipy_utils import capitalize_genre
+            display_func = capitalize_genre
+        self.display_func = display_func
+
+        self.raw_names = [] # Genre ID -> raw genre
+        self.names = [] # Genre ID -> display form
+        self.ids_by_raw = {}
+        self.ids_by_name = {}
+        self.lock = Lock() # Artist searches may run in a thread pool
+
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+    def _add(self, raw_genre: str, name: str) -> int:
+        """Assigns the next ID to a genre. Call with lock held."""
+
+        genre_id = len(self.names)
+        self.raw_names.append(raw_genre)
+        self.names.append(name)
+        self.ids_by_raw[raw_genre] = genre_id
+        self.ids_by_name.setdefault(name, genre_id)
+
+        return genre_id
+
+
+    def intern(self, raw_genre: str) -> int:
+        """Returns the ID of a raw Spotify genre, adding it if new."""
+
+        genre_id = self.ids_by_raw.get(raw_genre)
+        if genre_id is None:
+            with self.lock:
+                genre_id = self.ids_by_raw.get(raw_genre)
+                if genre_id is None:
+                    genre_id = self._add(
+                        raw_genre, self.display_func(raw_genre)
+                    )
+
+        return genre_id
+
+
+    def intern_many(self, raw_genres: Iterable[str]) -> List[int]:
+        """Returns the IDs of raw Spotify genres, adding any new ones."""
+        return [self.intern(raw_genre) for raw_genre in raw_genres]
+
+
+    def display_names(self, genre_ids: Iterable[int]) -> List[str]:
+        """Returns the cached display form of genre IDs."""
+        return [self.names[genre_id] for genre_id in genre_ids]
+
+
+    def encode(self, genres: Iterable[str]) -> List[int]:
+        """
+        Returns the IDs of display-form genres (ex: an artist's 'Artist
+        Genres'). Genres not seen before (ex: loaded from a saved CSV) are
+        added as is.
+
+        Parameters:
+            genres (Iterable[str]): Display-form genres.
+
+        Returns:
+            List[int]: Genre IDs.
+        """
+
+        genre_ids = []
+        for genre in genres:
+            genre_id = self.ids_by_name.get(genre)
+            if genre_id is None:
+                with self.lock:
+                    genre_id = self.ids_by_name.get(genre)
+                    if genre_id is None:
+                        genre_id = self._add(genre, genre)
+            genre_ids.append(genre_id)
+
+        return genre_ids
+
+
+    def genre_list(self, raw_genres: Iterable[str]) -> GenreList:
+        """Returns the display form of raw Spotify genres (ex: an artist's
+        'genres') as a GenreList, adding any new genres."""
+
+        genre_ids = self.intern_many(raw_genres)
+        return GenreList(self.display_names(genre_ids), genre_ids, self)
+
+
+    def encode_list(self, genres: Iterable[str]) -> GenreList:
+        """Returns display-form genres (ex: loaded from a saved CSV) as a
+        GenreList, adding any new genres (see encode)."""
+
+        if getattr(genres, "vocabulary", None) is self:
+            return genres
+        genres = list(genres)
+        return GenreList(genres, self.encode(genres), self)
+
+
+    def _genre_lists(
+        self,
+        genre_lists: Iterable[List[str]]
+    ) -> List[GenreList]:
+        """Returns each artist's genres as a GenreList of this vocabulary.
+        Stored GenreLists are used as is; other lists are encoded."""
+        return [
+            genres if getattr(genres, "vocabulary", None) is self
+            else self.encode_list(genres)
+            for genres in genre_lists
+        ]
+
+
+    def top_genres(
+        self,
+        genre_lists: Iterable[List[str]],
+        num_genres: int = 5
+    ) -> List[str]:
+        """
+        Gets the most common genres across artists, using one bincount
+        over every artist's stored genre IDs (see GenreList), so no genre
+        is looked up by name. Ties keep the order each genre first appears
+        in, same as collections.Counter.most_common.
+
+        Parameters:
+            genre_lists (Iterable[List[str]]): Display-form genres of each
+                artist (ex: df_artists['Artist Genres']).
+            num_genres (int): Max number of genres to return.
+
+        Returns:
+            List[str]: Up to num_genres display-form genres.
+        """
+
+        # Join every artist's int32 IDs into one array, without a Python
+        # loop over genres
+        all_genre_ids = np.frombuffer(
+            b"".join([
+                genres.ids for genres in self._genre_lists(genre_lists)
+            ]),
+            dtype=np.int32
+        )
+        if not len(all_genre_ids):
+            return []
+
+        # Count each genre and find where it first appears, then order by
+        # count, then by first appearance
+        counts = np.bincount(all_genre_ids)
+        first_positions = np.full(len(counts), len(all_genre_ids))
+        np.minimum.at(
+            first_positions, all_genre_ids, np.arange(len(all_genre_ids))
+        )
+        genre_ids = np.flatnonzero(counts)
+        order = np.lexsort(
+            (first_positions[genre_ids], -counts[genre_ids])
+        )
+
+        return self.display_names(genre_ids[order[:num_genres]])
+
+
+    def genre_bitsets(self, genre_lists: Iterable[List[str]]) -> np.ndarray:
+        """
+        Converts each artist's genres to a bitset (bit i is set if the
+        artist has genre ID i), stored as rows of 64-bit words.
+
+        Parameters:
+            genre_lists (Iterable[List[str]]): Display-form genres of each
+                artist.
+
+        Returns:
+            np.ndarray: uint64 array of shape (artists, words).
+        """
+
+        genre_lists = self._genre_lists(genre_lists)
+        all_genre_ids = np.frombuffer(
+            b"".join([genres.ids for genres in genre_lists]), dtype=np.int32
+        )
+        num_genres = [len(genres) for genres in genre_lists]
+
+        # Set each artist's genre bits, all artists at once
+        num_words = max(1, -(-len(self) // 64))
+        bitsets = np.zeros((len(genre_lists), num_words), dtype=np.uint64)
+        rows = np.repeat(np.arange(len(genre_lists)), num_genres)
+        bits = np.left_shift(
+            np.uint64(1), (all_genre_ids % 64).astype(np.uint64)
+        )
+        np.bitwise_or.at(bitsets, (rows, all_genre_ids // 64), bits)
+
+        return bitsets
+
+
+    def has_any_genre(
+        self,
+        genre_lists: Iterable[List[str]],
+        genres: Iterable[str]
+    ) -> np.ndarray:
+        """
+        Tests which artists have any of the given genres, with one bitwise
+        AND per artist against its stored bitset (see GenreList).
+
+        Parameters:
+            genre_lists (Iterable[List[str]]): Display-form genres of each
+                artist.
+            genres (Iterable[str]): Display-form genres to look for.
+
+        Returns:
+            np.ndarray: bool of each artist.
+        """
+
+        mask = self.encode_list(genres).bits
+
+        return np.array(
+            [
+                artist_genres.bits & mask != 0
+                for artist_genres in self._genre_lists(genre_lists)
+            ],
+            dtype=bool
+        )
+
+
+_default_genre_vocabulary = None
+
+
+def get_default_genre_vocabulary() -> GenreVocabulary:
+    """Returns the GenreVocabulary shared by the whole run, creating it on
+    first use."""
+
+    global _default_genre_vocabulary
+    if _default_genre_vocabulary is None:
+        _default_genre_vocabulary = GenreVocabulary()
+    return _default_genre_vocabulary
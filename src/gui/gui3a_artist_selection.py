@@ -9,6 +9,7 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt
 
+from playlist_io import load_df
 from gui.gui_components import (
     ArtistSelectionButton, ColorScheme, CustomProceedButton
 )
@@ -491,8 +492,7 @@ def launch_gui_artist_selection(
 
 
 if __name__ == "__main__":
-    df_artists = pd.read_csv("output/sample_data/ElectricZoo2023Artists.csv")
-    df_artists['Artist Genres'] = df_artists['Artist Genres'].apply(eval)
+    df_artists = load_df("output/sample_data/ElectricZoo2023Artists.csv")
     print(f"df_artists loaded with len: {len(df_artists)}")
 
     festival_name = "Electric Zoo 2023"
@@ -1,6 +1,5 @@
 import sys
 from typing import List, Tuple
-from collections import Counter
 
 import pandas as pd
 from PyQt5.QtWidgets import (
@@ -9,6 +8,8 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt
 
+from genre_vocab import get_default_genre_vocabulary
+from playlist_io import load_df
 from gui.gui_components import (
     ColorScheme, CustomProceedButton, YesNoRadioButtons
 )
@@ -438,18 +439,10 @@ class PlaylistGenSongCustomizationGui(QWidget):
             List[str]: Top recurring artist genres in df. List of up to 5.
         """
 
-        # Flattened list of all genres for all artists. Includes repeat genres.
-        all_genres = [
-            genre
-            for genres in self.df_artists['Artist Genres']
-            for genre in genres
-        ]
-
         # Get top 5 recurring genres across all artists
-        counter = Counter(all_genres)
-        top_genres = [
-            genre for genre, count in counter.most_common(5)
-        ] # List of up to 5 genres
+        top_genres = get_default_genre_vocabulary().top_genres(
+            self.df_artists['Artist Genres'], 5
+        ) # List of up to 5 genres
 
         return top_genres
 
@@ -505,11 +498,8 @@ def launch_gui_song_customization(
 # Automatically launch GUI if this file executed as main script
 if __name__ == "__main__":
 
-    # Import df then change string representation (from .csv) of genres to list
-    df_artists = pd.read_csv(
-        "output/sample_data/EdcOrlando2023Artists.csv"
-    )
-    df_artists['Artist Genres'] = df_artists['Artist Genres'].apply(eval)
+    # Import df, parsing string representation (from .csv) of genres to list
+    df_artists = load_df("output/sample_data/EdcOrlando2023Artists.csv")
     festival_name = "Edc Orlando 2023"
     print(
         f"df_artists loaded for '{festival_name}' with len: {len(df_artists)}"
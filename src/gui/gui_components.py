@@ -1,6 +1,5 @@
 from typing import List, Tuple, Callable
 
-import requests
 import numpy as np
 import cv2
 from PyQt5.QtWidgets import (
@@ -10,6 +9,8 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QBrush, QImage, QPainter, QPainterPath, QPixmap
 
+from http_transport import http_get
+
 class ColorScheme:
     """A class to manage the color scheme for GUIs. Based off Spotify."""
 
@@ -437,7 +438,7 @@ class ArtistSelectionButton(QPushButton):
     def img_url_to_array(self, img_url: str) -> np.array:
         """Fetches image from given URL and converts it to a NumPy array."""
         
-        response = requests.get(img_url)
+        response = http_get(img_url)
         img_array = np.asarray(bytearray(response.content), dtype=np.uint8)
         img = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
 
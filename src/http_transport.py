@@ -0,0 +1,226 @@
+###############################################################################
+#
+# This file contains the shared HTTP transport used for every non-Spotipy
+# request (Spotify token and search requests, songkick.com scraping and
+# artist image downloads):
+#   - get_session returns one shared requests.Session, with keep-alive
+#      connection pools per host, gzip and retries on transient errors (or
+#      a second shared session without retries, for Spotify API requests
+#      retried by retry_engine.RetryEngine)
+#   - create_session returns a new session with the same pools but no
+#      retries, for Spotipy clients (retried by retry_engine.RetryEngine)
+#   - configure_transport changes timeouts, pool sizes and retries
+#   - http_get and http_post make requests through the shared session,
+#      with default connect/read timeouts. http_get(retry=False) skips
+#      urllib3 retries, for requests already wrapped in a RetryEngine.
+#   - get_spotify_api_url and get_spotify_accounts_url return the Spotify
+#      base urls, which can be pointed at a local stand-in server (see
+#      spotify_stub_server) with the SPOTIFY_API_URL and
+#      SPOTIFY_ACCOUNTS_URL environment variables
+#
+###############################################################################
+
+import os
+import threading
+from typing import Any, Dict, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Transport settings. Timeouts are (connect, read) in seconds.
+TRANSPORT_SETTINGS = {
+    "timeout": (3.05, 15),
+    "pool_connections": 10, # Number of hosts to keep connection pools for
+    "pool_maxsize": 32, # Keep-alive connections per host (~max threads)
+    "retries": 3,
+    "backoff_factor": 0.3,
+}
+
+_session = None
+_no_retry_session = None # For requests retried by RetryEngine
+_session_lock = threading.Lock()
+
+
+def _build_session(retry_requests: bool = True) -> requests.Session:
+    """Creates a session with pooled adapters for http/https, retrying
+    transient errors unless retry_requests is False."""
+
+    # Retry connection errors and transient 5xx responses, of idempotent
+    # requests only (urllib3's default methods), so a retry never repeats
+    # a POST. 429s are not retried here since they're handled by the
+    # Spotify retry logic (urllib3 would otherwise retry any 429 with a
+    # Retry-After header).
+    if retry_requests:
+        retry = Retry(
+            total=TRANSPORT_SETTINGS["retries"],
+            backoff_factor=TRANSPORT_SETTINGS["backoff_factor"],
+            status_forcelist=(500, 502, 503, 504),
+            respect_retry_after_header=False,
+            raise_on_status=False # Return last response instead of raising
+        )
+    else:
+        retry = Retry(0, read=False) # Same as requests' default adapter
+    adapter = HTTPAdapter(
+        pool_connections=TRANSPORT_SETTINGS["pool_connections"],
+        pool_maxsize=TRANSPORT_SETTINGS["pool_maxsize"],
+        max_retries=retry
+    )
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Accept-Encoding": "gzip, deflate"})
+
+    return session
+
+
+def get_session(retry_requests: bool = True) -> requests.Session:
+    """
+    Returns the shared session, creating it on first use.
+
+    Parameters:
+        retry_requests (bool): Flag indicating whether the session retries
+            transient errors. Spotify API requests made through a
+            RetryEngine use the session without retries, so each attempt
+            is one request and 5xx responses reach its circuit breaker.
+
+    Returns:
+        requests.Session: Session shared by every caller (and thread).
+    """
+
+    global _session, _no_retry_session
+    with _session_lock:
+        if retry_requests:
+            if _session is None:
+                _session = _build_session()
+            return _session
+
+        if _no_retry_session is None:
+            _no_retry_session = _build_session(retry_requests=False)
+        return _no_retry_session
+
+
+def create_session() -> requests.Session:
+    """
+    Creates a new (not shared) session with the transport settings, but
+    without retries. Used for Spotipy clients, which close their session
+    when garbage collected. Their requests are only retried by RetryEngine
+    (see spotipy_utils.retry_spotify_request), so retry policy lives in one
+    layer and non-idempotent requests (ex: adding songs to a playlist) are
+    never repeated by urllib3.
+
+    Parameters:
+        None
+
+    Returns:
+        requests.Session: New session.
+    """
+    return _build_session(retry_requests=False)
+
+
+def configure_transport(**settings: Any) -> None:
+    """
+    Updates transport settings (see TRANSPORT_SETTINGS) and rebuilds the
+    shared sessions so new pool/retry settings take effect.
+
+    Parameters:
+        **settings: Any of timeout, pool_connections, pool_maxsize,
+            retries, backoff_factor.
+
+    Returns:
+        None
+
+    Ex: configure_transport(timeout=(2, 30), pool_maxsize=64)
+    """
+
+    global _session, _no_retry_session
+    unknown = set(settings) - set(TRANSPORT_SETTINGS)
+    if unknown:
+        raise ValueError(f"Unknown transport settings: {sorted(unknown)}")
+
+    with _session_lock:
+        TRANSPORT_SETTINGS.update(settings)
+        if _session is not None:
+            _session.close()
+        if _no_retry_session is not None:
+            _no_retry_session.close()
+        _session = _build_session()
+        _no_retry_session = None # Rebuilt on next use
+
+
+def http_get(
+    url: str,
+    params: Dict[str, Any] = None,
+    headers: Dict[str, str] = None,
+    timeout: Tuple[float, float] = None,
+    retry: bool = True
+) -> requests.Response:
+    """
+    Makes a GET request through the shared session.
+
+    Parameters:
+        url (str): Request URL.
+        params (Dict[str, Any], optional): Query parameters.
+        headers (Dict[str, str], optional): Request headers.
+        timeout (Tuple[float, float], optional): (connect, read) timeouts.
+            Defaults to TRANSPORT_SETTINGS["timeout"].
+        retry (bool): Flag indicating whether transient errors are retried
+            by urllib3. False for requests already retried by a RetryEngine
+            (ex: Spotify API requests), so retries are never stacked.
+
+    Returns:
+        requests.Response: Response of the request.
+    """
+
+    return get_session(retry_requests=retry).get(
+        url,
+        params=params,
+        headers=headers,
+        timeout=timeout or TRANSPORT_SETTINGS["timeout"]
+    )
+
+
+def http_post(
+    url: str,
+    data: Dict[str, Any] = None,
+    headers: Dict[str, str] = None,
+    timeout: Tuple[float, float] = None
+) -> requests.Response:
+    """
+    Makes a POST request through the shared session.
+
+    Parameters:
+        url (str): Request URL.
+        data (Dict[str, Any], optional): Form data.
+        headers (Dict[str, str], optional): Request headers.
+        timeout (Tuple[float, float], optional): (connect, read) timeouts.
+            Defaults to TRANSPORT_SETTINGS["timeout"].
+
+    Returns:
+        requests.Response: Response of the request.
+    """
+
+    return get_session().post(
+        url,
+        data=data,
+        headers=headers,
+        timeout=timeout or TRANSPORT_SETTINGS["timeout"]
+    )
+
+
+def get_spotify_api_url() -> str:
+    """Returns the Spotify Web API base url (no trailing slash). Defaults to
+    https://api.spotify.com/v1, overridden by SPOTIFY_API_URL."""
+    return os.getenv(
+        "SPOTIFY_API_URL", "https://api.spotify.com/v1"
+    ).rstrip("/")
+
+
+def get_spotify_accounts_url() -> str:
+    """Returns the Spotify accounts service base url (no trailing slash).
+    Defaults to https://accounts.spotify.com, overridden by
+    SPOTIFY_ACCOUNTS_URL."""
+    return os.getenv(
+        "SPOTIFY_ACCOUNTS_URL", "https://accounts.spotify.com"
+    ).rstrip("/")
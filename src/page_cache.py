@@ -0,0 +1,125 @@
+###############################################################################
+#
+# This file contains PageCache, a persistent SQLite cache of scraped web
+# pages (ex: songkick.com festival pages), so a lineup that hasn't changed
+# is never downloaded again (see festival_lineup_scraper.fetch_page):
+#   - get returns a cached page body and the conditional GET headers
+#      (If-None-Match/If-Modified-Since) to revalidate it with
+#   - set stores a page body with its ETag and Last-Modified validators
+#   - touch marks a cached page as revalidated after a 304 response
+#
+###############################################################################
+
+import os
+import time
+import sqlite3
+import threading
+from typing import Dict, Tuple
+
+
+class PageCache:
+    """
+    Persistent, SQLite-backed cache of scraped web pages (ex: songkick.com
+    festival pages), keyed by URL. Each page body is stored with its ETag
+    and Last-Modified validators, so it can be revalidated with a
+    conditional GET: an unchanged page costs one 304 response with no body.
+    Safe to share between worker threads.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "output/cache/page_cache.sqlite"
+    ) -> None:
+        """
+        Initializes the PageCache instance.
+
+        Parameters:
+            db_path (str): Path of the SQLite database file.
+        """
+
+        self.lock = threading.Lock()
+
+        # Create directory for the database if it DNE yet
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL
+            );
+            """
+        )
+
+
+    def get(self, url: str) -> Tuple[bytes, Dict[str, str]]:
+        """
+        Looks up a cached page.
+
+        Parameters:
+            url (str): Page URL.
+
+        Returns:
+            bytes: Cached page body, or None if the page isn't cached.
+            Dict[str, str]: Conditional GET headers (If-None-Match and/or
+                If-Modified-Since) to revalidate the cached body.
+        """
+
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT body, etag, last_modified FROM pages WHERE url = ?",
+                (url,)
+            ).fetchone()
+        if row is None:
+            return None, {}
+
+        body, etag, last_modified = row
+        validator_headers = {}
+        if etag:
+            validator_headers["If-None-Match"] = etag
+        if last_modified:
+            validator_headers["If-Modified-Since"] = last_modified
+
+        return body, validator_headers
+
+
+    def set(
+        self,
+        url: str,
+        body: bytes,
+        etag: str = None,
+        last_modified: str = None
+    ) -> None:
+        """
+        Stores a page body with its validators (from the ETag and
+        Last-Modified response headers).
+
+        Parameters:
+            url (str): Page URL.
+            body (bytes): Page body.
+            etag (str, optional): ETag response header.
+            last_modified (str, optional): Last-Modified response header.
+        """
+
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)",
+                (url, body, etag, last_modified, time.time())
+            )
+
+
+    def touch(self, url: str) -> None:
+        """Marks a cached page as revalidated (ex: after a 304)."""
+
+        with self.lock, self.conn:
+            self.conn.execute(
+                "UPDATE pages SET fetched_at = ? WHERE url = ?",
+                (time.time(), url)
+            )
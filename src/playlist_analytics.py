@@ -1,10 +1,64 @@
 import os
+import multiprocessing
 from datetime import datetime
-from typing import List, Dict
-from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, List, Dict, Tuple
 
+import numpy as np
 import pandas as pd
-import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.io.json import to_json_plotly
+from plotly.offline import get_plotlyjs
+
+from genre_vocab import get_default_genre_vocabulary
+from playlist_io import load_df
+
+# A bunch of custom colors for plotting, one per artist (in order of first
+# appearance in df_songs)
+ARTIST_COLORS = [
+    0x00FF00, 0xFF0000, 0x0000FF,  # Vibrant primary colors
+    0xFFA500, 0x800080, 0x8B0000,  # Orange, Purple, Dark Red
+    0x008080, 0x008000, 0x9ACD32,  # Teal, Green, Yellow Green
+    0x000080, 0x808080, 0x8000FF,  # Navy, Grey, Indigo
+    0xFF00FF, 0x00FFFF, 0xFFFF00,  # Magenta, Cyan, Yellow
+    0xFF6347, 0x4682B4, 0x800000,  # Tomato, Steel Blue, Maroon
+    0x556B2F, 0xFF69B4, 0x9932CC,  # Olive Green, Hot Pink, Dark Orchid
+    0x483D8B, 0x32CD32, 0xFF4500,  # Dark Blue, Lime Green, Orange Red
+    0x9400D3, 0x00CED1, 0x2E8B57,  # Dark Violet, Dark Turquoise, Sea Green
+    0x7FFF00, 0x6A5ACD, 0xDC143C,  # Chartreuse, Slate Blue, Crimson
+    0x8A2BE2, 0xFF8C00, 0xFFD700,  # Blue Violet, Dark Orange, Gold
+    0x000000, 0xB22222, 0x8B4513,  # Black, Firebrick, Saddle Brown
+    0xADFF2F, 0x8B008B,            # Green Yellow, Dark Magenta
+    0xFF1493, 0x228B22             # Deep Pink, Forest Green
+]
+
+# Min number of songs for feature plots to be saved in a process pool (see
+# create_feature_plots)
+PARALLEL_PLOTS_MIN_SONGS = 5_000
+
+# Feature plots with more points than this are rendered with WebGL
+# (same threshold as px.scatter)
+WEBGL_MIN_POINTS = 1000
+
+# Feature plots of more songs than this are downsampled to about this many
+# points (see downsample_plot_data)
+DOWNSAMPLE_MAX_POINTS = 10_000
+
+# Number of bins per axis used by downsample_plot_data
+DOWNSAMPLE_BINS = 50
+
+# Max number of artists with their own trace (and legend entry) in a
+# downsampled plot. Later artists share one "Other artists" trace.
+DOWNSAMPLE_MAX_ARTISTS = 50
+OTHER_ARTISTS_COLOR = "#b4b4b4"
+
+# Songs with any feature more than this many standard deviations from its
+# mean are never dropped by downsample_plot_data
+OUTLIER_Z_SCORE = 3.0
+
+# Dashboard styles, inlined by create_single_file_dashboard
+DASHBOARD_STYLE_PATH = "output/created_playlists/styles/dashboard_style.css"
 
 
 def create_playlist_summary(
@@ -47,18 +101,12 @@ def create_playlist_summary(
             f"{playlist_duration_mins % 60} min"
         )
 
-    # Flattened list of all genres across all artists, including repeat genres
-    unique_artists = df_songs.drop_duplicates(subset='Artist', keep='first')
-    all_genres = [
-        genre for genres in unique_artists['Artist Genres'] for genre in genres
-    ]
-
     # Get top 5 recurring genres in the playlist based on artists
     # (not accounting for # songs by each artist, which was a design choice)
-    counter = Counter(all_genres)
-    top_genres = [
-        genre for genre, count in counter.most_common(5)
-    ] # List of up to 5 genres
+    unique_artists = df_songs.drop_duplicates(subset='Artist', keep='first')
+    top_genres = get_default_genre_vocabulary().top_genres(
+        unique_artists['Artist Genres'], 5
+    ) # List of up to 5 genres
     top_genres_str = ", ".join(top_genres)
 
     # Generate a string of recommended artists
@@ -72,62 +120,81 @@ def create_playlist_summary(
     }
 
 
-def create_artist_summary(
-        df_songs: pd.DataFrame,
-        festival_name: str
-) -> pd.DataFrame:
+def summarize_artists(df_songs: pd.DataFrame) -> pd.DataFrame:
     """
-    Generate a summary of artist information from a DataFrame and save it to
-        an HTML file.
+    Summarizes each artist's songs (see create_artist_summary), in one
+    groupby pass over df_songs. df_songs is not modified.
 
     Parameters:
         df_songs (pd.DataFrame): DataFrame containing song and artist info.
-        festival_name (str): Name of the music festival.
 
     Returns:
-        pd.DataFrame: DataFrame containing summary information for each artist.
+        pd.DataFrame: DataFrame containing summary information for each
+            artist, in order of first appearance.
     """
-    
-    # Get unique artists in the DataFrame
-    unique_artists = df_songs["Artist"].unique()
 
-    # Create a DataFrame to store artist summary information
-    artist_summary_data = []
+    # Join each song's genre list into a string (without modifying
+    # df_songs), then keep each artist's unique genre strings
+    genre_strs = df_songs['Artist Genres'].map(", ".join)
+    artist_genres = (
+        pd.DataFrame({"Artist": df_songs["Artist"], "Genres": genre_strs})
+        .drop_duplicates()
+        .groupby("Artist", sort=False)["Genres"]
+        .agg("\n".join)
+    )
 
-    # Convert lists in genres column to strings
-    df_songs['Artist Genres'] = (
-        df_songs['Artist Genres'].apply(", ".join)
+    # For each artist, get summary of each column in one groupby pass,
+    # including number of tracks, mean for all track features, total runtime
+    artist_stats = df_songs.groupby("Artist", sort=False).agg(
+        num_songs=("Song Duration", "size"),
+        runtime_ms=("Song Duration", "sum"),
+        popularity=("Artist Popularity", "first"),
+        avg_tempo=("Tempo", "mean"),
+        avg_danceability=("Danceability", "mean"),
+        avg_energy=("Energy", "mean"),
+        avg_speechiness=("Speechiness", "mean"),
+    )
+    runtime_sec = artist_stats["runtime_ms"] // 1000
+    runtime_strs = (
+        (runtime_sec // 60).astype(str) + " min "
+        + (runtime_sec % 60).astype(str) + " sec"
     )
 
-    # For each artist, get summary of each column, including number of tracks,
-    # mean for all track features, total runtime
-    for artist in unique_artists:
-        artist_data = df_songs[df_songs["Artist"] == artist]
-        genres = artist_data["Artist Genres"].unique()
-        num_songs = len(artist_data)
-        runtime_sec = artist_data["Song Duration"].sum() // 1000
-        runtime_str = f"{runtime_sec // 60} min {runtime_sec % 60} sec"
-        popularity = artist_data["Artist Popularity"].iloc[0]
-        avg_tempo = int(artist_data["Tempo"].mean())
-        avg_danceability = round(artist_data["Danceability"].mean(), 2)
-        avg_energy = round(artist_data["Energy"].mean(), 2)
-        avg_speechiness = round(artist_data["Speechiness"].mean(), 2)
-
-        # Append summary data for current artist
-        artist_summary_data.append({
-            "Artist": artist,
-            "Total Songs": num_songs,
-            "Total Runtime": runtime_str,
-            "Artist Popularity (0-100)": popularity,
-            "Artist Genres": "\n".join(genres),
-            "Average Tempo (bpm)": avg_tempo,
-            "Average Danceability (0-1)": avg_danceability,
-            "Average Energy (0-1)": avg_energy,
-            "Average Speechiness (0-1)": avg_speechiness
-        })
+    # Create a DataFrame from summary data, in order of first appearance
+    artist_summary_df = pd.DataFrame({
+        "Artist": artist_stats.index,
+        "Total Songs": artist_stats["num_songs"].to_numpy(),
+        "Total Runtime": runtime_strs.to_numpy(),
+        "Artist Popularity (0-100)": artist_stats["popularity"].to_numpy(),
+        "Artist Genres": artist_genres.reindex(artist_stats.index).to_numpy(),
+        "Average Tempo (bpm)": (
+            artist_stats["avg_tempo"].astype(int).to_numpy()
+        ),
+        "Average Danceability (0-1)": (
+            artist_stats["avg_danceability"].round(2).to_numpy()
+        ),
+        "Average Energy (0-1)": (
+            artist_stats["avg_energy"].round(2).to_numpy()
+        ),
+        "Average Speechiness (0-1)": (
+            artist_stats["avg_speechiness"].round(2).to_numpy()
+        ),
+    })
+
+    return artist_summary_df
+
+
+def artist_summary_to_html(artist_summary_df: pd.DataFrame) -> str:
+    """
+    Converts an artist summary (see summarize_artists) to a styled HTML
+    table, as shown in the dashboard.
+
+    Parameters:
+        artist_summary_df (pd.DataFrame): Summary of each artist.
 
-    # Create a DataFrame from summary data
-    artist_summary_df = pd.DataFrame(artist_summary_data)
+    Returns:
+        str: HTML of the table, in a div with a scrollbar.
+    """
 
     # Convert DataFrame to HTML with left-aligned columns
     html_content = artist_summary_df.to_html(index=False, justify='left')
@@ -165,6 +232,28 @@ def create_artist_summary(
     # Wrap the current HTML content with a div for overflow/scrollbar
     html_content = f'<div style="overflow: auto;">{html_content}</div>'
 
+    return html_content
+
+
+def create_artist_summary(
+        df_songs: pd.DataFrame,
+        festival_name: str
+) -> pd.DataFrame:
+    """
+    Generate a summary of artist information from a DataFrame and save it to
+        an HTML file.
+
+    Parameters:
+        df_songs (pd.DataFrame): DataFrame containing song and artist info.
+        festival_name (str): Name of the music festival.
+
+    Returns:
+        pd.DataFrame: DataFrame containing summary information for each artist.
+    """
+
+    artist_summary_df = summarize_artists(df_songs)
+    html_content = artist_summary_to_html(artist_summary_df)
+
     # Save the artist summary DataFrame to an HTML file
     today = datetime.now().strftime("%Y-%m-%d")
     file_dir = (
@@ -182,113 +271,268 @@ def create_artist_summary(
     return artist_summary_df
 
 
-def create_feature_plots(
+def extract_plot_data(
     df_songs: pd.DataFrame,
-    festival_name: str,
-    x_axis: str="Song Popularity",
-    y_axis: List[str]=["Tempo", "Danceability", "Energy", "Speechiness"]
-) -> Dict[str, str]:
+    x_axis: str,
+    y_axis: List[str]
+) -> Dict[str, Any]:
     """
-    Generate scatter plots, perform feature analysis, and save plots as
-        HTML files.
+    Extracts everything the feature plots need from df_songs, once, as NumPy
+    arrays (shared by every plot, instead of each plot re-reading df_songs).
 
     Parameters:
         df_songs (pd.DataFrame): DataFrame containing song and artist info.
-        festival_name (str): Name of the music festival.
         x_axis (str): Feature to be plotted on the x-axis.
-        y_axis (List[str]): List of features to be plotted on the y-axis.
-            Can also be a single string.
+        y_axis (List[str]): Features to be plotted on the y-axis.
 
     Returns:
-        Dict[str, str]: Dictionary containing feature trend summary info.
+        Dict[str, Any]: x values, y values of each feature, song names and
+            artist groups (artist names, colors, and the row indices of
+            each artist's songs), with artists in order of first appearance.
     """
-    
-    # Get unique artists in the DataFrame
-    unique_artists = df_songs["Artist"].unique()
-
-    # A bunch of custom colors for plotting
-    colors = [
-        0x00FF00, 0xFF0000, 0x0000FF,  # Vibrant primary colors
-        0xFFA500, 0x800080, 0x8B0000,  # Orange, Purple, Dark Red
-        0x008080, 0x008000, 0x9ACD32,  # Teal, Green, Yellow Green
-        0x000080, 0x808080, 0x8000FF,  # Navy, Grey, Indigo
-        0xFF00FF, 0x00FFFF, 0xFFFF00,  # Magenta, Cyan, Yellow
-        0xFF6347, 0x4682B4, 0x800000,  # Tomato, Steel Blue, Maroon
-        0x556B2F, 0xFF69B4, 0x9932CC,  # Olive Green, Hot Pink, Dark Orchid
-        0x483D8B, 0x32CD32, 0xFF4500,  # Dark Blue, Lime Green, Orange Red
-        0x9400D3, 0x00CED1, 0x2E8B57,  # Dark Violet, Dark Turquoise, Sea Green
-        0x7FFF00, 0x6A5ACD, 0xDC143C,  # Chartreuse, Slate Blue, Crimson
-        0x8A2BE2, 0xFF8C00, 0xFFD700,  # Blue Violet, Dark Orange, Gold
-        0x000000, 0xB22222, 0x8B4513,  # Black, Firebrick, Saddle Brown
-        0xADFF2F, 0x8B008B,            # Green Yellow, Dark Magenta
-        0xFF1493, 0x228B22             # Deep Pink, Forest Green
+
+    # Group rows by artist, in order of first appearance: one stable sort,
+    # then each artist's rows are a slice of the sorted row indices
+    artist_codes, artist_names = pd.factorize(df_songs["Artist"])
+    order = np.argsort(artist_codes, kind="stable")
+    group_ends = np.cumsum(
+        np.bincount(artist_codes, minlength=len(artist_names))
+    )
+    group_starts = np.concatenate(([0], group_ends[:-1]))
+
+    # Custom colors for the first artists, then the plotly template colors
+    # (same assignment as px.scatter with a color_discrete_map)
+    default_colors = pio.templates["plotly"].layout.colorway
+    artist_colors = [
+        f"#{ARTIST_COLORS[i]:06x}" if i < len(ARTIST_COLORS)
+        else default_colors[i % len(default_colors)]
+        for i in range(len(artist_names))
     ]
 
-    # Map colors to be used in plot legend
-    color_map = {
-        artist: f"#{i:06x}" for artist, i in zip(unique_artists, colors)
+    return {
+        "x": df_songs[x_axis].to_numpy(),
+        "y": {feature: df_songs[feature].to_numpy() for feature in y_axis},
+        "songs": df_songs["Song"].to_numpy(dtype=object),
+        "artists": list(artist_names),
+        "colors": artist_colors,
+        "groups": [
+            order[start:end] for start, end in zip(group_starts, group_ends)
+        ],
     }
 
-    # If a single y is entered as a string, convert it to list
-    # Allows this function to be used for generating other plots in the future
-    if isinstance(y_axis, str):
-        y_axis = [y_axis]
+
+def _bin_values(values: np.ndarray, num_bins: int) -> np.ndarray:
+    """Returns the bin (0 to num_bins - 1, equal widths between the min and
+    max) of each value, and num_bins for missing values."""
+
+    values = values.astype(np.float64)
+    is_finite = np.isfinite(values)
+    if not is_finite.any():
+        return np.full(len(values), num_bins)
+
+    low = values[is_finite].min()
+    span = values[is_finite].max() - low or 1.0
+    with np.errstate(invalid="ignore"):
+        bins = np.floor((values - low) / span * num_bins)
+
+    return np.where(
+        is_finite, np.clip(bins, 0, num_bins - 1), num_bins
+    ).astype(np.int64)
+
+
+def downsample_plot_data(
+    plot_data: Dict[str, Any],
+    max_points: int = DOWNSAMPLE_MAX_POINTS,
+    num_bins: int = DOWNSAMPLE_BINS,
+    outlier_z_score: float = OUTLIER_Z_SCORE,
+    max_artists: int = DOWNSAMPLE_MAX_ARTISTS
+) -> Dict[str, Any]:
+    """
+    Reduces the songs of extract_plot_data's arrays to about max_points, so
+    plots of very large playlists stay small and interactive, while looking
+    the same. One set of songs is kept for every plot, so the x values and
+    song names can still be shared.
+
+    For each feature, songs are binned on a num_bins x num_bins grid of
+    (x, feature), and each bin keeps the same fraction of its songs (at
+    least one), so dense and sparse regions keep their relative density.
+    Outliers (any value more than outlier_z_score standard deviations from
+    its mean) and the min/max of each axis are always kept. Artists after
+    the first max_artists are merged into one "Other artists" trace (with
+    each song's artist in its hover info), since thousands of traces would
+    freeze the browser as much as thousands of points.
+
+    Parameters:
+        plot_data (Dict[str, Any]): See extract_plot_data.
+        max_points (int): Max number of songs before downsampling, and
+            about the number of songs kept.
+        num_bins (int): Number of bins per axis.
+        outlier_z_score (float): Min z-score of songs always kept.
+        max_artists (int): Max number of artists with their own trace.
+
+    Returns:
+        Dict[str, Any]: Same format as plot_data (plot_data itself if it has
+            at most max_points songs), plus "other_artists" (artist of each
+            song of the last group) if artists were merged.
+    """
+
+    x = plot_data["x"]
+    num_songs = len(x)
+    if num_songs <= max_points:
+        return plot_data
+
+    # Random priority of each song (same for every feature, so the songs
+    # kept for each feature mostly overlap), seeded for repeatable plots
+    priority = np.random.default_rng(0).permutation(num_songs)
+    keep = np.zeros(num_songs, dtype=bool)
+    x_bins = _bin_values(x, num_bins)
+    features = list(plot_data["y"])
+    budget = max(max_points // len(features), 1)
+    for values in [x, *plot_data["y"].values()]:
+        values = values.astype(np.float64)
+        if not np.isfinite(values).any():
+            continue
+
+        # Keep outliers, and the min/max (so axis ranges don't change)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            z_scores = np.abs(values - np.nanmean(values)) / np.nanstd(values)
+        keep |= z_scores > outlier_z_score
+        keep[[np.nanargmin(values), np.nanargmax(values)]] = True
+
+    for feature in features:
+        # Cell of each song in the (x, feature) grid
+        cells = x_bins * (num_bins + 1) + _bin_values(
+            plot_data["y"][feature], num_bins
+        )
+        cell_counts = np.bincount(cells, minlength=(num_bins + 1) ** 2)
+        cell_quotas = np.ceil(cell_counts * budget / num_songs)
+
+        # Keep each cell's highest priority songs, up to its quota
+        order = np.lexsort((priority, cells))
+        sorted_cells = cells[order]
+        cell_starts = np.cumsum(cell_counts) - cell_counts
+        rank_in_cell = np.arange(num_songs) - cell_starts[sorted_cells]
+        keep[order[rank_in_cell < cell_quotas[sorted_cells]]] = True
+
+    # Subset every array, and renumber each artist's rows
+    kept_rows = np.flatnonzero(keep)
+    new_rows = np.cumsum(keep) - 1
+    groups = [new_rows[rows[keep[rows]]] for rows in plot_data["groups"]]
+    downsampled_data = {
+        **plot_data,
+        "x": x[kept_rows],
+        "y": {
+            feature: values[kept_rows]
+            for feature, values in plot_data["y"].items()
+        },
+        "songs": plot_data["songs"][kept_rows],
+        "groups": groups,
+    }
+
+    # Merge the songs of later artists into one group
+    if len(groups) > max_artists:
+        other_groups = groups[max_artists:]
+        other_artists = plot_data["artists"][max_artists:]
+        downsampled_data.update({
+            "artists": [*plot_data["artists"][:max_artists], "Other artists"],
+            "colors": [
+                *plot_data["colors"][:max_artists], OTHER_ARTISTS_COLOR
+            ],
+            "groups": [*groups[:max_artists], np.concatenate(other_groups)],
+            "other_artists": np.repeat(
+                np.array(other_artists, dtype=object),
+                [len(rows) for rows in other_groups]
+            ),
+        })
+
+    return downsampled_data
+
+
+def analyze_feature_trend(
+    values: np.ndarray,
+    feature: str
+) -> Tuple[float, float, int]:
+    """
+    Finds the range around a feature's mean, and the percent of songs in it.
+
+    Parameters:
+        values (np.ndarray): Feature value of each song.
+        feature (str): Feature name.
+
+    Returns:
+        float: Lower bound of the range.
+        float: Upper bound of the range.
+        int: Percent of songs within the range.
+    """
+
+    # Define a 30 BPM range since most genres are characterized by ranges.
+    # of 20-30 BPM. This design decision based on researching genre norms.
+    if feature == 'Tempo':
+        feature_range = 30
+
+    # Define a 0.3 range for the 3 features whose values are b/w 0 and 1.
+    # This design decision based mainly on Exploratory Data Analysis (EDA)
+    # with multiple datasets.
+    elif feature in {'Danceability', 'Energy', 'Speechiness'}:
+        feature_range = 0.3
+
+    # Edge case: If this function gets used in the future for some other
+    # feature before function is updated.
+    else:
+        feature_range = 0
+
+    # Calculate feature mean (skipping missing values) and range upper/lower
+    # bounds. Converted to a Python float, since float32 features would
+    # give float32 bounds that print as ex: 0.23999999463558197.
+    mean_feature = float(np.nanmean(values))
+    lower_bound = mean_feature - feature_range / 2
+    upper_bound = mean_feature + feature_range / 2
+
+    # Edge cases for if upper/lower bounds are out of range
+    if lower_bound < 0:
+        lower_bound = 0
+    if (
+        feature in {'Danceability', 'Energy', 'Speechiness'}
+        and upper_bound > 1
+    ):
+        upper_bound = 1
+
+    # Calculate the percentage of songs within the feature range
+    num_within_range = np.count_nonzero(
+        (values >= lower_bound) & (values <= upper_bound)
+    )
+    percent_within_range = round((num_within_range / len(values)) * 100)
+
+    return lower_bound, upper_bound, percent_within_range
+
+
+def find_feature_trends(
+    plot_data: Dict[str, Any],
+    y_axis: List[str]
+) -> Tuple[Dict[str, str], Dict[str, Tuple[float, float]]]:
+    """
+    Finds which features have a strong trend (see analyze_feature_trend).
+
+    Parameters:
+        plot_data (Dict[str, Any]): See extract_plot_data.
+        y_axis (List[str]): Features to analyze.
+
+    Returns:
+        Dict[str, str]: Dictionary containing feature trend summary info.
+        Dict[str, Tuple[float, float]]: Lower and upper bounds of each
+            feature with a trend, to add as lines to its plot.
+    """
 
     # Initialize a dict to store messages for each identified feature trend
     feature_trend_msgs = {}
 
-    # Perform analysis and generate plots for each y-axis feature
+    # Perform analysis for each y-axis feature
+    all_trend_bounds = {}
     for feature in y_axis:
-
-        # Create feature plot with interacative hover capability
-        fig = px.scatter(
-            df_songs,
-            x=x_axis,
-            y=feature,
-            color="Artist",
-            hover_data=["Song"],
-            color_discrete_map=color_map
+        lower_bound, upper_bound, percent_within_range = analyze_feature_trend(
+            plot_data["y"][feature], feature
         )
 
-        # Define a 30 BPM range since most genres are characterized by ranges.
-        # of 20-30 BPM. This design decision based on researching genre norms.
-        if feature == 'Tempo':
-            feature_range = 30
-
-        # Define a 0.3 range for the 3 features whose values are b/w 0 and 1.
-        # This design decision based mainly on Exploratory Data Analysis (EDA)
-        # with multiple datasets.
-        elif feature in {'Danceability', 'Energy', 'Speechiness'}:
-            feature_range = 0.3
-
-        # Edge case: If this function gets used in the future for some other
-        # feature before function is updated.
-        else:
-            feature_range = 0
-
-        # Calculate feature mean and range upper/lower bounds
-        mean_feature = df_songs[feature].mean()
-        lower_bound = mean_feature - feature_range / 2
-        upper_bound = mean_feature + feature_range / 2
-
-        # Edge cases for if upper/lower bounds are out of range
-        if lower_bound < 0:
-            lower_bound = 0
-        if (
-            feature in {'Danceability', 'Energy', 'Speechiness'}
-            and upper_bound > 1
-        ):
-            upper_bound = 1
-
-        # Identify songs within feature range
-        within_range = df_songs[
-            (df_songs[feature] >= lower_bound) &
-            (df_songs[feature] <= upper_bound)
-        ]
-
-        # Calculate the percentage of songs within the feature range
-        percent_within_range = round((len(within_range) / len(df_songs)) * 100)
-
         # Determine if there is a trend based on if 79% (z within +-1.25) of
         # songs are within defined feature range
         if percent_within_range >= 79:
@@ -311,113 +555,298 @@ def create_feature_plots(
             )
             feature_trend_msgs[feature] = trend_details_msg
 
-            # Print outlier songs:
-            # outside_range = df_songs[
-            #     (df_songs[feature] < lower_bound) |
-            #     (df_songs[feature] > upper_bound)
-            # ]
-            # print(outside_range[['Song', 'Artist', feature]])
+            # Keep bounds, to add as lines to the plot
+            all_trend_bounds[feature] = (lower_bound, upper_bound)
 
-            # Add uppper and lower bound lines to the plot
-            fig.add_shape(
-                type="line",
-                x0=df_songs[x_axis].min(),
-                x1=df_songs[x_axis].max(),
-                y0=lower_bound,
-                y1=lower_bound,
-                line=dict(color="red", width=2),
+    return feature_trend_msgs, all_trend_bounds
+
+
+def build_feature_plot(
+    plot_data: Dict[str, Any],
+    x_axis: str,
+    feature: str,
+    trend_bounds: Tuple[float, float] = None,
+    webgl_min_points: int = WEBGL_MIN_POINTS
+) -> go.Figure:
+    """
+    Builds one feature plot (one scatter trace per artist, with interactive
+    hover) from extract_plot_data's arrays.
+
+    Parameters:
+        plot_data (Dict[str, Any]): See extract_plot_data. Only the y
+            values of feature are needed.
+        x_axis (str): Feature plotted on the x-axis.
+        feature (str): Feature plotted on the y-axis.
+        trend_bounds (Tuple[float, float], optional): Lower and upper
+            bounds of the feature's trend range, drawn as lines.
+        webgl_min_points (int): Plots with more points than this use
+            WebGL (Scattergl) traces instead of SVG.
+
+    Returns:
+        go.Figure: Feature plot.
+    """
+
+    x = plot_data["x"]
+    y = plot_data["y"][feature]
+    songs = plot_data["songs"]
+
+    # Hover info of each artist's songs. Songs of merged artists (see
+    # downsample_plot_data) also show their own artist.
+    hover_info = [
+        (
+            songs[rows, np.newaxis],
+            f"Artist={artist}<br>{x_axis}=%{{x}}<br>"
+            f"{feature}=%{{y}}<br>Song=%{{customdata[0]}}<extra></extra>"
+        )
+        for artist, rows in zip(plot_data["artists"], plot_data["groups"])
+    ]
+    if "other_artists" in plot_data and hover_info:
+        rows = plot_data["groups"][-1]
+        hover_info[-1] = (
+            np.column_stack([songs[rows], plot_data["other_artists"]]),
+            f"Artist=%{{customdata[1]}}<br>{x_axis}=%{{x}}<br>"
+            f"{feature}=%{{y}}<br>Song=%{{customdata[0]}}<extra></extra>"
+        )
+
+    # Render with WebGL for large plots (SVG would freeze the browser)
+    if len(x) > webgl_min_points:
+        trace_type, trace_kwargs = go.Scattergl, {}
+    else:
+        trace_type, trace_kwargs = go.Scatter, {"orientation": "v"}
+
+    # Create feature plot with interacative hover capability
+    fig = go.Figure(
+        [
+            trace_type(
+                x=x[rows],
+                y=y[rows],
+                customdata=customdata,
+                hovertemplate=hovertemplate,
+                legendgroup=artist,
+                marker=dict(color=color, symbol="circle"),
+                mode="markers",
+                name=artist,
+                showlegend=True,
+                xaxis="x",
+                yaxis="y",
+                **trace_kwargs
+            )
+            for artist, color, rows, (customdata, hovertemplate) in zip(
+                plot_data["artists"],
+                plot_data["colors"],
+                plot_data["groups"],
+                hover_info
             )
+        ],
+        layout=dict(
+            template="plotly",
+            xaxis=dict(anchor="y", domain=[0.0, 1.0]),
+            yaxis=dict(anchor="x", domain=[0.0, 1.0]),
+            legend=dict(title=dict(text="Artist"), tracegroupgap=0),
+            margin=dict(t=60),
+        )
+    )
 
+    # Add uppper and lower bound lines to the plot
+    if trend_bounds is not None:
+        for bound in trend_bounds:
             fig.add_shape(
                 type="line",
-                x0=df_songs[x_axis].min(),
-                x1=df_songs[x_axis].max(),
-                y0=upper_bound,
-                y1=upper_bound,
+                x0=np.nanmin(x),
+                x1=np.nanmax(x),
+                y0=bound,
+                y1=bound,
                 line=dict(color="red", width=2),
             )
 
-        # For adding units to plot y-axis
-        if feature == "Tempo":
-            y_units = "BPM"
-
-        elif feature in {'Danceability', 'Energy', 'Speechiness'}:
-            y_units = "0-1"
-
-        # Create and center plot title, define spacing/margins, choose colors
-        fig.update_layout(
-            title=f"{feature} vs. Song Popularity",
-            title_x=0.5,
-            xaxis_title=f"Song Popularity (1-100)",
-            yaxis_title=f"{feature} ({y_units})",
-            paper_bgcolor='rgb(200, 200, 200)',
-            #plot_bgcolor='rgb(200, 200, 200)',
-            margin=dict(l=25, r=20, t=40, b=5),
-            legend=dict(
-                x=1,
-                y=1,
-                traceorder='normal',
-                orientation='v',
-                xanchor='left',
-                yanchor='top',
-            ),
+    # For adding units to plot y-axis
+    if feature == "Tempo":
+        y_units = "BPM"
+
+    elif feature in {'Danceability', 'Energy', 'Speechiness'}:
+        y_units = "0-1"
+
+    else:
+        y_units = feature
+
+    # Create and center plot title, define spacing/margins, choose colors
+    fig.update_layout(
+        title=f"{feature} vs. Song Popularity",
+        title_x=0.5,
+        xaxis_title=f"Song Popularity (1-100)",
+        yaxis_title=f"{feature} ({y_units})",
+        paper_bgcolor='rgb(200, 200, 200)',
+        #plot_bgcolor='rgb(200, 200, 200)',
+        margin=dict(l=25, r=20, t=40, b=5),
+        legend=dict(
+            x=1,
+            y=1,
+            traceorder='normal',
+            orientation='v',
+            xanchor='left',
+            yanchor='top',
+        ),
+        title_font=dict(color='black'),
+        xaxis=dict(
             title_font=dict(color='black'),
-            xaxis=dict(
-                title_font=dict(color='black'),
-                tickfont=dict(color='black')
-            ),
-            yaxis=dict(
-                title_font=dict(color='black'),
-                tickfont=dict(color='black')
-            ),
-            font=dict(color='black')
-        )
+            tickfont=dict(color='black')
+        ),
+        yaxis=dict(
+            title_font=dict(color='black'),
+            tickfont=dict(color='black')
+        ),
+        font=dict(color='black')
+    )
 
-        # Save each plot to an HTML file
-        today = datetime.now().strftime("%Y-%m-%d")
-        file_dir = (
-            f"output/created_playlists/{festival_name.replace(' ','')}"
-            f"Summary_Created{today}/summary_dashboard_components/"
-        )
-        if not os.path.exists(file_dir):
-            os.makedirs(file_dir)
-        file_name = f"{file_dir}{feature.replace(' ', '_')}_plot.html"
-        fig.write_html(
-            file_name,
-            full_html=False,
-            include_plotlyjs='cdn',
-            default_width=605,
-            default_height=335
+    return fig
+
+
+def write_feature_plot(
+    plot_data: Dict[str, Any],
+    x_axis: str,
+    feature: str,
+    trend_bounds: Tuple[float, float],
+    file_name: str,
+    webgl_min_points: int = WEBGL_MIN_POINTS
+) -> str:
+    """Builds one feature plot (see build_feature_plot) and saves it to an
+    HTML file. Runs in a worker process for large playlists."""
+
+    fig = build_feature_plot(
+        plot_data, x_axis, feature, trend_bounds, webgl_min_points
+    )
+    fig.write_html(
+        file_name,
+        full_html=False,
+        include_plotlyjs='cdn',
+        default_width=605,
+        default_height=335
+    )
+
+    return file_name
+
+
+def create_feature_plots(
+    df_songs: pd.DataFrame,
+    festival_name: str,
+    x_axis: str="Song Popularity",
+    y_axis: List[str]=["Tempo", "Danceability", "Energy", "Speechiness"],
+    max_workers: int=None,
+    webgl_min_points: int=WEBGL_MIN_POINTS,
+    downsample_max_points: int=DOWNSAMPLE_MAX_POINTS
+) -> Dict[str, str]:
+    """
+    Generate scatter plots, perform feature analysis, and save plots as
+        HTML files. Plots are built from one extraction of df_songs (see
+        extract_plot_data). For large playlists, plots are built and saved
+        in a process pool, so the total time is about that of one plot.
+
+    Parameters:
+        df_songs (pd.DataFrame): DataFrame containing song and artist info.
+        festival_name (str): Name of the music festival.
+        x_axis (str): Feature to be plotted on the x-axis.
+        y_axis (List[str]): List of features to be plotted on the y-axis.
+            Can also be a single string.
+        max_workers (int, optional): Number of worker processes. Defaults
+            to one per plot for playlists of at least
+            PARALLEL_PLOTS_MIN_SONGS songs, else plots are saved in this
+            process (starting workers would take longer). 1 to never use a
+            process pool.
+        webgl_min_points (int): Plots with more points than this are
+            rendered with WebGL.
+        downsample_max_points (int): Plots of more songs than this are
+            downsampled to about this many points (see
+            downsample_plot_data). Trends are always found from all songs.
+
+    Returns:
+        Dict[str, str]: Dictionary containing feature trend summary info.
+    """
+
+    # If a single y is entered as a string, convert it to list
+    # Allows this function to be used for generating other plots in the future
+    if isinstance(y_axis, str):
+        y_axis = [y_axis]
+
+    # Extract plot data from df_songs once, for every plot
+    plot_data = extract_plot_data(df_songs, x_axis, y_axis)
+
+    # Perform analysis for each y-axis feature
+    feature_trend_msgs, all_trend_bounds = find_feature_trends(
+        plot_data, y_axis
+    )
+
+    # Only plot a sample of the songs of very large playlists
+    plot_data = downsample_plot_data(plot_data, downsample_max_points)
+
+    # Directory for each plot's HTML file
+    today = datetime.now().strftime("%Y-%m-%d")
+    file_dir = (
+        f"output/created_playlists/{festival_name.replace(' ','')}"
+        f"Summary_Created{today}/summary_dashboard_components/"
+    )
+    if not os.path.exists(file_dir):
+        os.makedirs(file_dir)
+
+    # Arguments of write_feature_plot for each plot. Each worker only gets
+    # the y values of its own feature.
+    plot_args = [
+        (
+            {**plot_data, "y": {feature: plot_data["y"][feature]}},
+            x_axis,
+            feature,
+            all_trend_bounds.get(feature),
+            f"{file_dir}{feature.replace(' ', '_')}_plot.html",
+            webgl_min_points
         )
-          
+        for feature in y_axis
+    ]
+
+    # Save each plot to an HTML file, in parallel for large playlists
+    if max_workers is None:
+        use_pool = len(df_songs) >= PARALLEL_PLOTS_MIN_SONGS
+        max_workers = len(plot_args) if use_pool else 1
+    if max_workers > 1 and len(plot_args) > 1:
+        # Spawn (not fork) workers, since this may run in a background
+        # thread of a GUI process (see PlaylistPipeline.publish_and_analyze)
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            list(executor.map(write_feature_plot, *zip(*plot_args)))
+    else:
+        for args in plot_args:
+            write_feature_plot(*args)
+
     return feature_trend_msgs
 
 
-def create_dashboard(
+def render_dashboard_html(
         summary_data: Dict[str, str],
         feature_trend_msgs: Dict[str, str],
-        festival_name: str
-) -> None:
+        festival_name: str,
+        head_html: str,
+        plots_html: str,
+        artist_summary_html: str
+) -> str:
     """
-    Generate an HTML dashboard combining playlist summary details and plots.
+    Generate the HTML of a dashboard combining playlist summary details and
+    plots. Shared by create_dashboard and create_single_file_dashboard.
 
     Parameters:
         summary_data (Dict[str, str]): Dictionary containing playlist info.
         feature_trend_msgs Dict[str, str]: Dictionary containing feature
             trend summary messages.
         festival_name (str): Name of the music festival.
+        head_html (str): Styles and scripts, including a showPlot(plotId)
+            function.
+        plots_html (str): One div per feature plot (class "plot", id
+            "{feature}_plot").
+        artist_summary_html (str): Artist summary table (or its embed).
 
     Returns:
-        None
+        str: Dashboard HTML.
     """
 
-    # Define sizes for html components. Set 25px above default width and
-    # height from create_feature_plots function.
-    f_plot_w = 630
-    f_plot_h = 360
-    artist_summary_h = 275
-    artist_summary_w = 1390
-
     # Create trend messages for features that have strong trends present
     if len(feature_trend_msgs) == 4:
         trend_msg_html1 = "All song features"
@@ -435,16 +864,7 @@ def create_dashboard(
 
     <head>
         <title>{festival_name} Playlist Summary</title>
-        <link rel="stylesheet" type="text/css" href="../styles/dashboard_style.css">  
-        <script>
-            function showPlot(plotId) {{
-                var plots = document.getElementsByClassName("plot");
-                for (var i = 0; i < plots.length; i++) {{
-                    plots[i].style.display = "none";
-                }}
-                document.getElementById(plotId).style.display = "block";
-            }}
-        </script>
+        {head_html}
     </head>
 
     <body>
@@ -473,25 +893,14 @@ def create_dashboard(
                 <button onclick="showPlot('speechiness_plot')">Show Speechiness Plot</button>
             </div>
             <div class="plots-container" style="overflow: hidden;">
-                <div id="tempo_plot" class="plot">
-                    <embed src="summary_dashboard_components/Tempo_plot.html" type="text/html" width="{f_plot_w}" height="{f_plot_h}" style="overflow: hidden;">
-                </div>
-                <div id="danceability_plot" class="plot" style="display: none;">
-                    <embed src="summary_dashboard_components/Danceability_plot.html" type="text/html" width="{f_plot_w}" height="{f_plot_h}" style="overflow: hidden;">
-                </div>
-                <div id="energy_plot" class="plot" style="display: none;">
-                    <embed src="summary_dashboard_components/Energy_plot.html" type="text/html" width="{f_plot_w}" height="{f_plot_h}" style="overflow: hidden;">
-                </div>
-                <div id="speechiness_plot" class="plot" style="display: none;">
-                    <embed src="summary_dashboard_components/Speechiness_plot.html" type="text/html" width="{f_plot_w}" height="{f_plot_h}" style="overflow: hidden;">
-                </div>
+                {plots_html}
             </div>
         </div>
 
         <!-- Artist Summary -->
         <div id="artist-summary">
             <h2>Artist Summary</h2>
-            <embed src="summary_dashboard_components/artist_summary.html" type="text/html" width="{artist_summary_w}" height="{artist_summary_h}">
+            {artist_summary_html}
         </div>
 
     </body>
@@ -499,7 +908,13 @@ def create_dashboard(
     </html>
     """
 
-    # Save the dashboard HTML to a file
+    return dashboard_html
+
+
+def save_dashboard_html(dashboard_html: str, festival_name: str) -> str:
+    """Saves dashboard HTML to the festival's summary folder. Returns the
+    file name."""
+
     today = datetime.now().strftime("%Y-%m-%d")
     file_dir = (
         f"output/created_playlists/{festival_name.replace(' ','')}"
@@ -508,17 +923,276 @@ def create_dashboard(
     if not os.path.exists(file_dir): # Create directory if it DNE yet
         os.makedirs(file_dir)
     file_name = f"{file_dir}Summary_Dashboard.html"
-    with open(file_name, "w") as dashboard_file:
+    with open(file_name, "w", encoding="utf-8") as dashboard_file:
         dashboard_file.write(dashboard_html)
 
+    return file_name
+
+
+def create_dashboard(
+        summary_data: Dict[str, str],
+        feature_trend_msgs: Dict[str, str],
+        festival_name: str
+) -> None:
+    """
+    Generate an HTML dashboard combining playlist summary details and plots.
+    The plots and artist summary are embedded from the HTML files saved by
+    create_feature_plots and create_artist_summary.
+
+    Parameters:
+        summary_data (Dict[str, str]): Dictionary containing playlist info.
+        feature_trend_msgs Dict[str, str]: Dictionary containing feature
+            trend summary messages.
+        festival_name (str): Name of the music festival.
+
+    Returns:
+        None
+    """
+
+    # Define sizes for html components. Set 25px above default width and
+    # height from create_feature_plots function.
+    f_plot_w = 630
+    f_plot_h = 360
+    artist_summary_h = 275
+    artist_summary_w = 1390
+
+    head_html = """<link rel="stylesheet" type="text/css" href="../styles/dashboard_style.css">  
+        <script>
+            function showPlot(plotId) {
+                var plots = document.getElementsByClassName("plot");
+                for (var i = 0; i < plots.length; i++) {
+                    plots[i].style.display = "none";
+                }
+                document.getElementById(plotId).style.display = "block";
+            }
+        </script>"""
+
+    plots_html = f"""<div id="tempo_plot" class="plot">
+                    <embed src="summary_dashboard_components/Tempo_plot.html" type="text/html" width="{f_plot_w}" height="{f_plot_h}" style="overflow: hidden;">
+                </div>
+                <div id="danceability_plot" class="plot" style="display: none;">
+                    <embed src="summary_dashboard_components/Danceability_plot.html" type="text/html" width="{f_plot_w}" height="{f_plot_h}" style="overflow: hidden;">
+                </div>
+                <div id="energy_plot" class="plot" style="display: none;">
+                    <embed src="summary_dashboard_components/Energy_plot.html" type="text/html" width="{f_plot_w}" height="{f_plot_h}" style="overflow: hidden;">
+                </div>
+                <div id="speechiness_plot" class="plot" style="display: none;">
+                    <embed src="summary_dashboard_components/Speechiness_plot.html" type="text/html" width="{f_plot_w}" height="{f_plot_h}" style="overflow: hidden;">
+                </div>"""
+
+    artist_summary_html = f"""<embed src="summary_dashboard_components/artist_summary.html" type="text/html" width="{artist_summary_w}" height="{artist_summary_h}">"""
+
+    # Save the dashboard HTML to a file
+    dashboard_html = render_dashboard_html(
+        summary_data,
+        feature_trend_msgs,
+        festival_name,
+        head_html,
+        plots_html,
+        artist_summary_html
+    )
+    save_dashboard_html(dashboard_html, festival_name)
+
+
+def create_single_file_dashboard(
+        summary_data: Dict[str, str],
+        df_songs: pd.DataFrame,
+        festival_name: str,
+        x_axis: str="Song Popularity",
+        y_axis: List[str]=["Tempo", "Danceability", "Energy", "Speechiness"],
+        webgl_min_points: int=WEBGL_MIN_POINTS,
+        downsample_max_points: int=DOWNSAMPLE_MAX_POINTS
+) -> Dict[str, str]:
+    """
+    Generate the dashboard (see create_dashboard) as one self-contained HTML
+    file that works offline: styles and plotly.js are inlined once, the
+    plots' data is embedded once as compact JSON (x values and song names
+    are shared by every plot), and each plot is only rendered the first
+    time it's shown. Replaces create_artist_summary, create_feature_plots
+    and create_dashboard (no component files are saved).
+
+    Parameters:
+        summary_data (Dict[str, str]): Dictionary containing playlist info.
+        df_songs (pd.DataFrame): DataFrame containing song and artist info.
+        festival_name (str): Name of the music festival.
+        x_axis (str): Feature to be plotted on the x-axis.
+        y_axis (List[str]): List of features to be plotted on the y-axis.
+        webgl_min_points (int): See create_feature_plots.
+        downsample_max_points (int): See create_feature_plots.
+
+    Returns:
+        Dict[str, str]: Dictionary containing feature trend summary info.
+    """
+
+    # Same sizes as the embedded plots and artist summary of create_dashboard
+    f_plot_w = 605
+    f_plot_h = 335
+    artist_summary_h = 275
+    artist_summary_w = 1390
+
+    # Perform analysis for each y-axis feature
+    plot_data = extract_plot_data(df_songs, x_axis, y_axis)
+    feature_trend_msgs, all_trend_bounds = find_feature_trends(
+        plot_data, y_axis
+    )
+
+    # Only plot a sample of the songs of very large playlists
+    plot_data = downsample_plot_data(plot_data, downsample_max_points)
+
+    # Rows in artist order, so each artist's trace is one slice of the
+    # shared arrays. Values are rounded to keep the JSON compact.
+    rows = np.concatenate(plot_data["groups"])
+    songs = pd.Series(plot_data["songs"][rows]).fillna("").astype(str)
+    plots = {}
+    for feature in y_axis:
+        # Layout only (plot without traces); the template is shared
+        layout = build_feature_plot(
+            {**plot_data, "groups": []},
+            x_axis,
+            feature,
+            all_trend_bounds.get(feature)
+        ).layout.to_plotly_json()
+        layout.pop("template", None)
+        plots[f"{feature.lower()}_plot"] = {
+            "feature": feature,
+            "y": np.round(plot_data["y"][feature][rows], 3).tolist(),
+            "layout": layout,
+        }
+    dashboard_data = {
+        "x_axis": x_axis,
+        "trace_type": (
+            "scattergl" if len(rows) > webgl_min_points else "scatter"
+        ),
+        "x": plot_data["x"][rows].tolist(),
+        "songs": songs.tolist(),
+        "artists": plot_data["artists"],
+        "colors": plot_data["colors"],
+        "group_sizes": [len(group) for group in plot_data["groups"]],
+        "template": pio.templates["plotly"].to_plotly_json(),
+        "plots": plots,
+    }
+    if "other_artists" in plot_data: # Artist of each merged artist's song
+        dashboard_data["other_artists"] = plot_data["other_artists"].tolist()
+
+    # JSON (with NaN as null), safe to embed in a <script> tag
+    data_json = to_json_plotly(dashboard_data).replace("</", "<\\/")
+
+    # Inline the dashboard styles, if available
+    if os.path.exists(DASHBOARD_STYLE_PATH):
+        with open(DASHBOARD_STYLE_PATH) as style_file:
+            style_html = f"<style>{style_file.read()}</style>"
+    else:
+        style_html = (
+            '<link rel="stylesheet" type="text/css" '
+            'href="../styles/dashboard_style.css">'
+        )
+
+    head_html = f"""{style_html}
+        <script type="text/javascript">{get_plotlyjs()}</script>
+        <script type="application/json" id="plot-data">{data_json}</script>
+        <script>
+            var plotData = JSON.parse(
+                document.getElementById("plot-data").textContent
+            );
+            var renderedPlots = {{}};
+
+            // Builds a plot (one trace per artist) from the shared data,
+            // the first time it's shown
+            function renderPlot(plotId) {{
+                if (renderedPlots[plotId]) {{
+                    return;
+                }}
+                renderedPlots[plotId] = true;
+                var plot = plotData.plots[plotId];
+                var traces = [];
+                var start = 0;
+                for (var i = 0; i < plotData.artists.length; i++) {{
+                    var end = start + plotData.group_sizes[i];
+                    var artist = plotData.artists[i];
+                    var customdata = plotData.songs.slice(start, end).map(
+                        function (song) {{ return [song]; }}
+                    );
+                    var artistHover = "Artist=" + artist;
+
+                    // Songs of merged artists also show their own artist
+                    if (plotData.other_artists
+                            && i === plotData.artists.length - 1) {{
+                        customdata = customdata.map(function (row, j) {{
+                            return [row[0], plotData.other_artists[j]];
+                        }});
+                        artistHover = "Artist=%{{customdata[1]}}";
+                    }}
+                    traces.push({{
+                        type: plotData.trace_type,
+                        mode: "markers",
+                        name: artist,
+                        legendgroup: artist,
+                        showlegend: true,
+                        marker: {{color: plotData.colors[i], symbol: "circle"}},
+                        x: plotData.x.slice(start, end),
+                        y: plot.y.slice(start, end),
+                        customdata: customdata,
+                        hovertemplate: (
+                            artistHover + "<br>" + plotData.x_axis
+                            + "=%{{x}}<br>" + plot.feature + "=%{{y}}<br>"
+                            + "Song=%{{customdata[0]}}<extra></extra>"
+                        )
+                    }});
+                    start = end;
+                }}
+                var layout = Object.assign(
+                    {{template: plotData.template}}, plot.layout
+                );
+                Plotly.newPlot(
+                    plotId + "_graph", traces, layout, {{responsive: true}}
+                );
+            }}
+
+            function showPlot(plotId) {{
+                var plots = document.getElementsByClassName("plot");
+                for (var i = 0; i < plots.length; i++) {{
+                    plots[i].style.display = "none";
+                }}
+                document.getElementById(plotId).style.display = "block";
+                renderPlot(plotId);
+            }}
+
+            window.addEventListener("DOMContentLoaded", function () {{
+                showPlot("{y_axis[0].lower()}_plot");
+            }});
+        </script>"""
+
+    plots_html = "\n".join(
+        f'<div id="{plot_id}" class="plot" style="display: none;">'
+        f'<div id="{plot_id}_graph" style="width: {f_plot_w}px; '
+        f'height: {f_plot_h}px;"></div></div>'
+        for plot_id in plots
+    )
+
+    artist_summary_html = (
+        f'<div style="width: {artist_summary_w}px; '
+        f'height: {artist_summary_h}px; overflow: auto;">'
+        f'{artist_summary_to_html(summarize_artists(df_songs))}</div>'
+    )
+
+    # Save the dashboard HTML to a file
+    dashboard_html = render_dashboard_html(
+        summary_data,
+        feature_trend_msgs,
+        festival_name,
+        head_html,
+        plots_html,
+        artist_summary_html
+    )
+    save_dashboard_html(dashboard_html, festival_name)
+
+    return feature_trend_msgs
+
 
 # Test the functions if this script is executed directly
 if __name__ == '__main__':
-    # Import df then change string representation (from .csv) of genres to list
-    df_songs = pd.read_csv(
-        "output/sample_data/EdcOrlando2023SampleSongs.csv"
-    )
-    df_songs['Artist Genres'] = df_songs['Artist Genres'].apply(eval)
+    # Import df, parsing string representation (from .csv) of genres to list
+    df_songs = load_df("output/sample_data/EdcOrlando2023SampleSongs.csv")
     
     recommended_artists = ['Nicky Romero', 'Sebastian Ingrosso', 'Hardwell']
     print(f"df loaded with length: {len(df_songs)}")
@@ -0,0 +1,148 @@
+###############################################################################
+#
+# This file contains functions for saving and loading df_songs and
+# df_artists (see run_playlist_generator.main), as CSV or Parquet files:
+#   - parse_genre_list parses a genre list saved to CSV as a Python list
+#      repr (ex: "['EDM', 'Pop Dance']"), without eval
+#   - parse_genre_lists does the same for a column, parsing each unique
+#      string once (each artist's list repeats in all their song rows)
+#   - save_df saves a df as CSV or compressed Parquet (native list column)
+#   - load_df loads a df saved by save_df (or a sample/legacy CSV), with
+#      'Artist Genres' as lists (GenreLists, see genre_vocab)
+#
+###############################################################################
+
+import os
+import re
+import ast
+from typing import List
+
+import pandas as pd
+
+from genre_vocab import get_default_genre_vocabulary
+
+
+# Quoted strings in a list repr. Python quotes with ' unless the string
+# contains a ', then with ".
+_QUOTED_STRING = re.compile(r"'([^'\\]*)'|\"([^\"\\]*)\"")
+
+OUTPUT_FORMATS = ("csv", "parquet")
+
+
+def parse_genre_list(genres_repr: str) -> List[str]:
+    """
+    Parses a genre list saved as a Python list repr. Never evaluates code.
+
+    Parameters:
+        genres_repr (str): Ex: "['EDM', 'Pop Dance']", "[]" or NaN (empty
+            CSV cell).
+
+    Returns:
+        List[str]: Genres.
+
+    Ex: "['EDM', \"Children's Music\"]" -> ['EDM', "Children's Music"]
+    """
+
+    if not isinstance(genres_repr, str):
+        return []
+
+    # Rare escaped characters (ex: a genre with both ' and "): parse as a
+    # literal, which is still safe (no names or calls are evaluated)
+    if "\\" in genres_repr:
+        return list(ast.literal_eval(genres_repr))
+
+    return [
+        single or double
+        for single, double in _QUOTED_STRING.findall(genres_repr)
+    ]
+
+
+def parse_genre_lists(genre_reprs: pd.Series) -> pd.Series:
+    """
+    Parses a column of genre list reprs (see parse_genre_list). Each unique
+    repr is parsed (and its genres encoded, see genre_vocab.GenreList)
+    once; rows with the same repr share one list.
+
+    Parameters:
+        genre_reprs (pd.Series): Ex: df_songs['Artist Genres'] from a CSV.
+
+    Returns:
+        pd.Series: Genre lists (GenreLists).
+    """
+
+    genre_vocab = get_default_genre_vocabulary()
+    codes, unique_reprs = pd.factorize(genre_reprs, use_na_sentinel=False)
+    genre_lists = [
+        genre_vocab.encode_list(parse_genre_list(genres_repr))
+        for genres_repr in unique_reprs
+    ]
+
+    return pd.Series(
+        [genre_lists[code] for code in codes],
+        index=genre_reprs.index,
+        name=genre_reprs.name,
+        dtype=object
+    )
+
+
+def save_df(
+    df: pd.DataFrame,
+    file_path: str,
+    file_format: str = "csv"
+) -> str:
+    """
+    Saves df_songs or df_artists.
+
+    Parameters:
+        df (pd.DataFrame): DataFrame to save.
+        file_path (str): Path without extension (ex: ".../Playlist_Songs").
+        file_format (str): "csv" or "parquet". Parquet keeps 'Artist
+            Genres' as a native list column and dtypes (ex: float32
+            features), compressed with zstd. Requires pyarrow.
+
+    Returns:
+        str: Path of the saved file, with extension.
+    """
+
+    if file_format not in OUTPUT_FORMATS:
+        raise ValueError(f"file_format must be one of {OUTPUT_FORMATS}.")
+
+    file_name = f"{file_path}.{file_format}"
+    if file_format == "parquet":
+        df.to_parquet(file_name, compression="zstd", index=False)
+    else:
+        df.to_csv(file_name, index=False)
+
+    return file_name
+
+
+def load_df(file_name: str) -> pd.DataFrame:
+    """
+    Loads a df saved by save_df, or a sample/legacy CSV, converting 'Artist
+    Genres' (if any) back to lists.
+
+    Parameters:
+        file_name (str): Path of a .csv or .parquet file.
+
+    Returns:
+        pd.DataFrame: Loaded DataFrame.
+    """
+
+    if os.path.splitext(file_name)[1] == ".parquet":
+        df = pd.read_parquet(file_name)
+        if 'Artist Genres' in df:
+            # Arrow list cells load as arrays, and null cells (ex: written
+            # by other tools) as None, which becomes an empty list
+            genre_vocab = get_default_genre_vocabulary()
+            df['Artist Genres'] = [
+                genre_vocab.encode_list(
+                    genres.tolist() if genres is not None else []
+                )
+                for genres in df['Artist Genres']
+            ]
+    else:
+        df = pd.read_csv(file_name)
+        if 'Artist Genres' in df:
+            df['Artist Genres'] = parse_genre_lists(df['Artist Genres'])
+
+    return df
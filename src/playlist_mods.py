@@ -1,7 +1,11 @@
 from typing import List, Tuple
 
+import numpy as np
 import pandas as pd
 
+from genre_vocab import get_default_genre_vocabulary
+from title_canonicalizer import get_default_title_canonicalizer
+
 
 def remove_duplicates(
     df_songs: pd.DataFrame
@@ -46,33 +50,98 @@ def remove_remixes_and_edits(
         Filtered DataFrame with only the highest popularity version of any song
         List[str] of names of the removed versions of songs.
 
-    Ex: Input contains:  'Where You Are' and 'Where You Are - Kaskade Remix'
-        Output contains: 'Where You Are' only
+    Ex: Input contains:  'Where You Are', 'Where You Are - Kaskade Remix'
+                         and 'Where You Are (feat. X) [Extended Mix]'
+        Output contains: 'Where You Are' only (if it's the most popular)
+    Bare titles by different artists are never merged ('REMEDY' by Alesso,
+    'Remedy' by Matt Sassari), but remixes listed under the remixer are.
     """
     
-    # Split the 'Song' column into 'Base Song Name' and 'Version'
-    # Ex: Splits 'Where You Are - Kaskade Remix' into
-    # 'Where You Are' and 'Kaskade Remix'
-    df_songs[['Base Song Name', 'Version']] = (
-        df_songs['Song'].str.extract(r'(.+?)(?: - (.+))?$', expand=True)
+    # Get an int key of each song, so all versions of a song share one key
+    # (see title_canonicalizer.encode_songs). Songs are encoded most popular
+    # first, so versions join the most popular song of their title
+    # Ex: 'Where You Are - Kaskade Remix' -> 'where you are'
+    song_popularities = pd.Series(df_songs['Song Popularity'].to_numpy())
+    most_popular_first = song_popularities.sort_values(
+        ascending=False, kind='stable'
+    ).index.to_numpy()
+    song_keys = np.empty(len(df_songs), dtype=np.int64)
+    song_keys[most_popular_first] = (
+        get_default_title_canonicalizer().encode_songs(
+            df_songs['Artist'].iloc[most_popular_first],
+            df_songs['Song'].iloc[most_popular_first]
+        )
+    )
+
+    # Keep the highest popularity version of each song (first if tied)
+    kept_rows = np.sort(
+        song_popularities.groupby(song_keys).idxmax().to_numpy()
     )
+    is_kept = np.zeros(len(df_songs), dtype=bool)
+    is_kept[kept_rows] = True
 
-    # Sort the df by 'Song Popularity' (to keep most popular version)
-    df_sorted = df_songs.sort_values(by='Song Popularity', ascending=False)
+    # Get removed songs (the other versions)
+    removed_song_names = df_songs['Song'][~is_kept].tolist()
 
-    # Group by base song and retain the first for each, then drop the temp cols
-    df_filtered = df_sorted.groupby('Base Song Name').head(1)
-    df_filtered = df_filtered.drop(columns=['Base Song Name', 'Version'])
+    # Sort the final DataFrame alphabetically by artist (then most popular)
+    df_filtered = df_songs.iloc[kept_rows]
+    order = np.lexsort((
+        -df_filtered['Song Popularity'].to_numpy(),
+        get_artist_keys(df_filtered)
+    ))
 
-    # Get removed songs by comparing the original and new DataFrames
-    removed_song_names = list(
-        df_songs[~df_songs.index.isin(df_filtered.index)]['Song']
-    )
+    return df_filtered.iloc[order].reset_index(drop=True), removed_song_names
+
+
+def get_artist_keys(df_songs: pd.DataFrame) -> np.ndarray:
+    """
+    Gets an int key for each song's artist, so songs can be grouped by
+    artist without hashing/comparing artist name strings in every groupby.
+    Keys are in alphabetical artist order, same as grouping by 'Artist'.
 
-    # Sort the final DataFrame alphabetically by artist
-    df_filtered = df_filtered.sort_values(by='Artist')
+    Parameters:
+        df_songs (pd.DataFrame): Songs, with an 'Artist' column.
+
+    Returns:
+        np.ndarray: Artist key of each song.
+    """
 
-    return df_filtered.reset_index(drop=True), removed_song_names
+    artist_keys, _ = pd.factorize(df_songs['Artist'], sort=True)
+
+    return artist_keys
+
+
+def calc_retained_songs(
+    artist_popularity: pd.Series,
+    artist_max_pop: float,
+    max_songs_by_artist: int
+) -> pd.Series:
+    """
+    Calculates how many songs to keep for artists, scaling with popularity.
+    See filter_songs_by_artist_popularity.
+
+    Parameters:
+        artist_popularity (pd.Series): Popularity of each artist (or song's
+            artist).
+        artist_max_pop (float): Maximum artist popularity in the playlist.
+        max_songs_by_artist (int): Maximum number of songs by any artist.
+
+    Returns:
+        pd.Series: Number of songs to retain (float, 2+).
+    """
+
+    # Calculate song retention percentage for each artist based on popularity.
+    # By design, this is correlated to the difference between each artist's
+    # popularity and the max popularity in the DataFrame.
+    retention_percentage = 100 - (artist_max_pop - artist_popularity)
+
+    # Ensure a minimum retention percentage of 30%
+    retention_percentage = retention_percentage.clip(lower=30)
+
+    # Calculate the number of songs to retain for each artist (ensure 2+)
+    retained_songs = (retention_percentage / 100) * max_songs_by_artist
+
+    return retained_songs.clip(lower=2)
 
 
 def filter_songs_by_artist_popularity(df_songs: pd.DataFrame) -> pd.DataFrame:
@@ -84,44 +153,173 @@ def filter_songs_by_artist_popularity(df_songs: pd.DataFrame) -> pd.DataFrame:
         df_songs: Pandas DataFrame containing song information.
 
     Returns:
-        Filtered DataFrame with songs based on the artist popularity.
+        Filtered DataFrame with songs based on the artist popularity, sorted
+        alphabetically by artist (each artist's songs stay in input order).
+        The input DataFrame is not modified.
     """
 
+    if df_songs.empty:
+        return df_songs.reset_index(drop=True)
+
     # Get the maximum number of songs by any artist in the DataFrame
-    max_songs_by_artist = df_songs.groupby('Artist').size().max()
+    artist_keys = get_artist_keys(df_songs)
+    max_songs_by_artist = np.bincount(artist_keys).max()
 
     # Get the maximum artist popularity in the DataFrame
     artist_max_pop = df_songs['Artist Popularity'].max()
 
-    # Calculate song retention percentage for each artist based on popularity.
-    # By design, this is correlated to the difference between each artist's
-    # popularity and the max popularity in the DataFrame.
-    df_songs['Retention Percentage'] = (
-        100 - (artist_max_pop - df_songs['Artist Popularity'])
-    )
+    # Calculate the number of songs to retain for each artist, once per
+    # artist (from the artist's first song row)
+    _, first_rows = np.unique(artist_keys, return_index=True)
+    artist_quotas = calc_retained_songs(
+        df_songs['Artist Popularity'].iloc[first_rows],
+        artist_max_pop,
+        max_songs_by_artist
+    ).to_numpy().astype(int)
 
-    # Ensure a minimum retention percentage of 30%
-    df_songs['Retention Percentage'] = (
-        df_songs['Retention Percentage'].clip(lower=30)
-    )
+    # Retain each artist's first songs, up to the artist's quota
+    song_numbers = df_songs.groupby(artist_keys).cumcount().to_numpy()
+    is_retained = song_numbers < artist_quotas[artist_keys]
 
-    # Calculate the number of songs to retain for each artist (ensure 2+)
-    df_songs['Retained Songs'] = (
-        (df_songs['Retention Percentage'] / 100) * max_songs_by_artist
-    )
-    df_songs['Retained Songs'] = df_songs['Retained Songs'].clip(lower=2)
+    # Group retained songs by artist (alphabetically), keeping song order
+    order = np.argsort(artist_keys[is_retained], kind='stable')
+    df_filtered = df_songs[is_retained].iloc[order]
 
-    # Retain songs based on the calculated retained songs for each artist
-    df_filtered = df_songs.groupby('Artist').apply(
-        lambda x: x.head(int(x['Retained Songs'].iloc[0]))
-    )
+    return df_filtered.reset_index(drop=True)
 
-    # Drop the temporary columns
-    df_filtered = df_filtered.drop(
-        ['Retention Percentage', 'Retained Songs'], axis=1
+
+class StreamingPlaylistMods:
+    """
+    Applies playlist mods (remove_duplicates, remove_remixes_and_edits and
+    filter_songs_by_artist_popularity) to chunks of df_songs as they are
+    fetched, keeping running state between chunks, so songs can be uploaded
+    before every artist's top tracks are fetched. Each chunk must contain
+    all songs of its artists.
+
+    Differences from the whole-DataFrame mods, since songs from earlier
+    chunks may already be uploaded:
+        - Of multiple versions of a song in different chunks, the first one
+          is kept (instead of the most popular one)
+        - A remix kept before any chunk had its bare title stays a separate
+          song from a bare title found in a later chunk
+        - Artist popularity filtering scales with the max popularity of all
+          playlist artists and tracks_per_artist (instead of the max
+          popularity and song count of artists with songs left)
+    """
+
+    def __init__(
+        self,
+        df_artists: pd.DataFrame,
+        tracks_per_artist: int = 5,
+        artist_popularity_filtering: bool = True,
+        include_remixes: bool = False
+    ) -> None:
+        """
+        Initializes the StreamingPlaylistMods instance.
+
+        Parameters:
+            df_artists (pd.DataFrame): All artists in playlist.
+            tracks_per_artist (int): Top tracks per artist (1-10).
+            artist_popularity_filtering (bool): Flag indicating whether to
+                scale qty of songs per artist with artist popularity.
+            include_remixes (bool): Flag indicating whether to keep multiple
+                versions (remixes, edits) of the same song.
+        """
+
+        self.artist_popularity_filtering = artist_popularity_filtering
+        self.include_remixes = include_remixes
+        self.artist_max_pop = df_artists['Artist Popularity'].max()
+        self.max_songs_by_artist = tracks_per_artist
+
+        # Running state, shared by every chunk
+        self.seen_song_uris = set()
+        self.seen_song_keys = set() # Song keys (see encode_songs)
+        self.bare_song_artists = {} # Canonical title key -> artist keys
+        self.duplicate_songs_removed = []
+        self.remix_songs_removed = []
+
+
+    def apply(self, df_songs: pd.DataFrame) -> pd.DataFrame:
+        """
+        Applies playlist mods to the next chunk of df_songs.
+
+        Parameters:
+            df_songs (pd.DataFrame): Songs of the next artist(s).
+
+        Returns:
+            pd.DataFrame: Songs to keep, in the same order.
+        """
+
+        # Drop songs already seen in this or an earlier chunk
+        is_duplicate = (
+            df_songs['Song uri'].isin(self.seen_song_uris)
+            | df_songs.duplicated(subset='Song uri')
+        )
+        self.duplicate_songs_removed += (
+            df_songs.loc[is_duplicate, 'Song'].tolist()
+        )
+        df_songs = df_songs[~is_duplicate]
+        self.seen_song_uris.update(df_songs['Song uri'])
+
+        # Drop other versions of songs, keeping the most popular version in
+        # this chunk unless a version was already kept in an earlier chunk
+        if not self.include_remixes:
+            most_popular_first = df_songs['Song Popularity'].sort_values(
+                ascending=False, kind='stable'
+            ).index
+            song_keys = pd.Series(
+                get_default_title_canonicalizer().encode_songs(
+                    df_songs.loc[most_popular_first, 'Artist'],
+                    df_songs.loc[most_popular_first, 'Song'],
+                    self.bare_song_artists
+                ),
+                index=most_popular_first
+            ).reindex(df_songs.index)
+            is_remix = (
+                song_keys.isin(self.seen_song_keys)
+                | song_keys[most_popular_first].duplicated()
+                .reindex(df_songs.index)
+            )
+            self.remix_songs_removed += df_songs.loc[is_remix, 'Song'].tolist()
+            df_songs = df_songs[~is_remix]
+            self.seen_song_keys.update(song_keys[~is_remix])
+
+        # Keep each artist's first songs, scaling with artist popularity
+        if self.artist_popularity_filtering:
+            retained_songs = calc_retained_songs(
+                df_songs['Artist Popularity'],
+                self.artist_max_pop,
+                self.max_songs_by_artist
+            ).astype(int)
+            song_number = df_songs.groupby(
+                get_artist_keys(df_songs)
+            ).cumcount()
+            df_songs = df_songs[song_number < retained_songs]
+
+        return df_songs.reset_index(drop=True)
+
+
+def filter_artists_by_genre(
+    df_artists: pd.DataFrame,
+    genres: List[str]
+) -> pd.DataFrame:
+    """
+    Keeps only artists with any of the given genres, testing each artist's
+    genre bitset against the genres' bitset (see genre_vocab).
+
+    Parameters:
+        df_artists (pd.DataFrame): DataFrame containing artist info.
+        genres (List[str]): Display-form genres to keep (ex: 'UK Garage').
+
+    Returns:
+        pd.DataFrame: Artists with any of the genres.
+    """
+
+    has_genre = get_default_genre_vocabulary().has_any_genre(
+        df_artists['Artist Genres'], genres
     )
 
-    return df_filtered.reset_index(drop=True)
+    return df_artists[has_genre].reset_index(drop=True)
 
 
 def create_df_playlist_artists(
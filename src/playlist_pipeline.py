@@ -0,0 +1,559 @@
+###############################################################################
+#
+# This file contains the stages of playlist generation, shared by the GUI
+# (run_playlist_generator) and headless (run_playlist_generator_cli) entry
+# points. Nothing here imports Qt:
+#   - PlaylistPipeline holds the Spotify clients, cache, artist graph and
+#      artist resolution index for one run, with one method per stage:
+#        scrape -> search -> fetch + mods -> playlist -> analytics -> save
+#      publish_and_analyze runs the playlist and analytics stages at the
+#      same time (upload is network-bound, analytics CPU-bound)
+#      create_festival_songs runs search and fetch once for the artists of
+#      many festivals (batch mode), then splits songs per festival
+#      stream_songs runs fetch + mods + playlist one chunk of artists at a
+#      time, uploading songs as soon as they're ready (streaming mode)
+#
+###############################################################################
+
+import os
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Tuple
+
+import pandas as pd
+from spotipy import Spotify
+
+import spotipy_utils
+from festival_lineup_scraper import get_artist_names
+from page_cache import PageCache
+from spotipy_utils import auth_flow, get_token_header, create_df_artists
+from spotify_cache import SpotifyCache
+from artist_graph import ArtistGraphStore
+from artist_index import ArtistResolutionIndex
+from token_manager import get_default_token_manager
+from playlist_io import save_df
+from playlist_mods import (
+    remove_duplicates, remove_remixes_and_edits,
+    filter_songs_by_artist_popularity, StreamingPlaylistMods
+)
+from playlist_analytics import (
+    create_playlist_summary, create_artist_summary,
+    create_feature_plots, create_dashboard, create_single_file_dashboard
+)
+
+
+class PlaylistPipeline:
+    """
+    Runs the stages of playlist generation. See run_playlist_generator.main
+    for the DataFrames passed between stages.
+    """
+
+    def __init__(
+        self,
+        use_async_client: bool = False,
+        use_cache: bool = True
+    ) -> None:
+        """
+        Initializes the PlaylistPipeline instance, setting up the Spotify
+        clients and artist search header.
+
+        Parameters:
+            use_async_client (bool): Flag indicating whether to make Spotify
+                API requests with the asyncio client (requires aiohttp).
+            use_cache (bool): Flag indicating whether to reuse Spotify API
+                responses (and the related-artists graph, resolved artist
+                names and festival pages) saved to disk by previous runs.
+        """
+
+        # The user's OAuth client is only needed for creating the playlist
+        # (see spot); read-only endpoints use the shared, auto-refreshing
+        # client credentials token.
+        self._spot = None
+        self.search_header = get_token_header()
+        self.read_spot = get_default_token_manager().spotify_client()
+
+        # Pick Spotify API functions: Spotipy (default) or asyncio versions
+        if use_async_client:
+            import async_spotipy_utils as spotify_api
+        else:
+            spotify_api = spotipy_utils
+        self.spotify_api = spotify_api
+
+        # Cache of Spotify API responses, shared across runs. Without it,
+        # related artists and resolved artist names are still shared within
+        # this run (in memory).
+        self.cache = SpotifyCache() if use_cache else None
+        self.graph = (
+            ArtistGraphStore() if use_cache
+            else ArtistGraphStore(":memory:", max_age=None)
+        )
+        self.artist_index = (
+            ArtistResolutionIndex() if use_cache
+            else ArtistResolutionIndex(":memory:")
+        )
+        self.page_cache = PageCache() if use_cache else None
+
+        # Each run (GUI run, headless run or batch) gets the full retry
+        # wait budget, instead of what earlier runs in this process left
+        spotipy_utils.DEFAULT_RETRY_ENGINE.reset_run_budget()
+
+
+    @property
+    def spot(self) -> Spotify:
+        """User's authenticated Spotify instance, created on first use so
+        runs that don't create a playlist never need user authorization."""
+
+        if self._spot is None:
+            self._spot = auth_flow()
+        return self._spot
+
+
+    def scrape_lineup(
+        self,
+        festival_link: str
+    ) -> Tuple[str, pd.DataFrame]:
+        """
+        Searches songkick.com for a festival lineup and gets Spotify data for
+        each artist in it.
+
+        Parameters:
+            festival_link (str): songkick.com festival URL.
+
+        Returns:
+            str: Festival name.
+            pd.DataFrame: df_lineup_artists.
+        """
+
+        festival_name, lineup_artist_names = get_artist_names(
+            festival_link,
+            self.page_cache
+        )
+        df_lineup_artists = self.search_artists(lineup_artist_names)
+
+        return festival_name, df_lineup_artists
+
+
+    def search_artists(self, artist_names: List[str]) -> pd.DataFrame:
+        """Searches Spotify for each artist name. Returns df_artists."""
+        return self.spotify_api.search_for_artists(
+            self.search_header,
+            artist_names,
+            cache=self.cache,
+            index=self.artist_index
+        )
+
+
+    def resolve_artists(self, artist_names: List[str]) -> Dict[str, Dict]:
+        """Finds the Spotify artist for each unique artist name. Returns
+        artist name -> artist info (see spotipy_utils.resolve_artists)."""
+        return self.spotify_api.resolve_artists(
+            self.search_header,
+            artist_names,
+            cache=self.cache,
+            index=self.artist_index
+        )
+
+
+    def create_songs(
+        self,
+        df_playlist_artists: pd.DataFrame,
+        tracks_per_artist: int = 5,
+        artist_popularity_filtering: bool = True,
+        include_remixes: bool = False
+    ) -> pd.DataFrame:
+        """
+        Gets top tracks for each artist, then applies playlist mods.
+
+        Parameters:
+            df_playlist_artists (pd.DataFrame): Artists in playlist.
+            tracks_per_artist (int): Top tracks per artist (1-10).
+            artist_popularity_filtering (bool): Flag indicating whether to
+                scale qty of songs per artist with artist popularity.
+            include_remixes (bool): Flag indicating whether to keep multiple
+                versions (remixes, edits) of the same song.
+
+        Returns:
+            pd.DataFrame: df_songs.
+        """
+
+        df_songs = self.fetch_songs(df_playlist_artists, tracks_per_artist)
+
+        return self.apply_mods(
+            df_songs,
+            artist_popularity_filtering,
+            include_remixes
+        )
+
+
+    def fetch_songs(
+        self,
+        df_playlist_artists: pd.DataFrame,
+        tracks_per_artist: int = 5
+    ) -> pd.DataFrame:
+        """Gets between 1-10 top tracks from each artist. Returns df_songs
+        (before playlist mods)."""
+        return self.spotify_api.get_top_tracks(
+            self.read_spot,
+            df_playlist_artists,
+            tracks_per_artist,
+            cache=self.cache
+        )
+
+
+    def apply_mods(
+        self,
+        df_songs: pd.DataFrame,
+        artist_popularity_filtering: bool = True,
+        include_remixes: bool = False
+    ) -> pd.DataFrame:
+        """Applies playlist mods (see create_songs) to df_songs."""
+
+        # Drop duplicates of the same song, if any
+        df_songs, duplicate_songs_removed = remove_duplicates(df_songs)
+        if duplicate_songs_removed:
+            print(f"Duplicate songs removed: {duplicate_songs_removed}")
+
+        # Drop multiple versions of songs if user selected this option
+        if not include_remixes:
+            df_songs, remix_songs_removed = remove_remixes_and_edits(df_songs)
+            if remix_songs_removed:
+                print("Multiple versions of song(s) present.\n")
+                print(f"Songs removed: {remix_songs_removed}")
+
+        # Adjust qty of songs per artist, scaling with artist popularity
+        if artist_popularity_filtering:
+            df_songs = filter_songs_by_artist_popularity(df_songs)
+
+        return df_songs
+
+
+    def iter_songs(
+        self,
+        df_playlist_artists: pd.DataFrame,
+        tracks_per_artist: int = 5,
+        artists_per_chunk: int = 10
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Gets top tracks for chunks of artists, yielding each chunk's
+        df_songs (before playlist mods) as soon as it's fetched. The next
+        chunk is fetched in the background while the caller handles the
+        current one, and only one chunk's API responses are held at once.
+
+        Parameters:
+            df_playlist_artists (pd.DataFrame): Artists in playlist.
+            tracks_per_artist (int): Top tracks per artist (1-10).
+            artists_per_chunk (int): Artists per chunk. 10 artists' top
+                tracks fill one 100-track audio features request.
+
+        Yields:
+            pd.DataFrame: df_songs of the next chunk of artists.
+        """
+
+        chunk_starts = range(0, len(df_playlist_artists), artists_per_chunk)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            # Fetch the next chunk while the current one is being used
+            next_chunk = None
+            for start in chunk_starts:
+                chunk = executor.submit(
+                    self.fetch_songs,
+                    df_playlist_artists.iloc[start:start + artists_per_chunk],
+                    tracks_per_artist
+                )
+                if next_chunk is not None:
+                    yield next_chunk.result()
+                next_chunk = chunk
+            if next_chunk is not None:
+                yield next_chunk.result()
+
+
+    def stream_songs(
+        self,
+        df_playlist_artists: pd.DataFrame,
+        tracks_per_artist: int = 5,
+        artist_popularity_filtering: bool = True,
+        include_remixes: bool = False,
+        playlist_name: str = None
+    ) -> pd.DataFrame:
+        """
+        Streaming version of create_songs (+ publish_playlist): top tracks
+        are fetched in chunks of artists, playlist mods are applied to each
+        chunk (see playlist_mods.StreamingPlaylistMods) and, if
+        playlist_name is given, songs are added to a new playlist in
+        batches of 100 as soon as each batch fills. Lowers time to the
+        first uploaded song and peak memory on very large lineups.
+
+        Parameters:
+            df_playlist_artists (pd.DataFrame): Artists in playlist.
+            tracks_per_artist (int): Top tracks per artist (1-10).
+            artist_popularity_filtering (bool): See create_songs.
+            include_remixes (bool): See create_songs.
+            playlist_name (str, optional): Name of the new playlist. If
+                None, no playlist is created.
+
+        Returns:
+            pd.DataFrame: df_songs.
+        """
+
+        # Same artist order as the whole-DataFrame mods' output
+        if artist_popularity_filtering or not include_remixes:
+            df_playlist_artists = df_playlist_artists.sort_values(
+                by='Artist', kind='stable'
+            )
+        mods = StreamingPlaylistMods(
+            df_playlist_artists,
+            tracks_per_artist,
+            artist_popularity_filtering,
+            include_remixes
+        )
+
+        # Apply playlist mods to each chunk, keeping the (small) results
+        df_song_chunks = []
+        def iter_song_uris():
+            for df_songs in self.iter_songs(
+                df_playlist_artists, tracks_per_artist
+            ):
+                df_songs = mods.apply(df_songs)
+                df_song_chunks.append(df_songs)
+                yield df_songs['Song uri'].tolist()
+
+        # Upload songs as they arrive, or just consume the chunks
+        if playlist_name is not None:
+            spotipy_utils.create_playlist_streaming(
+                playlist_name, self.spot, iter_song_uris()
+            )
+        else:
+            for _ in iter_song_uris():
+                pass
+
+        if mods.duplicate_songs_removed:
+            print(f"Duplicate songs removed: {mods.duplicate_songs_removed}")
+        if mods.remix_songs_removed:
+            print("Multiple versions of song(s) present.\n")
+            print(f"Songs removed: {mods.remix_songs_removed}")
+
+        if not df_song_chunks: # No artists
+            return self.fetch_songs(df_playlist_artists, tracks_per_artist)
+        return pd.concat(df_song_chunks, ignore_index=True)
+
+
+    def create_festival_songs(
+        self,
+        lineups: Dict[str, Tuple[str, List[str]]],
+        tracks_per_artist: int = 5,
+        artist_popularity_filtering: bool = True,
+        include_remixes: bool = False
+    ) -> Dict[str, Tuple[str, pd.DataFrame, pd.DataFrame]]:
+        """
+        Creates df_songs for many festivals at once. The union of all
+        lineups is searched once and each artist's top tracks are fetched
+        once, then shared by every festival the artist plays, so API
+        requests scale with unique artists rather than total lineup sizes.
+
+        Parameters:
+            lineups (Dict[str, Tuple[str, List[str]]]): Festival key (ex:
+                songkick URL) -> (festival name, artist names). See
+                festival_lineup_scraper.get_many_artist_names.
+            tracks_per_artist (int): Top tracks per artist (1-10).
+            artist_popularity_filtering (bool): See create_songs.
+            include_remixes (bool): See create_songs.
+
+        Returns:
+            Dict[str, Tuple[str, pd.DataFrame, pd.DataFrame]]: Festival key
+                -> (festival name, df_songs, df_playlist_artists).
+        """
+
+        # Search for every unique artist name once
+        all_artist_names = [
+            artist_name
+            for _, artist_names in lineups.values()
+            for artist_name in artist_names
+        ]
+        artist_infos = self.resolve_artists(all_artist_names)
+
+        # Create each festival's df_artists from the shared search results
+        festival_artists = {}
+        for key, (festival_name, artist_names) in lineups.items():
+            found_names = [
+                name for name in artist_names if name in artist_infos
+            ]
+            festival_artists[key] = create_df_artists(
+                found_names,
+                [artist_infos[artist_name] for artist_name in found_names]
+            )
+
+        # Fetch top tracks once for every unique artist (by uri), kept
+        # normalized (one row per artist) until split per festival
+        df_all_artists = pd.concat(
+            festival_artists.values(), ignore_index=True
+        ).drop_duplicates(subset='Artist uri', ignore_index=True)
+        song_store = self.spotify_api.get_top_tracks(
+            self.read_spot,
+            df_all_artists,
+            tracks_per_artist,
+            cache=self.cache,
+            as_store=True
+        )
+
+        # Fan songs out to each festival (in the festival's artist order),
+        # then apply playlist mods per festival
+        festival_songs = {}
+        for key, df_playlist_artists in festival_artists.items():
+            df_songs = song_store.to_df_songs(
+                df_playlist_artists['Artist uri'].tolist()
+            )
+            df_songs = self.apply_mods(
+                df_songs,
+                artist_popularity_filtering,
+                include_remixes
+            )
+            festival_songs[key] = (
+                lineups[key][0], df_songs, df_playlist_artists
+            )
+
+        return festival_songs
+
+
+    def publish_playlist(
+        self,
+        playlist_name: str,
+        df_songs: pd.DataFrame,
+        create_new_playlist: bool = True,
+        sync_playlist: str = None
+    ) -> None:
+        """
+        Creates a new playlist (or syncs an existing one) using df_songs.
+
+        Parameters:
+            playlist_name (str): Name of the playlist.
+            df_songs (pd.DataFrame): Songs in playlist.
+            create_new_playlist (bool): Flag indicating whether to create a
+                new playlist.
+            sync_playlist (str, optional): ID, URL or name of an existing
+                playlist to update instead (see run_playlist_generator.main).
+        """
+
+        if sync_playlist is not None: # Update existing playlist instead
+            spotipy_utils.sync_playlist(
+                sync_playlist or playlist_name,
+                self.spot,
+                df_songs,
+                playlist_name
+            )
+        elif create_new_playlist:
+            self.spotify_api.create_playlist(
+                playlist_name, self.spot, df_songs
+            )
+
+
+    def analyze_playlist(
+        self,
+        playlist_name: str,
+        df_songs: pd.DataFrame,
+        df_playlist_artists: pd.DataFrame,
+        single_file_dashboard: bool = False
+    ) -> None:
+        """
+        Performs feature analysis and creates summary and dashboard.
+
+        Parameters:
+            single_file_dashboard (bool): Flag indicating whether to save the
+                dashboard as one self-contained HTML file that works offline
+                (see create_single_file_dashboard), instead of a dashboard
+                embedding separate plot and artist summary files.
+        """
+
+        recommended_artists = self.spotify_api.recommend_artists(
+            self.read_spot,
+            df_playlist_artists,
+            cache=self.cache,
+            graph=self.graph
+        ) # Get top 3 artist recs
+        summary_data = create_playlist_summary(
+            df_songs, playlist_name, recommended_artists
+        )
+        if single_file_dashboard:
+            create_single_file_dashboard(
+                summary_data, df_songs, playlist_name
+            )
+        else:
+            create_artist_summary(df_songs, playlist_name)
+            feature_trend_msgs = create_feature_plots(df_songs, playlist_name)
+            create_dashboard(summary_data, feature_trend_msgs, playlist_name)
+
+
+    def publish_and_analyze(
+        self,
+        playlist_name: str,
+        df_songs: pd.DataFrame,
+        df_playlist_artists: pd.DataFrame,
+        create_new_playlist: bool = True,
+        sync_playlist: str = None,
+        analyze_playlist: bool = True,
+        single_file_dashboard: bool = False
+    ) -> None:
+        """
+        Runs publish_playlist and analyze_playlist at the same time: the
+        analytics (mostly CPU-bound plot building) run in a background
+        thread while the playlist is uploaded (network-bound). Neither
+        modifies df_songs.
+
+        Parameters:
+            analyze_playlist (bool): Flag indicating whether to perform
+                playlist analysis.
+            single_file_dashboard (bool): See analyze_playlist.
+            See publish_playlist for the other parameters.
+        """
+
+        if not analyze_playlist:
+            self.publish_playlist(
+                playlist_name, df_songs, create_new_playlist, sync_playlist
+            )
+            return
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            analysis = executor.submit(
+                self.analyze_playlist,
+                playlist_name,
+                df_songs,
+                df_playlist_artists,
+                single_file_dashboard
+            )
+            self.publish_playlist(
+                playlist_name, df_songs, create_new_playlist, sync_playlist
+            )
+            analysis.result() # Re-raise any analytics error
+
+
+    def save_outputs(
+        self,
+        playlist_name: str,
+        df_songs: pd.DataFrame,
+        df_playlist_artists: pd.DataFrame,
+        save_df_songs: bool = True,
+        save_df_artists: bool = False,
+        output_format: str = "csv"
+    ) -> None:
+        """Saves df_songs and/or df_playlist_artists as .csv (or .parquet,
+        see playlist_io.save_df) files."""
+
+        # Create folder name for saving file(s)
+        if save_df_songs or save_df_artists:
+            today = datetime.now().strftime("%Y-%m-%d")
+            file_dir = (
+                f"output/created_playlists/{playlist_name.replace(' ','')}"
+                f"Summary_Created{today}/"
+            )
+            if not os.path.exists(file_dir): # If directory DNE yet
+                os.makedirs(file_dir) # Create the directory
+
+        # Save df_songs
+        if save_df_songs:
+            save_df(df_songs, f"{file_dir}Playlist_Songs", output_format)
+
+        # Save df_artists
+        if save_df_artists:
+            save_df(
+                df_playlist_artists,
+                f"{file_dir}Playlist_Artists",
+                output_format
+            )
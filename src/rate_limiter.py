@@ -0,0 +1,119 @@
+import time
+import asyncio
+import threading
+
+
+class RateLimiter:
+    """
+    Token-bucket rate limiter shared by every worker making Spotify API
+    requests. Also holds a single 429 cooldown, so that one Retry-After
+    response pauses all workers instead of each thread hitting the rate
+    limit separately.
+    """
+
+    def __init__(self, rate: float = 10.0, capacity: int = 10) -> None:
+        """
+        Initializes the RateLimiter instance.
+
+        Parameters:
+            rate (float): Tokens (i.e., requests) added to bucket per second.
+            capacity (int): Max tokens in the bucket (allowed burst size).
+        """
+
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.last_refill = time.monotonic()
+        self.cooldown_until = 0.0 # Shared 429 cooldown (monotonic time)
+        self.lock = threading.Lock()
+
+
+    def acquire(self) -> None:
+        """Block until the cooldown has passed and a token is available."""
+
+        while True:
+            with self.lock:
+                now = time.monotonic()
+
+                # Wait out any active 429 cooldown first
+                if now < self.cooldown_until:
+                    wait_time = self.cooldown_until - now
+
+                else:
+                    # Refill bucket based on time passed since last refill
+                    self.tokens = min(
+                        self.capacity,
+                        self.tokens + (now - self.last_refill) * self.rate
+                    )
+                    self.last_refill = now
+
+                    # Take a token if there is one, otherwise wait for one
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait_time = (1 - self.tokens) / self.rate
+
+            time.sleep(wait_time)
+
+
+    def cooldown(self, seconds: float) -> float:
+        """
+        Pause all workers for (at least) the given number of seconds.
+
+        Parameters:
+            seconds (float): Cooldown time, ex: a 429's Retry-After.
+
+        Returns:
+            float: Seconds the shared cooldown was extended by (0 if an
+                active cooldown already lasts longer, ex: another worker hit
+                the same rate limit).
+        """
+
+        with self.lock:
+            previous_until = max(self.cooldown_until, time.monotonic())
+            self.cooldown_until = max(
+                self.cooldown_until,
+                time.monotonic() + seconds
+            )
+
+            # Don't allow a burst of requests right after the cooldown ends
+            self.tokens = 0.0
+            self.last_refill = self.cooldown_until
+
+            return self.cooldown_until - previous_until
+
+
+class AsyncCooldown:
+    """
+    asyncio version of RateLimiter's 429 cooldown, shared by every request
+    on one event loop (see async_spotipy_utils.AsyncSpotifyClient), so one
+    Retry-After response pauses all in-flight requests. Has no token
+    bucket, since the client limits concurrency itself.
+    """
+
+    def __init__(self) -> None:
+        """Initializes the AsyncCooldown instance, with no cooldown."""
+        self.cooldown_until = 0.0 # Shared 429 cooldown (monotonic time)
+
+
+    async def acquire(self) -> None:
+        """Wait until the cooldown has passed."""
+
+        wait_time = self.cooldown_until - time.monotonic()
+        while wait_time > 0: # May be extended while waiting
+            await asyncio.sleep(wait_time)
+            wait_time = self.cooldown_until - time.monotonic()
+
+
+    def cooldown(self, seconds: float) -> float:
+        """Pause all requests for (at least) the given number of seconds.
+        Returns the seconds the cooldown was extended by (see
+        RateLimiter.cooldown)."""
+
+        previous_until = max(self.cooldown_until, time.monotonic())
+        self.cooldown_until = max(
+            self.cooldown_until,
+            time.monotonic() + seconds
+        )
+
+        return self.cooldown_until - previous_until
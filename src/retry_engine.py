@@ -0,0 +1,596 @@
+import time
+import random
+import asyncio
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Tuple, Union
+
+import requests
+import urllib3
+from spotipy.client import SpotifyException
+
+from rate_limiter import RateLimiter, AsyncCooldown
+
+
+class HTTPStatusError(Exception):
+    """Error response of a request made without requests/Spotipy (ex: by
+    async_spotipy_utils.AsyncSpotifyClient), so RetryEngine can retry it."""
+
+    def __init__(
+        self,
+        status: int,
+        headers: Dict[str, str],
+        message: str = ""
+    ) -> None:
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+        self.headers = headers
+
+
+class TransportError(Exception):
+    """Connection error, timeout or unreadable response of a request made
+    without requests/Spotipy. Retried like requests.ConnectionError."""
+
+    def __init__(self, message: str, failed_to_connect: bool = False) -> None:
+        super().__init__(message)
+        self.failed_to_connect = failed_to_connect # Request never sent
+
+
+# Errors of a failed attempt that may be retried: error responses,
+# connection errors and timeouts
+RETRIED_ERRORS = (
+    SpotifyException,
+    requests.HTTPError,
+    requests.ConnectionError,
+    requests.Timeout,
+    HTTPStatusError,
+    TransportError,
+)
+
+# Seconds to wait after a 429 without a usable Retry-After header
+DEFAULT_RETRY_AFTER = 10.0
+
+
+def failed_to_connect(e: Exception) -> bool:
+    """
+    Checks if a failed attempt never reached the server (no connection
+    could be made), so even a non-idempotent request (ex: adding tracks to
+    a playlist) can safely be sent again.
+
+    Parameters:
+        e (Exception): Error of the failed attempt.
+
+    Returns:
+        bool: True if the request was never sent.
+    """
+
+    if isinstance(e, TransportError):
+        return e.failed_to_connect
+
+    # requests wraps urllib3's error (ex: NewConnectionError, a subclass of
+    # ConnectTimeoutError) in a MaxRetryError. Errors after connecting (ex:
+    # read timeout, connection reset) may come after the request was applied.
+    if isinstance(e, requests.ConnectionError) and e.args:
+        reason = getattr(e.args[0], "reason", e.args[0])
+        return isinstance(reason, urllib3.exceptions.ConnectTimeoutError)
+
+    return False
+
+
+def parse_retry_after(
+    retry_after: str,
+    default: float = DEFAULT_RETRY_AFTER
+) -> float:
+    """
+    Parses a Retry-After header, which is either a number of seconds or an
+    HTTP date.
+
+    Parameters:
+        retry_after (str): Retry-After header value (None if missing).
+        default (float): Seconds returned if the header is missing or
+            can't be parsed.
+
+    Returns:
+        float: Seconds to wait (never negative).
+
+    Ex: "5" -> 5.0, "Wed, 21 Oct 2015 07:28:00 GMT" -> seconds until then
+    """
+
+    if retry_after is None:
+        return default
+
+    try:
+        return max(float(retry_after), 0.0)
+    except (TypeError, ValueError):
+        pass
+
+    try:
+        retry_time = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError, IndexError):
+        return default
+    if retry_time.tzinfo is None: # HTTP dates are always GMT
+        retry_time = retry_time.replace(tzinfo=timezone.utc)
+
+    return max(
+        (retry_time - datetime.now(timezone.utc)).total_seconds(), 0.0
+    )
+
+
+class RequestOutcome:
+    """Structured result of a request made through RetryEngine."""
+
+    # Possible outcome reasons
+    OK = "ok"
+    CLIENT_ERROR = "client_error" # 4xx (other than 429), not retried
+    RETRIES_EXHAUSTED = "retries_exhausted"
+    BUDGET_EXHAUSTED = "budget_exhausted" # Request or run time budget
+    CIRCUIT_OPEN = "circuit_open" # Spotify degraded, failed fast
+    NOT_RETRIED = "not_retried" # Non-idempotent, may have been applied
+
+    def __init__(
+        self,
+        reason: str,
+        value: Any = None,
+        status: int = None,
+        error: str = None,
+        attempts: int = 0,
+        elapsed: float = 0.0
+    ) -> None:
+        """
+        Initializes the RequestOutcome instance.
+
+        Parameters:
+            reason (str): One of the outcome reasons above.
+            value (Any): Result of the request, if successful.
+            status (int): HTTP status of the last attempt (None if the last
+                attempt had no response, ex: connection error).
+            error (str): Error message of the last failed attempt.
+            attempts (int): Number of attempts made.
+            elapsed (float): Total seconds spent on the request.
+        """
+
+        self.reason = reason
+        self.value = value
+        self.status = status
+        self.error = error
+        self.attempts = attempts
+        self.elapsed = elapsed
+
+
+    @property
+    def ok(self) -> bool:
+        """True if the request was successful."""
+        return self.reason == RequestOutcome.OK
+
+
+    def __repr__(self) -> str:
+        return (
+            f"RequestOutcome(reason={self.reason!r}, status={self.status}, "
+            f"attempts={self.attempts}, elapsed={self.elapsed:.2f}s)"
+        )
+
+
+class CircuitBreaker:
+    """
+    Fails requests fast after many consecutive transient failures (5xx,
+    connection errors, timeouts), i.e., when Spotify is degraded. After
+    reset_timeout seconds, one trial request is let through; if it succeeds
+    the circuit closes again.
+
+    Use begin_request/end_request around each request, so a trial request
+    that fails with an unexpected error (ex: invalid JSON) still ends its
+    trial, instead of blocking every later trial.
+    """
+
+    # begin_request results
+    CLOSED = "closed"
+    TRIAL = "trial"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0
+    ) -> None:
+        """
+        Initializes the CircuitBreaker instance.
+
+        Parameters:
+            failure_threshold (int): Consecutive failures to open circuit.
+            reset_timeout (float): Seconds to wait before a trial request.
+        """
+
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self.opened_at = None # None means the circuit is closed
+        self.trial_in_progress = False
+        self.lock = threading.Lock()
+
+
+    def begin_request(self) -> str:
+        """
+        Checks if a request can be made.
+
+        Returns:
+            str: CLOSED for a normal request, TRIAL for the single trial
+                request of a half-open circuit, or None if the request
+                should fail fast.
+        """
+
+        with self.lock:
+            if self.opened_at is None: # Closed
+                return CircuitBreaker.CLOSED
+
+            # Half-open: let a single trial request through
+            reset_time_passed = (
+                time.monotonic() - self.opened_at >= self.reset_timeout
+            )
+            if reset_time_passed and not self.trial_in_progress:
+                self.trial_in_progress = True
+                return CircuitBreaker.TRIAL
+
+            return None
+
+
+    def end_request(self, request_mode: str) -> None:
+        """Ends a request started with begin_request. Ends the trial if the
+        trial request wasn't recorded as a success or failure."""
+
+        if request_mode == CircuitBreaker.TRIAL:
+            with self.lock:
+                self.trial_in_progress = False
+
+
+
+    def record_success(self) -> None:
+        """Closes the circuit."""
+
+        with self.lock:
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self.trial_in_progress = False
+
+
+    def record_failure(self) -> None:
+        """Counts a transient failure, opening the circuit if needed."""
+
+        with self.lock:
+            self.consecutive_failures += 1
+            if (
+                self.trial_in_progress
+                or self.consecutive_failures >= self.failure_threshold
+            ):
+                self.opened_at = time.monotonic()
+            self.trial_in_progress = False
+
+
+class RetryEngine:
+    """
+    Retries Spotify API requests in a loop with exponential backoff and
+    jitter. 429s are retried after their Retry-After time, other 4xx errors
+    are not retried. Non-idempotent requests (idempotent=False, ex: playlist
+    writes) are only retried after a 429 or a failed connection, since a
+    5xx or timeout may come after Spotify already applied the write. Each
+    request has a time budget and the whole run has a budget for time spent
+    waiting on retries. A shared CircuitBreaker fails requests fast when
+    Spotify is degraded. Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 6,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        request_budget: float = 120.0,
+        run_budget: float = 900.0,
+        circuit_breaker: CircuitBreaker = None
+    ) -> None:
+        """
+        Initializes the RetryEngine instance.
+
+        Parameters:
+            max_attempts (int): Max attempts per request.
+            base_delay (float): Backoff delay (in seconds) after 1st attempt.
+                Doubles after every attempt, up to max_delay.
+            max_delay (float): Max backoff delay in seconds.
+            request_budget (float): Max seconds spent on a single request,
+                including waiting between retries.
+            run_budget (float): Max seconds spent waiting between retries
+                across all requests made through this engine.
+            circuit_breaker (CircuitBreaker, optional): Defaults to a new
+                CircuitBreaker.
+        """
+
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.request_budget = request_budget
+        self.run_budget = run_budget
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.run_wait_time = 0.0 # Seconds waited on retries so far
+        self.lock = threading.Lock()
+
+
+    def call(
+        self,
+        func: Callable,
+        *args: Any,
+        rate_limiter: RateLimiter = None,
+        idempotent: bool = True,
+        **kwargs: Any
+    ) -> RequestOutcome:
+        """
+        Calls func(*args, **kwargs), retrying transient failures.
+
+        Parameters:
+            func: Spotipy API function, or any function that raises
+                requests.HTTPError on bad responses.
+            *args: Variable arguments for the function.
+            rate_limiter (RateLimiter, optional): Limiter shared between
+                workers. A token is taken before every attempt and a 429
+                pauses every worker using this limiter.
+            idempotent (bool): Flag indicating whether the request can be
+                repeated without side effects. If False (ex: creating a
+                playlist), it's only retried after a 429 or a failed
+                connection, never after a 5xx or timeout.
+            **kwargs: Keyword arguments for the function.
+
+        Returns:
+            RequestOutcome: Outcome of the request.
+        """
+
+        start = time.monotonic()
+        failure = (None, None) # (status, error) of the last failed attempt
+
+        for attempt in range(1, self.max_attempts + 1):
+            # Fail fast if Spotify is degraded
+            request_mode = self.circuit_breaker.begin_request()
+            if request_mode is None:
+                return self._outcome(
+                    RequestOutcome.CIRCUIT_OPEN, start, attempt - 1,
+                    status=failure[0], error=failure[1]
+                )
+
+            if rate_limiter:
+                rate_limiter.acquire()
+
+            try:
+                value = func(*args, **kwargs)
+                self.circuit_breaker.record_success()
+                return self._outcome(
+                    RequestOutcome.OK, start, attempt, value=value, status=200
+                )
+            except RETRIED_ERRORS as e:
+                status, headers, error = self._describe_error(e)
+                can_retry = (
+                    idempotent or status == 429 or failed_to_connect(e)
+                )
+            finally:
+                self.circuit_breaker.end_request(request_mode)
+
+            failure = (status, error)
+            outcome, delay = self._handle_failure(
+                status, headers, error, attempt, start, rate_limiter,
+                can_retry
+            )
+            if outcome is not None:
+                return outcome
+            time.sleep(delay)
+
+        return self._outcome(
+            RequestOutcome.RETRIES_EXHAUSTED, start, self.max_attempts,
+            status=failure[0], error=failure[1]
+        )
+
+
+    async def call_async(
+        self,
+        func: Callable,
+        *args: Any,
+        rate_limiter: AsyncCooldown = None,
+        idempotent: bool = True,
+        **kwargs: Any
+    ) -> RequestOutcome:
+        """
+        Awaitable version of call, for coroutine functions (ex: requests of
+        async_spotipy_utils.AsyncSpotifyClient). Same retries, budgets and
+        circuit breaker as call, without blocking the event loop.
+
+        Parameters:
+            func: Coroutine function that raises HTTPStatusError on bad
+                responses and TransportError on connection errors/timeouts.
+            *args: Variable arguments for the function.
+            rate_limiter (AsyncCooldown, optional): 429 cooldown shared by
+                every request on the event loop.
+            idempotent (bool): Flag indicating whether the request can be
+                repeated without side effects (see call).
+            **kwargs: Keyword arguments for the function.
+
+        Returns:
+            RequestOutcome: Outcome of the request.
+        """
+
+        start = time.monotonic()
+        failure = (None, None) # (status, error) of the last failed attempt
+
+        for attempt in range(1, self.max_attempts + 1):
+            # Fail fast if Spotify is degraded
+            request_mode = self.circuit_breaker.begin_request()
+            if request_mode is None:
+                return self._outcome(
+                    RequestOutcome.CIRCUIT_OPEN, start, attempt - 1,
+                    status=failure[0], error=failure[1]
+                )
+
+            if rate_limiter:
+                await rate_limiter.acquire()
+
+            try:
+                value = await func(*args, **kwargs)
+                self.circuit_breaker.record_success()
+                return self._outcome(
+                    RequestOutcome.OK, start, attempt, value=value, status=200
+                )
+            except RETRIED_ERRORS as e:
+                status, headers, error = self._describe_error(e)
+                can_retry = (
+                    idempotent or status == 429 or failed_to_connect(e)
+                )
+            finally:
+                self.circuit_breaker.end_request(request_mode)
+
+            failure = (status, error)
+            outcome, delay = self._handle_failure(
+                status, headers, error, attempt, start, rate_limiter,
+                can_retry
+            )
+            if outcome is not None:
+                return outcome
+            await asyncio.sleep(delay)
+
+        return self._outcome(
+            RequestOutcome.RETRIES_EXHAUSTED, start, self.max_attempts,
+            status=failure[0], error=failure[1]
+        )
+
+
+    def _describe_error(
+        self,
+        e: Exception
+    ) -> Tuple[int, Dict[str, str], str]:
+        """Returns the HTTP status (None if no response), response headers
+        and message of a failed attempt's error."""
+
+        if isinstance(e, SpotifyException):
+            return e.http_status, e.headers or {}, str(e)
+        if isinstance(e, requests.HTTPError):
+            return e.response.status_code, e.response.headers, str(e)
+        if isinstance(e, HTTPStatusError):
+            return e.status, e.headers, str(e)
+
+        return None, {}, str(e) # Connection error or timeout
+
+
+    def _handle_failure(
+        self,
+        status: int,
+        headers: Dict[str, str],
+        error: str,
+        attempt: int,
+        start: float,
+        rate_limiter: Union[RateLimiter, AsyncCooldown],
+        can_retry: bool = True
+    ) -> Tuple[RequestOutcome, float]:
+        """
+        Records a failed attempt and decides what to do next. can_retry is
+        False if a non-idempotent request may already have been applied.
+
+        Returns:
+            RequestOutcome: Final outcome if the request shouldn't be
+                retried, else None.
+            float: Seconds to sleep before the next attempt (0 if the wait
+                is a shared cooldown, waited out in rate_limiter.acquire).
+        """
+
+        # Any 4xx response means Spotify itself is up (not degraded)
+        if status is not None and 400 <= status < 500:
+            self.circuit_breaker.record_success()
+
+        # Other client errors (ex: 404 for a bad uri) aren't retried
+        if status is not None and 400 <= status < 500 and status != 429:
+            return self._outcome(
+                RequestOutcome.CLIENT_ERROR, start, attempt,
+                status=status, error=error
+            ), 0.0
+
+        # 5xx, connection error or timeout
+        if status != 429:
+            self.circuit_breaker.record_failure()
+
+        # Non-idempotent request that may have been applied: sending it
+        # again could apply it twice (ex: add the same tracks again)
+        if not can_retry:
+            return self._outcome(
+                RequestOutcome.NOT_RETRIED, start, attempt,
+                status=status, error=error
+            ), 0.0
+
+        if attempt == self.max_attempts:
+            return self._outcome(
+                RequestOutcome.RETRIES_EXHAUSTED, start, attempt,
+                status=status, error=error
+            ), 0.0
+
+        # Rate limit: wait for Retry-After. Otherwise: backoff w/ jitter.
+        if status == 429:
+            delay = parse_retry_after(headers.get("Retry-After"))
+        else:
+            delay = random.uniform(
+                0,
+                min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+            )
+
+        # A shared cooldown is only charged to the run budget for the time
+        # it's extended by, so workers hitting the same 429 don't each use
+        # up the budget for one cooldown
+        elapsed = time.monotonic() - start
+        if elapsed + delay > self.request_budget:
+            over_budget = True
+        else:
+            if status == 429:
+                print(f"Rate limit reached. Waiting for {delay:g} seconds.")
+            if status == 429 and rate_limiter:
+                charged_wait = rate_limiter.cooldown(delay)
+            else:
+                charged_wait = delay
+            with self.lock:
+                over_budget = (
+                    self.run_wait_time + charged_wait > self.run_budget
+                )
+                if not over_budget:
+                    self.run_wait_time += charged_wait
+        if over_budget:
+            return self._outcome(
+                RequestOutcome.BUDGET_EXHAUSTED, start, attempt,
+                status=status, error=error
+            ), 0.0
+
+        if status == 429 and rate_limiter: # Waited out in acquire()
+            return None, 0.0
+        return None, delay
+
+
+    def reset_run_budget(self) -> None:
+        """Starts a new run: time already waited on retries (by earlier runs
+        in this process) no longer counts against run_budget."""
+
+        with self.lock:
+            self.run_wait_time = 0.0
+
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns run budget usage and circuit breaker state."""
+
+        with self.lock:
+            return {
+                "run_wait_time": self.run_wait_time,
+                "run_budget": self.run_budget,
+                "circuit_open": self.circuit_breaker.opened_at is not None,
+            }
+
+
+    def _outcome(
+        self,
+        reason: str,
+        start: float,
+        attempts: int,
+        **details: Any
+    ) -> RequestOutcome:
+        """Creates a RequestOutcome with the elapsed time filled in."""
+        return RequestOutcome(
+            reason,
+            attempts=attempts,
+            elapsed=time.monotonic() - start,
+            **details
+        )
@@ -1,5 +1,3 @@
-import os
-from datetime import datetime
 from typing import Tuple
 
 import pandas as pd
@@ -10,26 +8,20 @@ from gui.gui3a_artist_selection import launch_gui_artist_selection
 from gui.gui3b_artist_manual_entry import launch_gui_artist_manual_entry
 from gui.gui4ab_song_customization import launch_gui_song_customization
 
-from festival_lineup_scraper import get_artist_names
-from spotipy_utils import (
-    auth_flow, get_token_header, search_for_artists,
-    recommend_artists, get_top_tracks, create_playlist
-)
-from playlist_mods import (
-    remove_duplicates, remove_remixes_and_edits,
-    filter_songs_by_artist_popularity, create_df_playlist_artists
-)
-from playlist_analytics import (
-    create_playlist_summary, create_artist_summary,
-    create_feature_plots, create_dashboard
-)
+from playlist_mods import create_df_playlist_artists
+from playlist_pipeline import PlaylistPipeline
 
 
 def main(
     create_new_playlist: bool = True,
     analyze_playlist: bool = True,
     save_df_songs: bool = True,
-    save_df_artists: bool = False
+    save_df_artists: bool = False,
+    use_async_client: bool = False,
+    use_cache: bool = True,
+    sync_playlist: str = None,
+    output_format: str = "csv",
+    single_file_dashboard: bool = False
 ) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
     Main function of Spotify Festival Playlist Generator.
@@ -42,6 +34,21 @@ def main(
             as a CSV file.
         save_df_artists (bool): Flag indicating whether to save artist
             information as a CSV file.
+        use_async_client (bool): Flag indicating whether to make Spotify API
+            requests with the asyncio client (requires aiohttp).
+        use_cache (bool): Flag indicating whether to reuse Spotify API
+            responses (and the related-artists graph) saved to disk by
+            previous runs.
+        sync_playlist (str, optional): ID, URL or name of an existing
+            playlist to update with only the changed songs, instead of
+            creating a new playlist. "" to sync the playlist with the same
+            name as the new playlist (ex: a weekly refresh).
+        output_format (str): "csv" or "parquet" (compressed, with native
+            list columns, so saved runs reload quickly for analytics; see
+            playlist_io.load_df). Requires pyarrow for "parquet".
+        single_file_dashboard (bool): Flag indicating whether to save the
+            dashboard as one self-contained HTML file that works offline,
+            instead of a dashboard embedding separate plot files.
 
     Returns:
         Tuple[pd.DataFrame, pd.DataFrame]: A tuple containing DataFrames for
@@ -61,10 +68,10 @@ def main(
         Song - str
         Artist - str
         Song Popularity - int (between 1-100)
-        Danceability - float (between 0-1)
-        Energy - float (between 0-1)
-        Tempo - float (beats per minute)
-        Speechiness - float (between 0-1)
+        Danceability - float32 (between 0-1)
+        Energy - float32 (between 0-1)
+        Tempo - float32 (beats per minute)
+        Speechiness - float32 (between 0-1)
         Song Duration - int (in ms)
         Artist Genres - List[str] (may be an empty list)
         Artist Popularity - int (between 1-100)
@@ -90,9 +97,8 @@ def main(
     # a specific music festival or if they want to manually enter artist names.
     create_from_festival = launch_gui_start_screen()
 
-    # Set up Spotipy auth flow and artist search header
-    spot = auth_flow()
-    search_header = get_token_header()
+    # Set up Spotify clients, artist search header, cache and artist graph
+    pipeline = PlaylistPipeline(use_async_client, use_cache)
 
     while create_from_festival: # Create playlist for specific music festival
 
@@ -109,17 +115,12 @@ def main(
 
         else: # Search for festival, extract lineup, and get data for artists
 
-            # Search songkick.com for lineup and process festival name from URL
-            festival_name, lineup_artist_names = get_artist_names(
+            # Search songkick.com for lineup and process festival name from
+            # URL, then search Spotify for each artist name in the lineup
+            festival_name, df_lineup_artists = pipeline.scrape_lineup(
                 festival_link
             )
 
-            # Search Spotify for each artist name in festival lineup.
-            df_lineup_artists = search_for_artists(
-                search_header,
-                lineup_artist_names
-            )
-
             # GUI screen 3a. Select artists from lineup (and add other artists)
             selected_artist_names, new_artist_names = (
                 launch_gui_artist_selection(
@@ -129,8 +130,7 @@ def main(
             )
 
             # Get new artist data and add it to df_artists
-            df_new_artists = search_for_artists(
-                search_header,
+            df_new_artists = pipeline.search_artists(
                 new_artist_names
             ) # Artists added (i.e., not in lineup)
             df_playlist_artists = create_df_playlist_artists(
@@ -147,10 +147,7 @@ def main(
         entered_artist_names = launch_gui_artist_manual_entry()
 
         # Get data for user-entered artists
-        df_playlist_artists = search_for_artists(
-            search_header,
-            entered_artist_names
-        )
+        df_playlist_artists = pipeline.search_artists(entered_artist_names)
         festival_name = "Custom Playlist"
 
     # Launch GUI screen 4. Contains multiple playlist customization options.
@@ -161,61 +158,35 @@ def main(
         include_remixes
     ) = launch_gui_song_customization(df_playlist_artists, festival_name)
 
-    # Get between 1-10 top tracks from each selected artist using Spotipy
-    df_songs = get_top_tracks(spot, df_playlist_artists, tracks_per_artist)
-
-    # Drop duplicates of the same song, if any
-    df_songs, duplicate_songs_removed = remove_duplicates(df_songs)
-    if duplicate_songs_removed:
-        print(f"Duplicate songs removed: {duplicate_songs_removed}")
-
-    # Drop multiple versions of songs if user selected this option
-    if not include_remixes:
-        df_songs, remix_songs_removed = remove_remixes_and_edits(df_songs)
-        if remix_songs_removed:
-            print("Multiple versions of song(s) present.\n")
-            print(f"Songs removed: {remix_songs_removed}")
-
-    # Adjust qty of songs per artist, scaling with artist popularity
-    if artist_popularity_filtering:
-        df_songs = filter_songs_by_artist_popularity(df_songs)
-
-    # Create a new playlist using df_songs
-    if create_new_playlist:
-        create_playlist(playlist_name, spot, df_songs)
-
-    # Perform feature analysis and create summary
-    if analyze_playlist:
-        recommended_artists = recommend_artists(
-            spot,
-            df_playlist_artists
-        ) # Get top 3 artist recs
-        summary_data = create_playlist_summary(
-            df_songs, playlist_name, recommended_artists
-        )
-        create_artist_summary(df_songs, playlist_name)
-        feature_trend_msgs = create_feature_plots(df_songs, playlist_name)
-        create_dashboard(summary_data, feature_trend_msgs, playlist_name)
-
-    # Create folder name for saving .csv file(s)
-    if save_df_songs or save_df_artists:
-        today = datetime.now().strftime("%Y-%m-%d")
-        file_dir = (
-            f"output/created_playlists/{playlist_name.replace(' ','')}"
-            f"Summary_Created{today}/"
-        )
-        if not os.path.exists(file_dir): # If directory DNE yet
-            os.makedirs(file_dir) # Create the directory
-        
-    # Save df_songs as a .csv file
-    if save_df_songs:
-        file_name = f"{file_dir}Playlist_Songs.csv"
-        df_songs.to_csv(file_name, index=False)
-
-    # Save df_artists as a .csv file
-    if save_df_artists:
-        file_name = f"{file_dir}Playlist_Artists.csv"
-        df_playlist_artists.to_csv(file_name, index=False)
+    # Get top tracks from each selected artist, then apply playlist mods
+    df_songs = pipeline.create_songs(
+        df_playlist_artists,
+        tracks_per_artist,
+        artist_popularity_filtering,
+        include_remixes
+    )
+
+    # Create a new playlist (or sync an existing one) using df_songs, while
+    # performing feature analysis and creating summary in the background
+    pipeline.publish_and_analyze(
+        playlist_name,
+        df_songs,
+        df_playlist_artists,
+        create_new_playlist,
+        sync_playlist,
+        analyze_playlist,
+        single_file_dashboard
+    )
+
+    # Save df_songs and/or df_artists as .csv (or .parquet) files
+    pipeline.save_outputs(
+        playlist_name,
+        df_songs,
+        df_playlist_artists,
+        save_df_songs,
+        save_df_artists,
+        output_format
+    )
 
     return df_songs, df_playlist_artists
 
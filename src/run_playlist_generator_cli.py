@@ -0,0 +1,426 @@
+###############################################################################
+#
+# This file contains the headless entry point of Spotify Festival Playlist
+# Generator. It runs the same stages as run_playlist_generator.main (see
+# playlist_pipeline) without any GUI screens or Qt import, so playlists can
+# be generated from cron, a worker or a benchmark:
+#   - run_headless is the library entry point
+#   - run_batch generates playlists for many festivals at once, searching
+#      for and fetching each unique artist only once
+#   - get_entry_point picks run_batch or run_headless for a set of options
+#   - load_config reads options from a JSON config file
+#   - parse_args reads options from the command line (overriding any config
+#      file options)
+#
+# Ex:
+#   python src/run_playlist_generator_cli.py --festival-url <songkick URL> \
+#       --tracks-per-artist 5 --no-create-playlist
+#   python src/run_playlist_generator_cli.py --artists "John Summit" Tiesto
+#   python src/run_playlist_generator_cli.py --config weekly_refresh.json
+#   python src/run_playlist_generator_cli.py --festival-urls <URL> <URL> ...
+#
+###############################################################################
+
+import json
+import inspect
+import argparse
+from typing import Any, Callable, Dict, List, Tuple
+
+import pandas as pd
+
+from festival_lineup_scraper import get_many_artist_names
+from playlist_mods import create_df_playlist_artists, filter_artists_by_genre
+from playlist_pipeline import PlaylistPipeline
+from playlist_io import OUTPUT_FORMATS
+
+
+def run_headless(
+    festival_url: str = None,
+    artist_names: List[str] = None,
+    selected_artist_names: List[str] = None,
+    genres: List[str] = None,
+    playlist_name: str = None,
+    tracks_per_artist: int = 5,
+    artist_popularity_filtering: bool = True,
+    include_remixes: bool = False,
+    create_new_playlist: bool = True,
+    sync_playlist: str = None,
+    analyze_playlist: bool = True,
+    save_df_songs: bool = True,
+    save_df_artists: bool = False,
+    use_async_client: bool = False,
+    use_cache: bool = True,
+    stream: bool = False,
+    output_format: str = "csv",
+    single_file_dashboard: bool = False
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Generates a playlist without the GUI. Same outputs as
+    run_playlist_generator.main.
+
+    Parameters:
+        festival_url (str, optional): songkick.com festival URL. If None,
+            only artist_names are used (GUI option b).
+        artist_names (List[str], optional): Artists to add (GUI screen 3a)
+            or, without festival_url, the playlist's artists (screen 3b).
+        selected_artist_names (List[str], optional): Lineup artists to keep.
+            Defaults to the whole lineup.
+        genres (List[str], optional): Only keep artists with any of these
+            genres (ex: "Tech House"). Defaults to all artists.
+        playlist_name (str, optional): Defaults to the GUI's default name,
+            "Spotipy Playlist - {festival name}".
+        tracks_per_artist (int): Top tracks per artist (1-10).
+        artist_popularity_filtering (bool): Flag indicating whether to scale
+            qty of songs per artist with artist popularity.
+        include_remixes (bool): Flag indicating whether to keep multiple
+            versions (remixes, edits) of the same song.
+        create_new_playlist (bool): Flag indicating whether to create a new
+            playlist.
+        sync_playlist (str, optional): ID, URL or name of an existing
+            playlist to update instead (see run_playlist_generator.main).
+        analyze_playlist (bool): Flag indicating whether to perform playlist
+            analysis.
+        save_df_songs (bool): Flag indicating whether to save song
+            information as a CSV file.
+        save_df_artists (bool): Flag indicating whether to save artist
+            information as a CSV file.
+        use_async_client (bool): Flag indicating whether to make Spotify API
+            requests with the asyncio client (requires aiohttp).
+        use_cache (bool): Flag indicating whether to reuse Spotify API
+            responses saved to disk by previous runs.
+        stream (bool): Flag indicating whether to fetch, filter and upload
+            songs one chunk of artists at a time (see
+            PlaylistPipeline.stream_songs). Ignored with sync_playlist.
+        output_format (str): "csv" or "parquet" (see
+            run_playlist_generator.main).
+        single_file_dashboard (bool): Flag indicating whether to save the
+            dashboard as one self-contained HTML file that works offline
+            (see run_playlist_generator.main).
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame]: A tuple containing DataFrames for
+            songs and selected/new artists.
+    """
+
+    if not festival_url and not artist_names:
+        raise ValueError("A festival_url or artist_names is required.")
+    if not 1 <= tracks_per_artist <= 10:
+        raise ValueError("tracks_per_artist must be between 1 and 10.")
+
+    # Set up Spotify clients, artist search header, cache and artist graph
+    pipeline = PlaylistPipeline(use_async_client, use_cache)
+
+    if festival_url: # Create playlist for specific music festival
+        festival_name, df_lineup_artists = pipeline.scrape_lineup(
+            festival_url
+        )
+        if selected_artist_names is None: # Keep whole lineup
+            selected_artist_names = df_lineup_artists['Artist'].tolist()
+        df_new_artists = pipeline.search_artists(artist_names or [])
+        df_playlist_artists = create_df_playlist_artists(
+            df_lineup_artists,
+            df_new_artists,
+            selected_artist_names
+        )
+
+    else: # Create playlist from artist names only
+        df_playlist_artists = pipeline.search_artists(artist_names)
+        festival_name = "Custom Playlist"
+
+    # Only keep artists with any of the selected genres, if any
+    if genres:
+        df_playlist_artists = filter_artists_by_genre(
+            df_playlist_artists, genres
+        )
+
+    playlist_name = playlist_name or f"Spotipy Playlist - {festival_name}"
+
+    # Run the remaining stages, same as run_playlist_generator.main
+    if stream and sync_playlist is None: # Upload songs as they're fetched
+        df_songs = pipeline.stream_songs(
+            df_playlist_artists,
+            tracks_per_artist,
+            artist_popularity_filtering,
+            include_remixes,
+            playlist_name if create_new_playlist else None
+        )
+        if analyze_playlist:
+            pipeline.analyze_playlist(
+                playlist_name,
+                df_songs,
+                df_playlist_artists,
+                single_file_dashboard
+            )
+    else:
+        df_songs = pipeline.create_songs(
+            df_playlist_artists,
+            tracks_per_artist,
+            artist_popularity_filtering,
+            include_remixes
+        )
+        pipeline.publish_and_analyze(
+            playlist_name,
+            df_songs,
+            df_playlist_artists,
+            create_new_playlist,
+            sync_playlist,
+            analyze_playlist,
+            single_file_dashboard
+        )
+    pipeline.save_outputs(
+        playlist_name,
+        df_songs,
+        df_playlist_artists,
+        save_df_songs,
+        save_df_artists,
+        output_format
+    )
+
+    return df_songs, df_playlist_artists
+
+
+def run_batch(
+    festival_urls: List[str],
+    playlist_name_template: str = "Spotipy Playlist - {festival_name}",
+    tracks_per_artist: int = 5,
+    artist_popularity_filtering: bool = True,
+    include_remixes: bool = False,
+    create_new_playlist: bool = True,
+    sync_playlists: bool = False,
+    analyze_playlist: bool = True,
+    save_df_songs: bool = True,
+    save_df_artists: bool = False,
+    use_async_client: bool = False,
+    use_cache: bool = True,
+    max_scrape_workers: int = 8,
+    output_format: str = "csv",
+    single_file_dashboard: bool = False
+) -> Dict[str, Tuple[pd.DataFrame, pd.DataFrame]]:
+    """
+    Generates one playlist per festival, for many festivals at once. Lineups
+    are scraped concurrently, then every unique artist is searched for and
+    has its top tracks fetched only once (see
+    PlaylistPipeline.create_festival_songs), so API requests scale with
+    unique artists rather than the sum of lineup sizes. Each festival gets
+    its own playlist, dashboard and CSVs, same as run_headless.
+
+    Parameters:
+        festival_urls (List[str]): songkick.com festival URLs.
+        playlist_name_template (str): Playlist name, formatted with each
+            festival's name.
+        tracks_per_artist (int): Top tracks per artist (1-10).
+        sync_playlists (bool): Flag indicating whether to update existing
+            playlists with the same names, instead of creating new ones.
+        max_scrape_workers (int): Number of lineup pages retrieved at once.
+        See run_headless for the other parameters.
+
+    Returns:
+        Dict[str, Tuple[pd.DataFrame, pd.DataFrame]]: festival URL ->
+            (df_songs, df_playlist_artists), for every festival whose lineup
+            was retrieved.
+    """
+
+    if not 1 <= tracks_per_artist <= 10:
+        raise ValueError("tracks_per_artist must be between 1 and 10.")
+
+    # Set up Spotify clients, artist search header, cache and artist graph
+    pipeline = PlaylistPipeline(use_async_client, use_cache)
+
+    # Scrape lineups concurrently, then create every festival's songs from
+    # one search and one fetch of the union of lineup artists
+    lineups = get_many_artist_names(
+        festival_urls,
+        max_scrape_workers,
+        pipeline.page_cache
+    )
+    festival_songs = pipeline.create_festival_songs(
+        lineups,
+        tracks_per_artist,
+        artist_popularity_filtering,
+        include_remixes
+    )
+
+    # Fan out: playlist, analytics and outputs for each festival
+    results = {}
+    for festival_url, (festival_name, df_songs, df_playlist_artists) in (
+        festival_songs.items()
+    ):
+        playlist_name = playlist_name_template.format(
+            festival_name=festival_name
+        )
+        pipeline.publish_and_analyze(
+            playlist_name,
+            df_songs,
+            df_playlist_artists,
+            create_new_playlist,
+            "" if sync_playlists else None,
+            analyze_playlist,
+            single_file_dashboard
+        )
+        pipeline.save_outputs(
+            playlist_name,
+            df_songs,
+            df_playlist_artists,
+            save_df_songs,
+            save_df_artists,
+            output_format
+        )
+        results[festival_url] = (df_songs, df_playlist_artists)
+
+    return results
+
+
+def get_entry_point(options: Dict[str, Any]) -> Callable:
+    """Returns run_batch if options are for batch mode (festival_urls),
+    else run_headless."""
+    return run_batch if "festival_urls" in options else run_headless
+
+
+def get_unsupported_options(options: Dict[str, Any]) -> List[str]:
+    """
+    Gets options that the entry point selected by options doesn't accept,
+    ex: genres in batch mode or sync_playlists without festival_urls.
+
+    Parameters:
+        options (Dict[str, Any]): run_headless or run_batch keyword
+            arguments.
+
+    Returns:
+        List[str]: Unsupported options, sorted (empty if all are valid).
+    """
+
+    parameters = inspect.signature(get_entry_point(options)).parameters
+    return sorted(set(options) - set(parameters))
+
+
+def load_config(config_path: str) -> Dict[str, Any]:
+    """
+    Reads run_headless options from a JSON config file. Options are checked
+    against run_batch if the config has festival_urls, else run_headless.
+
+    Parameters:
+        config_path (str): Path to a JSON file with an object of
+            run_headless (or run_batch) keyword arguments, ex:
+            {"festival_url": "...", "tracks_per_artist": 3}
+
+    Returns:
+        Dict[str, Any]: run_headless (or run_batch) keyword arguments.
+    """
+
+    with open(config_path) as file:
+        config = json.load(file)
+
+    # Catch typos and options of the other mode (ex: genres with
+    # festival_urls) early, instead of failing once the run starts
+    unsupported = get_unsupported_options(config)
+    if unsupported:
+        raise ValueError(
+            f"Config options not supported by "
+            f"{get_entry_point(config).__name__}: {unsupported}"
+        )
+
+    return config
+
+
+def parse_args(args: List[str] = None) -> Dict[str, Any]:
+    """
+    Reads run_headless options from the command line. Options given on the
+    command line override options from --config.
+
+    Parameters:
+        args (List[str], optional): Command line arguments. Defaults to
+            sys.argv[1:].
+
+    Returns:
+        Dict[str, Any]: run_headless (or run_batch, with --festival-urls)
+            keyword arguments.
+    """
+
+    parser = argparse.ArgumentParser(
+        description="Generate a Spotify playlist without the GUI."
+    )
+    parser.add_argument("--config", help="JSON file of options")
+    parser.add_argument("--festival-url", help="songkick.com festival URL")
+    parser.add_argument(
+        "--festival-urls", nargs="+", metavar="URL",
+        help="batch mode: one playlist per songkick.com festival URL"
+    )
+    parser.add_argument(
+        "--artists", dest="artist_names", nargs="+", metavar="NAME",
+        help="artists to add (or the playlist's artists, without a URL)"
+    )
+    parser.add_argument(
+        "--select", dest="selected_artist_names", nargs="+", metavar="NAME",
+        help="lineup artists to keep (default: whole lineup)"
+    )
+    parser.add_argument(
+        "--genres", nargs="+", metavar="GENRE",
+        help='only keep artists with any of these genres, ex: "Tech House"'
+    )
+    parser.add_argument("--playlist-name")
+    parser.add_argument("--tracks-per-artist", type=int, help="1-10")
+    parser.add_argument(
+        "--sync-playlist", metavar="ID_URL_OR_NAME",
+        help="update an existing playlist instead of creating a new one"
+    )
+    parser.add_argument(
+        "--output-format", choices=OUTPUT_FORMATS,
+        help="format of saved songs/artists files (default: csv)"
+    )
+    parser.add_argument(
+        "--playlist-name-template",
+        help='batch mode playlist name, ex: "{festival_name} 2024"'
+    )
+
+    # On/off flags. Defaults (None) fall back to config file/run_headless.
+    flags = [
+        ("popularity-filtering", "artist_popularity_filtering"),
+        ("remixes", "include_remixes"),
+        ("create-playlist", "create_new_playlist"),
+        ("analyze", "analyze_playlist"),
+        ("save-songs", "save_df_songs"),
+        ("save-artists", "save_df_artists"),
+        ("async", "use_async_client"),
+        ("cache", "use_cache"),
+        ("stream", "stream"),
+        ("single-file-dashboard", "single_file_dashboard"),
+        ("sync-playlists", "sync_playlists"), # Batch mode
+    ]
+    for flag, dest in flags:
+        parser.add_argument(
+            f"--{flag}", dest=dest, action=argparse.BooleanOptionalAction
+        )
+
+    parsed = vars(parser.parse_args(args))
+    config_path = parsed.pop("config")
+    options = load_config(config_path) if config_path else {}
+    options.update({
+        option: value for option, value in parsed.items()
+        if value is not None
+    })
+
+    # Reject options of the other mode, instead of a TypeError when they're
+    # passed on. Ex: --genres or --stream with --festival-urls
+    unsupported = get_unsupported_options(options)
+    if unsupported:
+        mode = (
+            "batch mode (--festival-urls)" if "festival_urls" in options
+            else "single playlist mode"
+        )
+        parser.error(
+            f"options not supported in {mode}: {', '.join(unsupported)}"
+        )
+
+    return options
+
+
+if __name__ == "__main__":
+    options = parse_args()
+    if get_entry_point(options) is run_batch: # Batch mode
+        results = run_batch(**options)
+    else:
+        results = {"": run_headless(**options)}
+    for df_songs, df_playlist_artists in results.values():
+        print(
+            f"{len(df_songs)} songs from {len(df_playlist_artists)} artists."
+        )
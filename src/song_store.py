@@ -0,0 +1,213 @@
+###############################################################################
+#
+# This file contains SongStore, a normalized in-memory model of df_songs.
+# A flat df_songs repeats each artist's name, genres, popularity, uri and
+# image url in every one of the artist's song rows. SongStore keeps one row
+# per artist instead, plus a song table holding only an int artist key and
+# compact (int/float32) song columns, and joins them only when a flat view
+# is needed:
+#   - SongStore.from_top_tracks builds a store from Spotify API responses
+#   - SongStore.from_df_songs builds a store from a flat df_songs
+#   - to_df_songs returns the flat view (same columns as get_top_tracks),
+#      optionally for only some artists
+#   - memory_usage compares the store's size with the flat view's
+#
+###############################################################################
+
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+
+# Column order of the flat view (see spotipy_utils.get_top_tracks)
+SONG_COLUMNS = [
+    'Song', 'Artist', 'Song Popularity', 'Danceability', 'Energy', 'Tempo',
+    'Speechiness', 'Song Duration', 'Artist Genres', 'Artist Popularity',
+    'Artist uri', 'Song uri', 'Artist Image url',
+]
+ARTIST_COLUMNS = [
+    'Artist', 'Artist Genres', 'Artist Popularity', 'Artist uri',
+    'Artist Image url',
+]
+FEATURE_COLUMNS = ['Danceability', 'Energy', 'Tempo', 'Speechiness']
+
+
+class SongStore:
+    """
+    Normalized songs and artists. artists has one row per artist (index is
+    the int 'Artist Key'). songs has one row per song, referencing its
+    artist by 'Artist Key'.
+    """
+
+    def __init__(self, artists: pd.DataFrame, songs: pd.DataFrame) -> None:
+        """
+        Initializes the SongStore instance, compacting column dtypes.
+
+        Parameters:
+            artists (pd.DataFrame): One row per artist, with ARTIST_COLUMNS
+                (or some of them), indexed by 'Artist Key' (0, 1, 2...).
+            songs (pd.DataFrame): One row per song, with 'Artist Key' and
+                the other, non-artist SONG_COLUMNS.
+        """
+
+        self.artists = artists.astype({'Artist Popularity': 'int16'})
+        self.artists.index = self.artists.index.astype('int32')
+        self.artists.index.name = 'Artist Key'
+        self.songs = songs.astype({
+            'Artist Key': 'int32',
+            'Song Popularity': 'int16',
+            'Song Duration': 'int32',
+            **{feature: 'float32' for feature in FEATURE_COLUMNS},
+        })
+        self.artist_keys_by_uri = pd.Series(
+            self.artists.index, index=self.artists['Artist uri']
+        )
+
+
+    def __len__(self) -> int:
+        return len(self.songs)
+
+
+    @classmethod
+    def from_top_tracks(
+        cls,
+        df_artists: pd.DataFrame,
+        all_top_tracks: List[Dict],
+        features_by_id: Dict[str, Dict],
+        tracks_per_artist: int = 10
+    ) -> "SongStore":
+        """
+        Builds a SongStore from Spotify API responses.
+
+        Parameters:
+            df_artists (pd.DataFrame): DataFrame containing artist info.
+            all_top_tracks (List[Dict]): artist_top_tracks API response for
+                each row of df_artists (None if the request failed).
+            features_by_id (Dict[str, Dict]): Track ID -> audio features.
+            tracks_per_artist (int, optional): Number of tracks per artist.
+
+        Returns:
+            SongStore: Songs of every artist, in df_artists row order.
+        """
+
+        # One artist row per unique artist uri
+        artists = (
+            df_artists[ARTIST_COLUMNS]
+            .drop_duplicates(subset='Artist uri')
+            .reset_index(drop=True)
+        )
+        artist_keys = pd.Series(artists.index, index=artists['Artist uri'])
+
+        # Song rows, each holding only its artist's key
+        song_rows = []
+        for artist_uri, top_tracks in zip(
+            df_artists['Artist uri'], all_top_tracks
+        ):
+            top_tracks = top_tracks['tracks'] if top_tracks else []
+            artist_key = artist_keys[artist_uri]
+            for track in top_tracks[:tracks_per_artist]:
+                song_uri = track['uri'].split(':')[-1]
+
+                # Edge case if artist query yields non-music page (no
+                # features). Ex: "Air Conditioner Sounds"
+                features = features_by_id.get(song_uri) or {}
+                song_rows.append((
+                    track['name'],
+                    artist_key,
+                    track['popularity'],
+                    features.get('danceability'),
+                    features.get('energy'),
+                    features.get('tempo'),
+                    features.get('speechiness'),
+                    track['duration_ms'],
+                    song_uri,
+                ))
+
+        songs = pd.DataFrame(song_rows, columns=[
+            'Song', 'Artist Key', 'Song Popularity', *FEATURE_COLUMNS,
+            'Song Duration', 'Song uri',
+        ])
+
+        return cls(artists, songs)
+
+
+    @classmethod
+    def from_df_songs(cls, df_songs: pd.DataFrame) -> "SongStore":
+        """Builds a SongStore from a flat df_songs (see to_df_songs)."""
+
+        # Int key of each song's artist, in order of first appearance.
+        # Older saved CSVs may lack some artist columns (ex: image url).
+        artist_keys, _ = pd.factorize(df_songs['Artist uri'])
+        artist_columns = [
+            column for column in ARTIST_COLUMNS if column in df_songs
+        ]
+        artists = (
+            df_songs[artist_columns]
+            .drop_duplicates(subset='Artist uri')
+            .reset_index(drop=True)
+        )
+        songs = df_songs.drop(columns=artist_columns).assign(**{
+            'Artist Key': artist_keys
+        }).reset_index(drop=True)
+
+        return cls(artists, songs)
+
+
+    def to_df_songs(self, artist_uris: List[str] = None) -> pd.DataFrame:
+        """
+        Joins songs with their artists' info into a flat df_songs (same
+        columns as spotipy_utils.get_top_tracks, with float32 features).
+
+        Parameters:
+            artist_uris (List[str], optional): Only include these artists'
+                songs, in this artist order. Defaults to every song, in
+                stored order.
+
+        Returns:
+            pd.DataFrame: df_songs.
+        """
+
+        songs = self.songs
+        if artist_uris is not None:
+            # Position of each selected artist, then a stable sort of the
+            # selected artists' songs by position
+            artist_keys = (
+                self.artist_keys_by_uri.reindex(artist_uris)
+                .dropna()
+                .drop_duplicates()
+            )
+            positions = pd.Series(
+                np.arange(len(artist_keys)), index=artist_keys.to_numpy()
+            )
+            song_positions = songs['Artist Key'].map(positions).dropna()
+            songs = songs.loc[song_positions.sort_values(kind='stable').index]
+
+        # Look up each song's artist row by int key
+        artists = self.artists.iloc[songs['Artist Key'].to_numpy()]
+        df_songs = songs.drop(columns='Artist Key').reset_index(drop=True)
+        for column in artists.columns:
+            df_songs[column] = artists[column].to_numpy()
+
+        # Same int dtypes as before normalizing (features stay float32)
+        df_songs = df_songs.astype({
+            'Song Popularity': 'int64',
+            'Song Duration': 'int64',
+            'Artist Popularity': 'int64',
+        })
+
+        return df_songs[
+            [column for column in SONG_COLUMNS if column in df_songs]
+        ]
+
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Returns bytes used by the store and by its flat view."""
+
+        store_bytes = (
+            self.songs.memory_usage(deep=True).sum()
+            + self.artists.memory_usage(deep=True).sum()
+        )
+        flat_bytes = self.to_df_songs().memory_usage(deep=True).sum()
+
+        return {"store": int(store_bytes), "flat": int(flat_bytes)}
@@ -0,0 +1,320 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Any, Dict, List
+
+# Time-to-live (in seconds) for each kind of cached Spotify response.
+# None means the entry never expires.
+DAY = 24 * 60 * 60
+DEFAULT_TTLS = {
+    "artist_search": None, # Artist name -> uri (refreshed by uri, not name)
+    "artist_genres": 3 * 7 * DAY, # Genres rarely change
+    "artist_popularity": DAY, # Popularity changes daily
+    "artist_top_tracks": DAY, # Includes track popularities
+    "artist_related_artists": 3 * 7 * DAY,
+    "audio_features": None, # Features of a track never change
+}
+
+
+class SpotifyCache:
+    """
+    Persistent, SQLite-backed cache of Spotify API responses, keyed by the
+    kind of response (see DEFAULT_TTLS) and an artist name, artist uri or
+    track uri. Each kind has its own TTL. The cache is kept under a byte
+    budget by evicting the least recently used entries. Safe to share
+    between worker threads.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "output/cache/spotify_cache.sqlite",
+        ttls: Dict[str, int] = None,
+        max_bytes: int = 100 * 1024 * 1024
+    ) -> None:
+        """
+        Initializes the SpotifyCache instance.
+
+        Parameters:
+            db_path (str): Path of the SQLite database file.
+            ttls (Dict[str, int], optional): TTL overrides, in seconds, for
+                any kind in DEFAULT_TTLS.
+            max_bytes (int): Byte budget for all cached responses.
+        """
+
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.max_bytes = max_bytes
+        self.hits = {kind: 0 for kind in self.ttls}
+        self.misses = {kind: 0 for kind in self.ttls}
+        self.lock = threading.Lock()
+
+        # Create directory for the database if it DNE yet
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                kind TEXT NOT NULL,
+                key TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (kind, key)
+            )
+            """
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_last_access "
+            "ON responses (last_access)"
+        )
+        self.conn.commit()
+
+        # Keep a running total of cached bytes for the eviction check
+        self.total_bytes = self.conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+
+
+    def get_many(self, kind: str, keys: List[str]) -> Dict[str, Any]:
+        """
+        Looks up many keys of the same kind at once.
+
+        Parameters:
+            kind (str): Kind of response, ex: "audio_features".
+            keys (List[str]): Artist names or uris, or track uris.
+
+        Returns:
+            Dict[str, Any]: Key -> cached response, for fresh hits only.
+        """
+
+        ttl = self.ttls[kind]
+        now = time.time()
+        found = {}
+
+        with self.lock:
+            # Query in chunks to stay under SQLite's max number of variables
+            for i in range(0, len(keys), 500):
+                chunk = keys[i : i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self.conn.execute(
+                    f"SELECT key, payload, fetched_at FROM responses "
+                    f"WHERE kind = ? AND key IN ({placeholders})",
+                    [kind, *chunk]
+                ).fetchall()
+                for key, payload, fetched_at in rows:
+                    if ttl is None or now - fetched_at < ttl: # Not expired
+                        found[key] = json.loads(payload)
+
+            # Mark hits as recently used, for LRU eviction
+            self.conn.executemany(
+                "UPDATE responses SET last_access = ? "
+                "WHERE kind = ? AND key = ?",
+                [(now, kind, key) for key in found]
+            )
+            self.conn.commit()
+
+            self.hits[kind] += len(found)
+            self.misses[kind] += len(set(keys)) - len(found)
+
+        return found
+
+
+    def get(self, kind: str, key: str) -> Any:
+        """Looks up a single key. Returns None if missing or expired."""
+        return self.get_many(kind, [key]).get(key)
+
+
+    def set_many(self, kind: str, items: Dict[str, Any]) -> None:
+        """
+        Stores many responses of the same kind at once, then evicts least
+        recently used entries if over the byte budget.
+
+        Parameters:
+            kind (str): Kind of response, ex: "audio_features".
+            items (Dict[str, Any]): Key -> JSON-serializable response.
+        """
+
+        now = time.time()
+        rows = []
+        for key, value in items.items():
+            payload = json.dumps(value, separators=(",", ":"))
+            rows.append((kind, key, payload, len(payload), now, now))
+
+        with self.lock:
+            # Subtract the size of any entries that are being replaced
+            for _, key, *_ in rows:
+                old = self.conn.execute(
+                    "SELECT size FROM responses WHERE kind = ? AND key = ?",
+                    (kind, key)
+                ).fetchone()
+                if old:
+                    self.total_bytes -= old[0]
+
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self.total_bytes += sum(row[3] for row in rows)
+            self.evict()
+            self.conn.commit()
+
+
+    def set(self, kind: str, key: str, value: Any) -> None:
+        """Stores a single response. See set_many."""
+        self.set_many(kind, {key: value})
+
+
+    def get_artists(self, artist_names: List[str]) -> Dict[str, Dict]:
+        """
+        Looks up artist search results. An artist is only a hit if its
+        search result, genres and popularity are all fresh (each has its
+        own TTL).
+
+        Parameters:
+            artist_names (List[str]): Artist names, as searched.
+
+        Returns:
+            Dict[str, Dict]: Artist name -> artist dict in the same format
+                as a Spotify API search result (name, uri, images, genres,
+                popularity).
+        """
+
+        return self.complete_artists(self.get_resolved_artists(artist_names))
+
+
+    def complete_artists(
+        self,
+        resolved_artists: Dict[str, Dict]
+    ) -> Dict[str, Dict]:
+        """
+        Adds cached genres and popularity to already resolved artists (ex:
+        from get_resolved_artists or an artist_index.ArtistResolutionIndex).
+        An artist is only a hit if both are fresh.
+
+        Parameters:
+            resolved_artists (Dict[str, Dict]): Artist name -> dict with
+                name, uri and images.
+
+        Returns:
+            Dict[str, Dict]: Artist name -> artist dict (name, uri, images,
+                genres, popularity), for every hit.
+        """
+
+        artist_ids = list({
+            artist["uri"].split(":")[-1]
+            for artist in resolved_artists.values()
+        })
+        genres = self.get_many("artist_genres", artist_ids)
+        popularities = self.get_many("artist_popularity", artist_ids)
+
+        artist_infos = {}
+        for name, artist in resolved_artists.items():
+            artist_id = artist["uri"].split(":")[-1]
+            if artist_id in genres and artist_id in popularities:
+                artist_infos[name] = {
+                    **artist,
+                    "genres": genres[artist_id],
+                    "popularity": popularities[artist_id],
+                }
+
+        return artist_infos
+
+
+    def get_resolved_artists(self, artist_names: List[str]) -> Dict[str, Dict]:
+        """
+        Looks up the search results of previously searched artists, even if
+        their genres or popularity have expired, so they can be refreshed
+        by uri instead of searched for again.
+
+        Parameters:
+            artist_names (List[str]): Artist names, as searched.
+
+        Returns:
+            Dict[str, Dict]: Artist name -> dict with name, uri and images.
+        """
+
+        search_keys = {name: name.strip().lower() for name in artist_names}
+        searches = self.get_many(
+            "artist_search",
+            list(set(search_keys.values()))
+        )
+
+        return {
+            name: searches[search_key]
+            for name, search_key in search_keys.items()
+            if search_key in searches
+        }
+
+
+    def set_artists(
+        self,
+        artist_names: List[str],
+        artist_infos: List[Dict]
+    ) -> None:
+        """
+        Stores artist search results, split into search result, genres and
+        popularity so each part can expire separately.
+
+        Parameters:
+            artist_names (List[str]): Artist names, as searched.
+            artist_infos (List[Dict]): Spotify API artist dict for each name.
+        """
+
+        searches, genres, popularities = {}, {}, {}
+        for name, artist_info in zip(artist_names, artist_infos):
+            artist_id = artist_info["uri"].split(":")[-1]
+            searches[name.strip().lower()] = {
+                "name": artist_info["name"],
+                "uri": artist_info["uri"],
+                "images": artist_info["images"],
+            }
+            genres[artist_id] = artist_info["genres"]
+            popularities[artist_id] = artist_info["popularity"]
+
+        self.set_many("artist_search", searches)
+        self.set_many("artist_genres", genres)
+        self.set_many("artist_popularity", popularities)
+
+
+    def evict(self) -> None:
+        """Deletes least recently used entries until under the byte budget.
+        Must be called while holding the lock."""
+
+        while self.total_bytes > self.max_bytes:
+            rows = self.conn.execute(
+                "SELECT kind, key, size FROM responses "
+                "ORDER BY last_access LIMIT 100"
+            ).fetchall()
+            if not rows:
+                break
+            for kind, key, size in rows:
+                self.conn.execute(
+                    "DELETE FROM responses WHERE kind = ? AND key = ?",
+                    (kind, key)
+                )
+                self.total_bytes -= size
+                if self.total_bytes <= self.max_bytes:
+                    break
+
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit/miss counters per kind and total cached bytes."""
+
+        with self.lock:
+            return {
+                "hits": dict(self.hits),
+                "misses": dict(self.misses),
+                "total_bytes": self.total_bytes,
+            }
+
+
+    def close(self) -> None:
+        """Closes the database connection."""
+        self.conn.close()
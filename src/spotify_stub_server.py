@@ -0,0 +1,484 @@
+###############################################################################
+#
+# This file contains a local stand-in for the Spotify Web API, so the fetch
+# pipeline can be benchmarked and 429 handling tested without hitting the
+# real API (see benchmark_pipeline):
+#   - load_fixtures builds artist, track and audio feature fixtures from
+#      the CSVs in output/sample_data
+#   - SpotifyStubServer serves the endpoints used by this project (token,
+#      search, several artists, artist top tracks, audio features, related
+#      artists, playlist create/add) on a local port, with configurable
+#      latency, jitter and injected 429s with a Retry-After header
+#
+# Point the project at a running server with the SPOTIFY_API_URL and
+# SPOTIFY_ACCOUNTS_URL environment variables (see http_transport).
+#
+###############################################################################
+
+import glob
+import json
+import time
+import random
+import threading
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Tuple
+from urllib.parse import urlparse, parse_qs
+
+import pandas as pd
+
+from playlist_io import parse_genre_list
+from artist_index import fold_artist_name
+
+
+def load_fixtures(
+    sample_dir: str = "output/sample_data",
+    tracks_per_artist: int = 10
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Builds Spotify API objects from the sample data CSVs. Artists without
+    enough songs in the samples get made-up (but deterministic) tracks, so
+    every artist has tracks_per_artist top tracks.
+
+    Parameters:
+        sample_dir (str): Directory with *Artists.csv and *Songs.csv files.
+        tracks_per_artist (int): Number of top tracks per artist.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Fixtures with keys:
+            artists - artist id -> artist object
+            top_tracks - artist id -> list of track objects
+            audio_features - track id -> audio features object
+    """
+
+    csv_paths = sorted(glob.glob(f"{sample_dir}/*.csv"))
+    df_all = pd.concat(
+        [pd.read_csv(path) for path in csv_paths],
+        ignore_index=True
+    )
+
+    # Artist objects, from every row with artist info
+    artists = {}
+    df_artists = df_all.drop_duplicates(subset='Artist uri')
+    for _, row in df_artists.iterrows():
+        genres = row['Artist Genres']
+        genres = parse_genre_list(genres)
+        img_url = row.get('Artist Image url')
+        artists[row['Artist uri']] = {
+            'id': row['Artist uri'],
+            'uri': f"spotify:artist:{row['Artist uri']}",
+            'type': 'artist',
+            'name': row['Artist'],
+            'genres': [genre.lower() for genre in genres],
+            'popularity': int(row['Artist Popularity']),
+            'images': [{'url': img_url}] if isinstance(img_url, str) else [],
+        }
+
+    # Track and audio features objects, from rows with song info
+    top_tracks = {artist_id: [] for artist_id in artists}
+    audio_features = {}
+    df_songs = df_all.dropna(subset=['Song uri']).drop_duplicates(
+        subset='Song uri'
+    )
+    df_songs = df_songs.sort_values('Song Popularity', ascending=False)
+    for _, row in df_songs.iterrows():
+        duration = row.get('Song Duration')
+        track = {
+            'id': row['Song uri'],
+            'uri': f"spotify:track:{row['Song uri']}",
+            'type': 'track',
+            'name': row['Song'],
+            'popularity': int(row['Song Popularity']),
+            'duration_ms': int(duration) if pd.notna(duration) else 180000,
+            'artists': [artists[row['Artist uri']]['name']],
+        }
+        top_tracks[row['Artist uri']].append(track)
+        audio_features[row['Song uri']] = {
+            'id': row['Song uri'],
+            'danceability': float(row['Danceability']),
+            'energy': float(row['Energy']),
+            'tempo': float(row['Tempo']),
+            'speechiness': float(row['Speechiness']),
+        }
+
+    # Fill up artists with few sample songs with made-up tracks
+    for artist_id, tracks in top_tracks.items():
+        del tracks[tracks_per_artist:]
+        for i in range(len(tracks), tracks_per_artist):
+            track_id = f"{artist_id[:14]}stub{i:04d}"
+            rng = random.Random(zlib.crc32(track_id.encode()))
+            tracks.append({
+                'id': track_id,
+                'uri': f"spotify:track:{track_id}",
+                'type': 'track',
+                'name': f"{artists[artist_id]['name']} Track {i + 1}",
+                'popularity': rng.randint(0, 60),
+                'duration_ms': rng.randint(120000, 300000),
+                'artists': [artists[artist_id]['name']],
+            })
+            audio_features[track_id] = {
+                'id': track_id,
+                'danceability': round(rng.uniform(0.3, 0.95), 3),
+                'energy': round(rng.uniform(0.4, 1.0), 3),
+                'tempo': round(rng.uniform(90, 175), 3),
+                'speechiness': round(rng.uniform(0.02, 0.3), 4),
+            }
+
+    # Artist names in track objects become simplified artist objects
+    for artist_id, tracks in top_tracks.items():
+        for track in tracks:
+            track['artists'] = [{
+                'id': artist_id,
+                'uri': f"spotify:artist:{artist_id}",
+                'name': artists[artist_id]['name'],
+            }]
+
+    return {
+        'artists': artists,
+        'top_tracks': top_tracks,
+        'audio_features': audio_features,
+    }
+
+
+class SpotifyStubServer:
+    """
+    Local HTTP stand-in for the Spotify Web API and accounts service,
+    serving fixtures from load_fixtures. Runs in a background thread.
+
+    Ex:
+        with SpotifyStubServer(latency=0.05, rate_limit_prob=0.01) as stub:
+            os.environ["SPOTIFY_API_URL"] = stub.api_url
+            os.environ["SPOTIFY_ACCOUNTS_URL"] = stub.accounts_url
+            ...
+            print(stub.stats())
+    """
+
+    def __init__(
+        self,
+        sample_dir: str = "output/sample_data",
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        rate_limit_prob: float = 0.0,
+        retry_after: int = 1,
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0
+    ) -> None:
+        """
+        Initializes the SpotifyStubServer instance.
+
+        Parameters:
+            sample_dir (str): Directory with the sample data CSVs.
+            latency (float): Seconds added to every response.
+            jitter (float): Max seconds randomly added to/removed from the
+                latency of each response.
+            rate_limit_prob (float): Probability of answering any API
+                request with a 429 instead (token requests are never
+                rate limited).
+            retry_after (int): Retry-After header (in seconds) of 429s.
+            seed (int): Seed for jitter and 429s, so runs are reproducible.
+            host (str): Host to listen on.
+            port (int): Port to listen on. 0 picks a free port.
+        """
+
+        self.fixtures = load_fixtures(sample_dir)
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_prob = rate_limit_prob
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.request_counts = {} # Endpoint -> number of requests
+        self.rate_limited_count = 0
+        self.playlists = {} # Playlist id -> list of track uris
+
+        # Lookup of artists by folded name (accent and case insensitive,
+        # like Spotify's search), for search
+        self.artists_by_name = {
+            fold_artist_name(artist['name']): artist
+            for artist in self.fixtures['artists'].values()
+        }
+
+        self.httpd = _StubHTTPServer((host, port), _make_handler(self))
+        self.thread = None
+
+
+    @property
+    def url(self) -> str:
+        """Base url of the server."""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+    @property
+    def api_url(self) -> str:
+        """Base url to use as SPOTIFY_API_URL."""
+        return f"{self.url}/v1"
+
+
+    @property
+    def accounts_url(self) -> str:
+        """Base url to use as SPOTIFY_ACCOUNTS_URL."""
+        return self.url
+
+
+    def start(self) -> "SpotifyStubServer":
+        """Starts serving in a background thread."""
+
+        self.thread = threading.Thread(
+            target=self.httpd.serve_forever, daemon=True
+        )
+        self.thread.start()
+        return self
+
+
+    def stop(self) -> None:
+        """Stops the server."""
+
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+    def __enter__(self) -> "SpotifyStubServer":
+        return self.start()
+
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns request counts per endpoint and number of 429s served."""
+
+        with self.lock:
+            return {
+                "requests": sum(self.request_counts.values()),
+                "rate_limited": self.rate_limited_count,
+                "by_endpoint": dict(self.request_counts),
+            }
+
+
+    def reset_stats(self) -> None:
+        """Resets request counts."""
+
+        with self.lock:
+            self.request_counts = {}
+            self.rate_limited_count = 0
+
+
+    def handle(
+        self,
+        method: str,
+        path: str,
+        query: Dict[str, List[str]],
+        body: Any
+    ) -> Tuple[int, Dict[str, str], Any]:
+        """
+        Handles a request.
+
+        Parameters:
+            method (str): HTTP method.
+            path (str): Url path, ex: "/v1/artists/{id}/top-tracks".
+            query (Dict[str, List[str]]): Parsed query string.
+            body (Any): Parsed JSON (or form) body, if any.
+
+        Returns:
+            Tuple[int, Dict[str, str], Any]: Status, headers and JSON body.
+        """
+
+        parts = path.strip("/").split("/")
+        endpoint = _endpoint_name(method, parts)
+
+        # Simulate network latency and rate limits
+        with self.lock:
+            self.request_counts[endpoint] = (
+                self.request_counts.get(endpoint, 0) + 1
+            )
+            delay = self.latency + self.rng.uniform(-self.jitter, self.jitter)
+            rate_limited = (
+                endpoint != "token"
+                and self.rng.random() < self.rate_limit_prob
+            )
+            if rate_limited:
+                self.rate_limited_count += 1
+        if delay > 0:
+            time.sleep(delay)
+        if rate_limited:
+            return (
+                429,
+                {"Retry-After": str(self.retry_after)},
+                {"error": {
+                    "status": 429,
+                    "message": "API rate limit exceeded"
+                }}
+            )
+
+        artists = self.fixtures['artists']
+        top_tracks = self.fixtures['top_tracks']
+        audio_features = self.fixtures['audio_features']
+
+        if endpoint == "token":
+            return 200, {}, {
+                "access_token": "stub-token",
+                "token_type": "Bearer",
+                "expires_in": 3600,
+            }
+
+        if endpoint == "search":
+            name = fold_artist_name(query.get("q", [""])[0])
+            limit = int(query.get("limit", ["20"])[0])
+
+            # Exact match first, then partial matches
+            items = [
+                artist for artist_name, artist
+                in self.artists_by_name.items()
+                if name and name in artist_name and name != artist_name
+            ]
+            if name in self.artists_by_name:
+                items.insert(0, self.artists_by_name[name])
+            items = items[:limit]
+            return 200, {}, {"artists": {"items": items, "total": len(items)}}
+
+        if endpoint == "artists":
+            ids = query.get("ids", [""])[0].split(",")
+            return 200, {}, {"artists": [artists.get(id) for id in ids]}
+
+        if endpoint == "artist_top_tracks":
+            if parts[2] not in top_tracks:
+                return 404, {}, {"error": {"status": 404}}
+            return 200, {}, {"tracks": top_tracks[parts[2]]}
+
+        if endpoint == "artist_related_artists":
+            if parts[2] not in artists:
+                return 404, {}, {"error": {"status": 404}}
+            return 200, {}, {"artists": self._related_artists(parts[2])}
+
+        if endpoint == "audio_features":
+            ids = query.get("ids", [""])[0].split(",")
+            return 200, {}, {
+                "audio_features": [audio_features.get(id) for id in ids]
+            }
+
+        if endpoint == "playlist_create":
+            with self.lock:
+                playlist_id = f"stubplaylist{len(self.playlists):010d}"
+                self.playlists[playlist_id] = []
+            return 201, {}, {
+                "id": playlist_id,
+                "uri": f"spotify:playlist:{playlist_id}",
+                "name": (body or {}).get("name"),
+                "snapshot_id": "0",
+            }
+
+        if endpoint == "playlist_add_items":
+            uris = body.get("uris", []) if isinstance(body, dict) else body
+            with self.lock:
+                items = self.playlists.setdefault(parts[2], [])
+                items.extend(uris or [])
+                snapshot_id = str(len(items))
+            return 201, {}, {"snapshot_id": snapshot_id}
+
+        return 404, {}, {"error": {"status": 404, "message": "Not found"}}
+
+
+    def _related_artists(self, artist_id: str) -> List[Dict[str, Any]]:
+        """Up to 20 artists sharing the most genres with an artist."""
+
+        genres = set(self.fixtures['artists'][artist_id]['genres'])
+        scored = [
+            (len(genres & set(artist['genres'])), artist['popularity'], id)
+            for id, artist in self.fixtures['artists'].items()
+            if id != artist_id
+        ]
+        scored.sort(reverse=True)
+        return [self.fixtures['artists'][id] for _, _, id in scored[:20]]
+
+
+def _endpoint_name(method: str, parts: List[str]) -> str:
+    """Name of the endpoint for a url path split on "/" (for stats)."""
+
+    if parts[:2] == ["api", "token"]:
+        return "token"
+    if parts[:1] != ["v1"]:
+        return "unknown"
+    parts = parts[1:]
+    if parts == ["search"]:
+        return "search"
+    if parts == ["artists"]:
+        return "artists"
+    if len(parts) == 3 and parts[0] == "artists":
+        return {
+            "top-tracks": "artist_top_tracks",
+            "related-artists": "artist_related_artists",
+        }.get(parts[2], "unknown")
+    if parts[0] == "audio-features":
+        return "audio_features"
+    if method == "POST" and len(parts) == 3 and parts[2] == "playlists":
+        return "playlist_create"
+    if (
+        method == "POST" and len(parts) == 3 and parts[0] == "playlists"
+        and parts[2] in ("tracks", "items")
+    ):
+        return "playlist_add_items"
+    return "unknown"
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer that accepts bursts of new connections. The
+    default listen backlog (5) drops connections when the asyncio client
+    opens 100+ at once, which stalls them for seconds (SYN retries)."""
+
+    daemon_threads = True
+    request_queue_size = 256
+
+
+def _make_handler(server: SpotifyStubServer) -> type:
+    """Creates a request handler class bound to a SpotifyStubServer."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1" # Keep-alive, like the real API
+
+        def _respond(self) -> None:
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+
+            # Parse JSON or form body, if any
+            length = int(self.headers.get("Content-Length") or 0)
+            raw_body = self.rfile.read(length) if length else b""
+            try:
+                body = json.loads(raw_body) if raw_body else None
+            except ValueError:
+                body = parse_qs(raw_body.decode())
+
+            status, headers, payload = server.handle(
+                self.command, url.path, query, body
+            )
+            content = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(content)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(content)
+
+        do_GET = do_POST = do_PUT = do_DELETE = _respond
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass # Don't print every request
+
+    return Handler
+
+
+if __name__ == '__main__':
+    # Serve until interrupted, ex: to run the GUI against the stand-in
+    stub = SpotifyStubServer(latency=0.05, jitter=0.02, port=8765)
+    print(
+        f"Spotify stand-in server running. Set these environment variables:"
+        f"\n  SPOTIFY_API_URL={stub.api_url}"
+        f"\n  SPOTIFY_ACCOUNTS_URL={stub.accounts_url}"
+    )
+    try:
+        stub.httpd.serve_forever()
+    except KeyboardInterrupt:
+        stub.httpd.server_close()
@@ -2,33 +2,72 @@
 #
 # This file contains utility functions for using Spotipy/Spotify API:
 #   - auth_flow authenticates user
-#   - get_token_header creates search header for artist querying
+#   - get_token_header creates search header for artist querying, using
+#      a cached, auto-refreshing token (see token_manager)
 #   - capitalize_genre is a helper function to capitalize genres, including
 #      common genre acronyms, in the succeeding search_for_artists function
+#   - create_df_artists converts artist search results to a df
 #   - search_for_artists queries for specific artists and returns a df
 #      containing important artist info (uri, popularity, genres, img url)
-#   - retry_spotify_request is a helper function to retry Spotify API
-#      requests in the following top_tracks function
+#   - resolve_artists finds the Spotify artist for each unique artist name,
+#      scoring several search results per name (see artist_index)
+#   - get_several_artists gets info for known artist uris, 50 per call
+#   - refresh_artists refreshes popularity, genres and images in a df of
+#      known artists
+#   - retry_spotify_request is a helper function to make Spotify API
+#      requests through a RetryEngine (backoff, budgets, circuit breaker)
+#   - retry_spotify_request_or_raise does the same for requests that must
+#      succeed (playlist requests), raising if they fail
+#   - map_spotify_requests runs many Spotify API requests, optionally in a
+#      thread pool that shares one rate limiter
+#   - map_cached_spotify_requests does the same, but only for responses
+#      that aren't already in a SpotifyCache
 #   - recommend_artists returns similar artists to those in playlist
+#   - count_artist_recs counts recurring artists among related artists
+#   - get_audio_features fetches track features for many songs, 100 per call
 #   - get_top_tracks gets the top 1-10 songs for each artist and returns a df
 #      containing song metadata (uri, popularity, danceability, etc)
 #   - create_playlist creates a new playlist for many songs
+#   - create_playlist_streaming does the same for songs that arrive in
+#      chunks, uploading each batch of 100 as soon as it fills
+#   - find_playlist finds one of the user's playlists by ID, URL or name
+#   - get_playlist_song_uris reads every song currently in a playlist
+#   - plan_playlist_moves plans the fewest moves to reorder a playlist
+#   - sync_playlist updates an existing playlist to match a df of songs,
+#      sending only the needed remove/add/reorder requests
 #
 ###############################################################################
 
 import os
-import time
-import base64
 import json
-from typing import Dict, List
+import bisect
+from typing import Any, Callable, Dict, Iterable, List, Tuple, Union
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 
 import pandas as pd
-import requests
 
 from spotipy import Spotify
 from spotipy.oauth2 import SpotifyOAuth
-from spotipy.client import SpotifyException
+from spotipy.exceptions import SpotifyException
+
+from http_transport import http_get, create_session, get_spotify_api_url
+from rate_limiter import RateLimiter
+from retry_engine import RetryEngine, RequestOutcome
+from token_manager import get_default_token_manager
+from spotify_cache import SpotifyCache
+from artist_graph import ArtistGraphStore
+from artist_index import (
+    ArtistResolutionIndex, choose_artist, fold_artist_name,
+    ARTIST_SEARCH_LIMIT
+)
+from song_store import SongStore
+from genre_vocab import get_default_genre_vocabulary
+
+# Retry engine used when no other engine is passed in. Its circuit breaker
+# is shared by every request in this process; its run budget is reset at
+# the start of each run (see playlist_pipeline.PlaylistPipeline).
+DEFAULT_RETRY_ENGINE = RetryEngine()
 
 
 def auth_flow() -> Spotify:
@@ -60,7 +99,17 @@ def auth_flow() -> Spotify:
         ]
     )
     
-    return Spotify(auth_manager=auth_manager)
+    # 429s are not retried inside Spotipy, so that retry_spotify_request
+    # (and any shared RateLimiter) sees every Retry-After response. The
+    # session from http_transport.create_session doesn't retry at all, so
+    # RetryEngine is the only retry layer.
+    spot = Spotify(
+        auth_manager=auth_manager,
+        requests_session=create_session()
+    )
+    spot.prefix = f"{get_spotify_api_url()}/"
+
+    return spot
 
 
 def get_token_header() -> Dict[str, str]:
@@ -71,36 +120,12 @@ def get_token_header() -> Dict[str, str]:
         None
 
     Returns:
-        Dict[str, str]: Search header for Spotify API.
+        Dict[str, str]: Search header for Spotify API. The token is cached
+            and refreshed before it expires by the shared TokenManager, so
+            the header can be kept for the whole run.
     """
 
-    # Get environment variable values to use Spotipy API
-    SPOTIPY_CLIENT_ID = os.getenv("SPOTIPY_CLIENT_ID")
-    SPOTIPY_CLIENT_SECRET = os.getenv("SPOTIPY_CLIENT_SECRET")
-
-    # Create authorization string
-    auth_string = f"{SPOTIPY_CLIENT_ID}:{SPOTIPY_CLIENT_SECRET}"
-    auth_bytes = auth_string.encode("utf-8")
-    auth_base64 = str(base64.b64encode(auth_bytes), "utf-8")
-
-    # Spotify API token request
-    url = "https://accounts.spotify.com/api/token"
-    headers = {
-        "Authorization": "Basic " + auth_base64,
-        "Content-Type": "application/x-www-form-urlencoded"
-    }
-    data = {"grant_type": "client_credentials"}
-
-    # Make post request to obtain token
-    response = requests.post(url, headers=headers, data=data)
-
-    # Parse JSON response
-    json_response = json.loads(response.content)
-    token = json_response["access_token"]
-
-    # Create and return search header
-    search_header = {"Authorization": "Bearer " + token}
-    return search_header
+    return get_default_token_manager().get_token_header()
 
 
 def capitalize_genre(genre):
@@ -144,18 +169,17 @@ def capitalize_genre(genre):
     return genre
 
 
-def search_for_artists(
-    search_header: Dict[str, str],
-    artist_names: List[str]
+def create_df_artists(
+    artist_names: List[str],
+    artist_infos: List[Dict]
 ) -> pd.DataFrame:
     """
-    Query for specific artists. Finds top query for each artists in
-    artist_names list, then returns a DataFrame containing important
-    artist info.
+    Converts artist search results into a DataFrame of artist info.
 
     Parameters:
-        search_header (Dict[str, str]): Search header for Spotify API.
-        artist_names (List[str]): List of artist names.
+        artist_names (List[str]): List of artist names that were searched.
+        artist_infos (List[Dict]): Top search result (artist dict from the
+            Spotify API) for each artist name.
 
     Returns:
         pd.DataFrame: DataFrame with artist information. Columns:
@@ -166,44 +190,30 @@ def search_for_artists(
             Artist Image url - str
     """
 
-    # If a single artist name is entered as a string, convert it to list
-    if isinstance(artist_names, str):
-        artist_names = [artist_names]
-
     # Initialize lists to store artist information
+    genre_vocab = get_default_genre_vocabulary()
     name = []
     all_genres = []
     popularity = []
     uri = []
     img_url = []
 
-    # Establish search url for artist querying
-    search_url = "https://api.spotify.com/v1/search"
-
-    # Loop through every artist name to get all artists' info
-    for artist_name in artist_names:
-        # Build API query and make the API request
-        # Note: This query can be modified to instead search
-        # for songs, playlists, etc.
-        query = f"?q={artist_name}&type=artist&limit=1"
-        response = requests.get(
-            search_url + query,
-            headers=search_header
-        )
-        artist_info = json.loads(response.content)["artists"]["items"][0]
-
-        # Prints a warning if result of query isn't exactly
-        # what was searched (ex: Tiesto vs Tiësto)
+    for artist_name, artist_info in zip(artist_names, artist_infos):
+        # Prints a warning if result of query is only a close match of
+        # what was searched (ex: Kaskde vs Kaskade). Spelling variants that
+        # fold to the same name (ex: Tiesto vs Tiësto) aren't warned about.
         name_query_result = artist_info['name']
-        if name_query_result.upper() != artist_name.upper():
+        folded_result = fold_artist_name(name_query_result)
+        if folded_result != fold_artist_name(artist_name):
             print(
                 f"Warning: Searching for {artist_name} "
                 f"yielded result {name_query_result}."
             )
 
-        # Extract artist genres and convert to preferred capitalization format
-        genres = artist_info['genres']
-        genres_capitalized = [capitalize_genre(genre) for genre in genres]
+        # Extract artist genres and convert to preferred capitalization
+        # format (capitalized once per genre). Kept with their genre IDs,
+        # so genres are never re-encoded (see genre_vocab.GenreList).
+        genres_capitalized = genre_vocab.genre_list(artist_info['genres'])
 
         # Extract and append artist information to lists
         name.append(name_query_result)
@@ -229,40 +239,493 @@ def search_for_artists(
     return df_artists
 
 
-def retry_spotify_request(func, *args):
+def search_for_artists(
+    search_header: Dict[str, str],
+    artist_names: List[str],
+    cache: SpotifyCache=None,
+    rate_limiter: RateLimiter=None,
+    retry_engine: RetryEngine=None,
+    index: ArtistResolutionIndex=None
+) -> pd.DataFrame:
+    """
+    Query for specific artists. Finds the best matching artist for each
+    artist in artist_names list, then returns a DataFrame containing
+    important artist info. Artists whose search fails or yields no close
+    match are skipped (with a printed warning).
+
+    Parameters:
+        search_header (Dict[str, str]): Search header for Spotify API.
+        artist_names (List[str]): List of artist names.
+        cache (SpotifyCache, optional): Cache of Spotify API responses.
+            See resolve_artists.
+        rate_limiter (RateLimiter, optional): Limiter shared between workers.
+        retry_engine (RetryEngine, optional): Engine used to retry searches.
+        index (ArtistResolutionIndex, optional): Index of previously
+            resolved artist names. See resolve_artists.
+
+    Returns:
+        pd.DataFrame: DataFrame with artist information. See
+            create_df_artists for columns.
+    """
+
+    # If a single artist name is entered as a string, convert it to list
+    if isinstance(artist_names, str):
+        artist_names = [artist_names]
+
+    artist_infos = resolve_artists(
+        search_header,
+        artist_names,
+        cache,
+        rate_limiter,
+        retry_engine,
+        index
+    )
+    found_names = [name for name in artist_names if name in artist_infos]
+
+    return create_df_artists(
+        found_names,
+        [artist_infos[artist_name] for artist_name in found_names]
+    )
+
+
+def resolve_artists(
+    search_header: Dict[str, str],
+    artist_names: List[str],
+    cache: SpotifyCache=None,
+    rate_limiter: RateLimiter=None,
+    retry_engine: RetryEngine=None,
+    index: ArtistResolutionIndex=None
+) -> Dict[str, Dict]:
     """
-    Helper function to retry a Spotify API request if a rate limit is reached.
+    Finds the best matching artist (artist dict from the Spotify API) for
+    each unique name in artist_names, scoring several search results per
+    name (see artist_index.choose_artist). Used by search_for_artists, and
+    directly when the same artists are shared by many DataFrames (ex:
+    festival batch mode), so that each name is only searched once. Artists
+    whose search fails or yields no close match are skipped (with a printed
+    warning).
+
+    Parameters:
+        search_header (Dict[str, str]): Search header for Spotify API.
+        artist_names (List[str]): List of artist names.
+        cache (SpotifyCache, optional): Cache of Spotify API responses.
+            Artists found in the cache are not searched again. Previously
+            searched artists whose cached info has expired are refreshed
+            in bulk by uri (see get_several_artists) instead of searched.
+        rate_limiter (RateLimiter, optional): Limiter shared between workers.
+        retry_engine (RetryEngine, optional): Engine used to retry searches.
+        index (ArtistResolutionIndex, optional): Index of previously
+            resolved artist names (folded, and learned aliases). Indexed
+            names are never searched again, only refreshed by uri (if not
+            fresh in the cache). Replaces the cache's search results.
+
+    Returns:
+        Dict[str, Dict]: Artist name -> artist info, for every artist found.
+    """
+
+    # Establish search url for artist querying
+    search_url = f"{get_spotify_api_url()}/search"
+
+    # Find artists resolved by previous searches: by folded name or alias
+    # in the index, else by the exact name in the cache
+    if index is not None:
+        resolved_artists = index.lookup(artist_names)
+    elif cache:
+        resolved_artists = cache.get_resolved_artists(artist_names)
+    else:
+        resolved_artists = {}
+
+    # Get genres and popularity of resolved artists from cache
+    known_artist_infos = (
+        cache.complete_artists(resolved_artists) if cache else {}
+    )
+
+    # Resolved artists whose genres or popularity have expired (or were
+    # never cached) are refreshed by uri 50 at a time
+    stale_artists = {
+        artist_name: artist
+        for artist_name, artist in resolved_artists.items()
+        if artist_name not in known_artist_infos
+    }
+    refreshed = get_several_artists(
+        search_header,
+        [artist["uri"] for artist in stale_artists.values()],
+        rate_limiter=rate_limiter,
+        retry_engine=retry_engine
+    )
+    refreshed_infos = {
+        artist_name: refreshed[artist["uri"].split(':')[-1]]
+        for artist_name, artist in stale_artists.items()
+        if artist["uri"].split(':')[-1] in refreshed
+    }
+    if refreshed_infos:
+        if cache:
+            cache.set_artists(
+                list(refreshed_infos),
+                list(refreshed_infos.values())
+            )
+        if index is not None:
+            index.update_artists(list(refreshed_infos.values()))
+    known_artist_infos.update(refreshed_infos)
+
+    def search_request(artist_name):
+        # Build API query (URL-encoded, ex: 'Mumford & Sons') and make the
+        # API request
+        # Note: This query can be modified to instead search
+        # for songs, playlists, etc.
+        # Retried only by the RetryEngine (see retry_spotify_request)
+        response = http_get(
+            search_url,
+            params={
+                "q": artist_name,
+                "type": "artist",
+                "limit": ARTIST_SEARCH_LIMIT,
+            },
+            headers=search_header,
+            retry=False
+        )
+        response.raise_for_status() # Raise HTTPError for retry engine
+        return json.loads(response.content)
+
+    # Loop through every artist name to get all artists' info
+    found_names = []
+    artist_infos = []
+    searched_infos = {}
+    searched_scores = {}
+    for artist_name in dict.fromkeys(artist_names):
+        if artist_name in known_artist_infos:
+            found_names.append(artist_name)
+            artist_infos.append(known_artist_infos[artist_name])
+            continue
+
+        outcome = retry_spotify_request(
+            search_request,
+            artist_name,
+            rate_limiter=rate_limiter,
+            retry_engine=retry_engine
+        )
+
+        # Edge case if search failed or returned no artists
+        if not outcome.ok or not outcome.value["artists"]["items"]:
+            print(f"Warning: No search result for {artist_name}. Skipping.")
+            continue
+
+        # Pick the closest match among the search results
+        artist_info, score = choose_artist(
+            artist_name,
+            outcome.value["artists"]["items"]
+        )
+        if artist_info is None:
+            print(f"Warning: No close match for {artist_name}. Skipping.")
+            continue
+
+        found_names.append(artist_name)
+        artist_infos.append(artist_info)
+        searched_infos[artist_name] = artist_info
+        searched_scores[artist_name] = score
+
+    # Save newly searched artists to cache and index
+    if cache and searched_infos:
+        cache.set_artists(
+            list(searched_infos),
+            list(searched_infos.values())
+        )
+    if index is not None and searched_infos:
+        index.learn(searched_infos, searched_scores)
+
+    return dict(zip(found_names, artist_infos))
+
+
+def get_several_artists(
+    search_header: Dict[str, str],
+    artist_uris: List[str],
+    batch_size: int=50,
+    rate_limiter: RateLimiter=None,
+    retry_engine: RetryEngine=None
+) -> Dict[str, Dict]:
+    """
+    Gets up-to-date info (popularity, genres, images) for artists whose
+    uris are already known, using the several-artists endpoint.
+
+    Parameters:
+        search_header (Dict[str, str]): Search header for Spotify API.
+        artist_uris (List[str]): List of artist uris or IDs.
+        batch_size (int, optional): Number of artists per request. The
+            several-artists endpoint accepts at most 50 IDs per call.
+        rate_limiter (RateLimiter, optional): Limiter shared between workers.
+        retry_engine (RetryEngine, optional): Engine used to retry requests.
+
+    Returns:
+        Dict[str, Dict]: Artist ID -> artist dict (same format as an artist
+            search result). Artists that couldn't be fetched are left out.
+    """
+
+    # Establish url for getting several artists at once
+    artists_url = f"{get_spotify_api_url()}/artists"
+
+    def artists_request(batch_ids):
+        # Retried only by the RetryEngine (see retry_spotify_request)
+        response = http_get(
+            artists_url,
+            params={"ids": ",".join(batch_ids)},
+            headers=search_header,
+            retry=False
+        )
+        response.raise_for_status() # Raise HTTPError for retry engine
+        return json.loads(response.content)
+
+    # Drop duplicates while preserving order, keeping only the artist ID
+    artist_ids = list(dict.fromkeys(uri.split(':')[-1] for uri in artist_uris))
+
+    artist_infos = {}
+    for i in range(0, len(artist_ids), batch_size):
+        outcome = retry_spotify_request(
+            artists_request,
+            artist_ids[i : i + batch_size],
+            rate_limiter=rate_limiter,
+            retry_engine=retry_engine
+        )
+        if outcome.ok:
+            for artist_info in outcome.value["artists"]:
+                if artist_info: # None for unknown IDs
+                    artist_infos[artist_info["id"]] = artist_info
+
+    return artist_infos
+
+
+def refresh_artists(
+    search_header: Dict[str, str],
+    df_artists: pd.DataFrame,
+    rate_limiter: RateLimiter=None,
+    retry_engine: RetryEngine=None
+) -> pd.DataFrame:
+    """
+    Refreshes popularity, genres and image url of artists with known uris
+    (ex: df_artists saved by a previous run), without searching by name.
+
+    Parameters:
+        search_header (Dict[str, str]): Search header for Spotify API.
+        df_artists (pd.DataFrame): DataFrame containing artist info.
+        rate_limiter (RateLimiter, optional): Limiter shared between workers.
+        retry_engine (RetryEngine, optional): Engine used to retry requests.
+
+    Returns:
+        pd.DataFrame: Copy of df_artists with refreshed artist info. Rows of
+            artists that couldn't be fetched are left unchanged.
+    """
+
+    artist_infos = get_several_artists(
+        search_header,
+        df_artists['Artist uri'].tolist(),
+        rate_limiter=rate_limiter,
+        retry_engine=retry_engine
+    )
+
+    # Only refresh rows of artists that were fetched
+    is_refreshed = df_artists['Artist uri'].isin(list(artist_infos))
+    refreshed_uris = df_artists.loc[is_refreshed, 'Artist uri']
+    df_refreshed = create_df_artists(
+        df_artists.loc[is_refreshed, 'Artist'].tolist(),
+        [artist_infos[uri] for uri in refreshed_uris]
+    )
+    df_refreshed.index = df_artists.index[is_refreshed]
+
+    df_artists = df_artists.copy()
+    df_artists.loc[is_refreshed, df_refreshed.columns] = df_refreshed
+
+    return df_artists
+
+
+def retry_spotify_request(
+    func,
+    *args,
+    rate_limiter: RateLimiter=None,
+    retry_engine: RetryEngine=None,
+    idempotent: bool=True,
+    **kwargs
+) -> RequestOutcome:
+    """
+    Helper function to make a Spotify API request, retrying it if a rate
+    limit is reached or on transient errors (see RetryEngine).
 
     Parameters:
         func: Spotify API function to be retried.
         *args: Variable arguments for the function.
+        rate_limiter (RateLimiter, optional): Limiter shared between workers.
+            If given, a token is taken before every request and a 429 pauses
+            every worker using this limiter.
+        retry_engine (RetryEngine, optional): Engine used to retry the
+            request. Defaults to DEFAULT_RETRY_ENGINE.
+        idempotent (bool): Flag indicating whether the request can be
+            repeated without side effects. Pass False for playlist writes,
+            which are then only retried after a 429 or a failed connection
+            (see RetryEngine.call).
+        **kwargs: Keyword arguments for the function.
 
     Returns:
-        Any: Result of the successful API request or None if unsuccessful.
+        RequestOutcome: Outcome of the request. outcome.value holds the
+            result of the API request if outcome.ok.
     """
-    try:
-        return func(*args)
-    
-    except SpotifyException as e:
-        if e.http_status == 429:
-            # Rate limit reached, wait for Retry-After seconds
-            retry_after = int(e.headers.get('Retry-After', 10))
-            print(f"Rate limit reached. Waiting for {retry_after} seconds.")
-            time.sleep(retry_after)
-            
-            # Retry the request
-            return retry_spotify_request(func, *args)
-        
-        else:
-            # If some other SpotifyException error, print error
-            print(f"SpotifyException: {e}")
-            return None
 
-        
+    engine = retry_engine or DEFAULT_RETRY_ENGINE
+    outcome = engine.call(
+        func,
+        *args,
+        rate_limiter=rate_limiter,
+        idempotent=idempotent,
+        **kwargs
+    )
+
+    # If request failed, print error
+    if not outcome.ok:
+        print(f"Spotify request failed: {outcome} {outcome.error or ''}")
+
+    return outcome
+
+
+def retry_spotify_request_or_raise(func, *args, **kwargs) -> Any:
+    """
+    Same as retry_spotify_request, but returns the result of the request
+    and raises a SpotifyException if it fails. Used for playlist requests,
+    where skipping a failed request would leave the playlist incomplete.
+
+    Parameters:
+        func: Spotify API function to be retried.
+        *args: Variable arguments for the function.
+        **kwargs: Keyword arguments for the function.
+
+    Returns:
+        Any: Result of the API request.
+    """
+
+    outcome = retry_spotify_request(func, *args, **kwargs)
+    if not outcome.ok:
+        raise SpotifyException(
+            outcome.status or -1,
+            -1,
+            f"{outcome.reason}: {outcome.error or ''}"
+        )
+
+    return outcome.value
+
+
+def map_spotify_requests(
+    func: Callable,
+    args_list: List[Any],
+    max_workers: int=1,
+    rate_limiter: RateLimiter=None,
+    retry_engine: RetryEngine=None
+) -> List[Any]:
+    """
+    Calls a Spotify API function once per argument (with retries), either
+    sequentially or in a thread pool. Results are always returned in the
+    same order as args_list, regardless of which request finishes first.
+
+    Parameters:
+        func: Spotify API function, ex: spot.artist_top_tracks.
+        args_list (List[Any]): One argument per request.
+        max_workers (int, optional): Number of worker threads. 1 runs every
+            request sequentially on the calling thread.
+        rate_limiter (RateLimiter, optional): Limiter shared by all workers.
+            A default one is created if max_workers > 1 and none is given.
+        retry_engine (RetryEngine, optional): Engine used to retry requests.
+
+    Returns:
+        List[Any]: Results of each request (None for failed requests).
+    """
+
+    def request(arg):
+        return retry_spotify_request(
+            func,
+            arg,
+            rate_limiter=rate_limiter,
+            retry_engine=retry_engine
+        ).value
+
+    if max_workers <= 1:
+        return [request(arg) for arg in args_list]
+
+    # All workers share one token bucket and one 429 cooldown
+    if rate_limiter is None:
+        rate_limiter = RateLimiter()
+
+    # executor.map yields results in input order, keeping df rows deterministic
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(request, args_list))
+
+
+def map_cached_spotify_requests(
+    func: Callable,
+    keys: List[str],
+    cache: SpotifyCache=None,
+    kind: str=None,
+    max_workers: int=1,
+    rate_limiter: RateLimiter=None,
+    retry_engine: RetryEngine=None
+) -> List[Any]:
+    """
+    Same as map_spotify_requests (one request per key), but responses
+    already in the cache are not requested again. New successful responses
+    are saved to the cache.
+
+    Parameters:
+        func: Spotify API function, ex: spot.artist_top_tracks.
+        keys (List[str]): One argument (artist or track uri) per request.
+        cache (SpotifyCache, optional): Cache of Spotify API responses. If
+            None, this is the same as map_spotify_requests.
+        kind (str, optional): Kind of cached response, ex:
+            "artist_top_tracks". See spotify_cache.DEFAULT_TTLS.
+        max_workers (int, optional): Number of worker threads.
+        rate_limiter (RateLimiter, optional): Limiter shared by all workers.
+        retry_engine (RetryEngine, optional): Engine used to retry requests.
+
+    Returns:
+        List[Any]: Responses for each key (None for failed requests).
+    """
+
+    if cache is None:
+        return map_spotify_requests(
+            func,
+            keys,
+            max_workers,
+            rate_limiter,
+            retry_engine
+        )
+
+    # Only request keys that aren't in the cache (or have expired)
+    cached = cache.get_many(kind, keys)
+    missing_keys = list(dict.fromkeys(
+        key for key in keys if key not in cached
+    ))
+    responses = map_spotify_requests(
+        func,
+        missing_keys,
+        max_workers,
+        rate_limiter,
+        retry_engine
+    )
+
+    # Save new successful responses to cache
+    fetched = {
+        key: response
+        for key, response in zip(missing_keys, responses)
+        if response is not None
+    }
+    cache.set_many(kind, fetched)
+
+    return [cached.get(key, fetched.get(key)) for key in keys]
+
+
 def recommend_artists(
     spot: Spotify,
     df_artists: pd.DataFrame,
-    num_recs: int=3
+    num_recs: int=3,
+    max_workers: int=1,
+    rate_limiter: RateLimiter=None,
+    cache: SpotifyCache=None,
+    retry_engine: RetryEngine=None,
+    graph: ArtistGraphStore=None,
+    popularity_weight: float=0.0
 ) -> List[str]:
     """
     Recommends new artists based on artists related to those in df_artists.
@@ -276,6 +739,15 @@ def recommend_artists(
         df_artists: DataFrame. Can be df_songs or df_artists
             (df argument is used just to see unique playlist artists)
         num_recs: Number of recommended artists to return (default is 3)
+        max_workers: Number of threads making requests (default is 1)
+        rate_limiter: RateLimiter shared by all workers (optional)
+        cache: SpotifyCache of Spotify API responses (optional)
+        retry_engine: RetryEngine used to retry requests (optional)
+        graph: ArtistGraphStore of related artists (optional). If given,
+            only artists missing from the graph (or stale) are requested
+            and recommendations are computed from the stored graph.
+        popularity_weight: Weight given to recommended artists' popularity
+            when using a graph (default is 0, counts only)
 
     Returns:
         List[str]: List of recommended artist names.
@@ -285,15 +757,66 @@ def recommend_artists(
     may be useful.
     """
     
-    artist_counter = {}  # Empty counter dict
-
     # Iterate over each artist in the dataframe
     artist_uris = list(df_artists['Artist uri'].unique()) # Unique Artist URIs
-    for artist_uri in artist_uris:
-        artist_recs = retry_spotify_request(
+
+    # Request only artists missing from the graph, then use the stored graph
+    if graph is not None:
+        missing_uris = graph.missing(artist_uris)
+        missing_related = map_cached_spotify_requests(
             spot.artist_related_artists,
-            artist_uri
-        )['artists']
+            missing_uris,
+            cache,
+            "artist_related_artists",
+            max_workers,
+            rate_limiter,
+            retry_engine
+        )
+        graph.add_related(dict(zip(missing_uris, missing_related)))
+        return graph.recommend(
+            artist_uris,
+            df_artists['Artist'].unique(),
+            num_recs,
+            popularity_weight
+        )
+
+    all_related = map_cached_spotify_requests(
+        spot.artist_related_artists,
+        artist_uris,
+        cache,
+        "artist_related_artists",
+        max_workers,
+        rate_limiter,
+        retry_engine
+    )
+
+    return count_artist_recs(df_artists, all_related, num_recs)
+
+
+def count_artist_recs(
+    df_artists: pd.DataFrame,
+    all_related: List[Dict],
+    num_recs: int=3
+) -> List[str]:
+    """
+    Counts how often each artist appears among the related artists of every
+    artist in df_artists and returns the top recurring artist names.
+
+    Parameters:
+        df_artists: DataFrame. Can be df_songs or df_artists
+            (df argument is used just to see unique playlist artists)
+        all_related: artist_related_artists API response for each artist
+            (None for any failed request)
+        num_recs: Number of recommended artists to return (default is 3)
+
+    Returns:
+        List[str]: List of recommended artist names.
+    """
+
+    artist_counter = {}  # Empty counter dict
+
+    for related in all_related:
+        artist_recs = related['artists'] if related else None
         if artist_recs: # List of 20 artist dicts, if no requests error
             for rec in artist_recs:
                 artist_name = rec['name']
@@ -317,11 +840,92 @@ def recommend_artists(
     return top_artist_recs
 
 
+def get_audio_features(
+    spot: Spotify,
+    track_uris: List[str],
+    batch_size: int=100,
+    max_workers: int=1,
+    rate_limiter: RateLimiter=None,
+    cache: SpotifyCache=None,
+    retry_engine: RetryEngine=None
+) -> Dict[str, Dict]:
+    """
+    Fetches audio features for many tracks using as few API calls as
+    possible. Duplicate URIs (ex: collabs that show up under several artists)
+    are only requested once.
+
+    Parameters:
+        spot (Spotify): Authenticated Spotify instance.
+        track_uris (List[str]): List of track URIs or IDs.
+        batch_size (int, optional): Number of tracks per request. The
+            audio_features endpoint accepts at most 100 IDs per call.
+        max_workers (int, optional): Number of threads making requests.
+        rate_limiter (RateLimiter, optional): Limiter shared by all workers.
+        cache (SpotifyCache, optional): Cache of Spotify API responses.
+            Features never expire, so cached tracks are never re-requested.
+        retry_engine (RetryEngine, optional): Engine used to retry requests.
+
+    Returns:
+        Dict[str, Dict]: Track ID -> audio features dict (or None if Spotify
+            has no features for that track).
+    """
+
+    # Drop duplicates while preserving order, keeping only the track ID
+    track_ids = list(dict.fromkeys(uri.split(':')[-1] for uri in track_uris))
+
+    # Only request features of tracks that aren't in the cache
+    features_by_id = {}
+    if cache:
+        features_by_id = cache.get_many("audio_features", track_ids)
+        track_ids = [
+            track_id for track_id in track_ids
+            if track_id not in features_by_id
+        ]
+
+    # Request features in batches of (up to) 100 track IDs
+    id_batches = [
+        track_ids[i : i + batch_size]
+        for i in range(0, len(track_ids), batch_size)
+    ]
+    all_batch_features = map_spotify_requests(
+        spot.audio_features,
+        id_batches,
+        max_workers,
+        rate_limiter,
+        retry_engine
+    )
+
+    new_features_by_id = {}
+    for batch_ids, batch_features in zip(id_batches, all_batch_features):
+        if not batch_features: # Request error, features left as None
+            batch_features = [None] * len(batch_ids)
+        for track_id, features in zip(batch_ids, batch_features):
+            new_features_by_id[track_id] = features
+
+    # Save new features to cache (tracks without features are not saved)
+    if cache:
+        cache.set_many("audio_features", {
+            track_id: features
+            for track_id, features in new_features_by_id.items()
+            if features
+        })
+
+    features_by_id.update(new_features_by_id)
+
+    return features_by_id
+
+
 def get_top_tracks(
     spot: Spotify,
     df_artists: pd.DataFrame,
-    tracks_per_artist: int=10
-) -> pd.DataFrame:
+    tracks_per_artist: int=10,
+    batch_features: bool=True,
+    max_workers: int=1,
+    rate_limiter: RateLimiter=None,
+    cache: SpotifyCache=None,
+    retry_engine: RetryEngine=None,
+    as_store: bool=False
+) -> Union[pd.DataFrame, SongStore]:
     """
     Creates DataFrame containing rows of songs for selected artists.
 
@@ -330,16 +934,25 @@ def get_top_tracks(
         df_artists (pd.DataFrame): DataFrame containing artist info.
         tracks_per_artist (int, optional): Number of tracks per artist to
             include in playlist.
+        batch_features (bool, optional): If True, audio features for every
+            track across all artists are fetched together afterwards (100
+            per call). If False, features are fetched one track at a time.
+        max_workers (int, optional): Number of threads making requests.
+        rate_limiter (RateLimiter, optional): Limiter shared by all workers.
+        cache (SpotifyCache, optional): Cache of Spotify API responses.
+        retry_engine (RetryEngine, optional): Engine used to retry requests.
+        as_store (bool, optional): If True, return a normalized SongStore
+            (one row per artist, songs keyed by int artist key) instead.
 
     Returns:
         pd.DataFrame: DataFrame with song metadata. Columns:
             Song - str
             Artist - str
             Song Popularity - int (between 1-100)
-            Danceability - float (between 0-1)
-            Energy - float (between 0-1)
-            Tempo - float (beats per minute)
-            Speechiness - float (between 0-1)
+            Danceability - float32 (between 0-1)
+            Energy - float32 (between 0-1)
+            Tempo - float32 (beats per minute)
+            Speechiness - float32 (between 0-1)
             Song Duration - int (in ms)
             Artist Genres - List[str] (may be an empty list)
             Artist Popularity - int (between 1-100)
@@ -352,89 +965,69 @@ def get_top_tracks(
     get-audio-features
     """
 
-    # Initialize lists to store song/track and artist information
-
-    # Song/Track general info:
-    songs = []
-    song_popularities = []
-    song_durations = []
-    song_uris = []
+    # All workers share one rate limiter, including the features requests
+    if max_workers > 1 and rate_limiter is None:
+        rate_limiter = RateLimiter()
+
+    # Get top tracks for every artist (results are in df_artists row order)
+    all_top_tracks = map_cached_spotify_requests(
+        spot.artist_top_tracks,
+        df_artists['Artist uri'].tolist(),
+        cache,
+        "artist_top_tracks",
+        max_workers,
+        rate_limiter,
+        retry_engine
+    )
 
-    # Song/track features:
-    danceabilities = []
-    energies = []
-    tempos = []
-    speechinesses = []
-
-    # Artist info
-    artists = []
-    artist_genres = []
-    artist_popularities = []
-    artist_uris = []
-    artist_img_url  = []
-
-    # Iterate through each artist in the DataFrame
-    for i, row in df_artists.iterrows():
-        top_tracks = retry_spotify_request(
-            spot.artist_top_tracks,
-            row['Artist uri']
-        )['tracks']
-
-        for track in top_tracks[:tracks_per_artist]:
-            # Append track info
-            songs.append(track['name'])
-            song_popularities.append(track['popularity'])
-            song_durations.append(track['duration_ms'])
-            song_uris.append(track['uri'].split(':')[-1])
-
-            # Append artist info for each song row
-            artists.append(row['Artist'])
-            artist_genres.append(row['Artist Genres'])
-            artist_popularities.append(row['Artist Popularity'])
-            artist_uris.append(row['Artist uri'])
-            artist_img_url.append(row['Artist Image url'])
-
-            # Ensure there are track features, otherwise append None
-            features = retry_spotify_request(
-                spot.audio_features,
-                track['uri']
-            )[0]
-            if features: # Append track features
-                danceabilities.append(features['danceability'])
-                energies.append(features['energy'])
-                tempos.append(features['tempo'])
-                speechinesses.append(features['speechiness'])
-                
-            # Edge case if artist query yields non-music page.
-            # Ex: If user misspells an artist name and the search result is
-            # "Air Conditioner Sounds"
-            else: # No track features to append. Append None for that row.
-                danceabilities.append(None)
-                energies.append(None)
-                tempos.append(None)
-                speechinesses.append(None)
+    # Edge case if top tracks request failed for an artist
+    for artist, top_tracks in zip(df_artists['Artist'], all_top_tracks):
+        if top_tracks is None:
+            print(f"Warning: Couldn't get top tracks for {artist}. Skipping.")
+
+    # Get track features, either all at once or one request per track
+    song_uris = [
+        track['uri'].split(':')[-1]
+        for top_tracks in all_top_tracks if top_tracks
+        for track in top_tracks['tracks'][:tracks_per_artist]
+    ]
+    if batch_features:
+        features_by_id = get_audio_features(
+            spot,
+            song_uris,
+            max_workers=max_workers,
+            rate_limiter=rate_limiter,
+            cache=cache,
+            retry_engine=retry_engine
+        )
+    else:
+        all_features = map_spotify_requests(
+            spot.audio_features,
+            song_uris,
+            max_workers,
+            rate_limiter,
+            retry_engine
+        )
+        features_by_id = {
+            song_uri: features[0] if features else None
+            for song_uri, features in zip(song_uris, all_features)
+        }
+
+    song_store = SongStore.from_top_tracks(
+        df_artists,
+        all_top_tracks,
+        features_by_id,
+        tracks_per_artist
+    )
 
-    # Create DataFrame from collected information
-    df_songs = pd.DataFrame({
-        'Song': songs,
-        'Artist': artists,
-        'Song Popularity': song_popularities,
-        'Danceability': danceabilities,
-        'Energy': energies,
-        'Tempo': tempos,
-        'Speechiness': speechinesses,
-        'Song Duration': song_durations,
-        'Artist Genres': artist_genres,
-        'Artist Popularity': artist_popularities,
-        'Artist uri': artist_uris,
-        'Song uri': song_uris,
-        'Artist Image url': artist_img_url,
-    })
-    
-    return df_songs
+    return song_store if as_store else song_store.to_df_songs()
 
 
-def create_playlist(playlist_name: str, spot: Spotify, df_songs: pd.DataFrame):
+def create_playlist(
+    playlist_name: str,
+    spot: Spotify,
+    df_songs: pd.DataFrame
+) -> str:
     """
     Creates a new Spotify playlist and adds songs to it from DataFrame.
 
@@ -444,18 +1037,20 @@ def create_playlist(playlist_name: str, spot: Spotify, df_songs: pd.DataFrame):
         df_songs (pd.DataFrame): DataFrame with song metadata.
 
     Returns:
-        None
+        str: Playlist ID.
     """
 
     # Get the user's Spotify ID
     user = os.getenv("SPOTIFY_USER")
 
     # Create a new playlist and get playlist URI
-    playlist = spot.user_playlist_create(
+    playlist = retry_spotify_request_or_raise(
+        spot.user_playlist_create,
         user=user,
         name=playlist_name,
         public=True,
-        description='Created using Spotipy.'
+        description='Created using Spotipy.',
+        idempotent=False
     )
     playlist_uri = playlist['uri']
 
@@ -467,4 +1062,324 @@ def create_playlist(playlist_name: str, spot: Spotify, df_songs: pd.DataFrame):
     batch_size = 100
     for i in range(0, len(song_uris), batch_size):
         batch_uris = song_uris[i : i + batch_size]
-        spot.playlist_add_items(playlist_uri, batch_uris)
+        retry_spotify_request_or_raise(
+            spot.playlist_add_items, playlist_uri, batch_uris,
+            idempotent=False
+        )
+
+    return playlist['id']
+
+
+def create_playlist_streaming(
+    playlist_name: str,
+    spot: Spotify,
+    song_uri_chunks: Iterable[List[str]]
+) -> str:
+    """
+    Creates a new Spotify playlist and adds songs to it as they arrive, in
+    batches of 100 as soon as each batch fills, so the first songs are
+    uploaded before the rest are fetched.
+
+    Parameters:
+        playlist_name (str): Name of the new playlist.
+        spot (Spotify): Authenticated Spotify instance.
+        song_uri_chunks (Iterable[List[str]]): Song URIs, in any number of
+            chunks (ex: a generator yielding each artist's songs).
+
+    Returns:
+        str: Playlist ID.
+    """
+
+    # Create a new playlist and get playlist URI
+    playlist = retry_spotify_request_or_raise(
+        spot.user_playlist_create,
+        user=os.getenv("SPOTIFY_USER"),
+        name=playlist_name,
+        public=True,
+        description='Created using Spotipy.',
+        idempotent=False
+    )
+    playlist_uri = playlist['uri']
+
+    # Add songs in batches of 100 as soon as each batch fills.
+    # Note: playlist_add_items() method can only pass 100 songs per call
+    batch_size = 100
+    pending_uris = []
+    for song_uris in song_uri_chunks:
+        pending_uris += song_uris
+        while len(pending_uris) >= batch_size:
+            retry_spotify_request_or_raise(
+                spot.playlist_add_items,
+                playlist_uri,
+                pending_uris[:batch_size],
+                idempotent=False
+            )
+            del pending_uris[:batch_size]
+
+    # Add the last, partial batch
+    if pending_uris:
+        retry_spotify_request_or_raise(
+            spot.playlist_add_items, playlist_uri, pending_uris,
+            idempotent=False
+        )
+
+    return playlist['id']
+
+
+def find_playlist(spot: Spotify, playlist: str) -> str:
+    """
+    Finds one of the user's playlists by ID, URI, URL or name.
+
+    Parameters:
+        spot (Spotify): Authenticated Spotify instance.
+        playlist (str): Playlist ID, URI, URL or name.
+
+    Returns:
+        str: Playlist ID, or None if no playlist was found.
+    """
+
+    # Playlist URI or URL
+    if playlist.startswith("spotify:playlist:"):
+        return playlist.split(":")[-1]
+    if "open.spotify.com/playlist/" in playlist:
+        return playlist.split("/playlist/")[-1].split("?")[0]
+
+    # Look for a playlist with this name (or ID) owned by the user
+    user = os.getenv("SPOTIFY_USER")
+    results = retry_spotify_request_or_raise(
+        spot.current_user_playlists, limit=50
+    )
+    while results:
+        for item in results['items']:
+            owned = user is None or item['owner']['id'] == user
+            if owned and playlist in (item['name'], item['id']):
+                return item['id']
+        results = (
+            retry_spotify_request_or_raise(spot.next, results)
+            if results['next'] else None
+        )
+
+    return None
+
+
+def get_playlist_song_uris(spot: Spotify, playlist_id: str) -> List[str]:
+    """
+    Gets the songs currently in a playlist, reading every page of items.
+
+    Parameters:
+        spot (Spotify): Authenticated Spotify instance.
+        playlist_id (str): Playlist ID.
+
+    Returns:
+        List[str]: Song uris (IDs) in playlist order. None for any item that
+            isn't a Spotify track (ex: unavailable track or local file).
+    """
+
+    song_uris = []
+    results = retry_spotify_request_or_raise(
+        spot.playlist_items,
+        playlist_id,
+        fields="items(is_local,track(uri,type)),next",
+        limit=100
+    )
+    while results:
+        for item in results['items']:
+            track = item['track']
+            if item.get('is_local') or not track or track['type'] != 'track':
+                song_uris.append(None)
+            else:
+                song_uris.append(track['uri'].split(':')[-1])
+        results = (
+            retry_spotify_request_or_raise(spot.next, results)
+            if results['next'] else None
+        )
+
+    return song_uris
+
+
+def plan_playlist_moves(
+    current_keys: List[Any],
+    target_keys: List[Any]
+) -> List[Tuple[int, int]]:
+    """
+    Plans the fewest single-item moves that reorder current_keys into
+    target_keys (same items, different order). Items in the longest
+    subsequence already in target order stay; every other item is moved
+    once, right after the item that precedes it in target_keys.
+
+    Parameters:
+        current_keys (List[Any]): Unique item keys in current order.
+        target_keys (List[Any]): The same keys in target order.
+
+    Returns:
+        List[Tuple[int, int]]: (range_start, insert_before) for each move,
+            as expected by Spotify's reorder endpoint, in the order the
+            moves must be made.
+    """
+
+    # Longest increasing subsequence of target positions (patience sort)
+    target_pos = {key: i for i, key in enumerate(target_keys)}
+    positions = [target_pos[key] for key in current_keys]
+    tails, tail_idx, prev_idx = [], [], [None] * len(positions)
+    for i, pos in enumerate(positions):
+        j = bisect.bisect_left(tails, pos)
+        prev_idx[i] = tail_idx[j - 1] if j else None
+        if j == len(tails):
+            tails.append(pos)
+            tail_idx.append(i)
+        else:
+            tails[j] = pos
+            tail_idx[j] = i
+    in_order = set()
+    i = tail_idx[-1] if tail_idx else None
+    while i is not None:
+        in_order.add(current_keys[i])
+        i = prev_idx[i]
+
+    # Move every other item after its predecessor, in target order. Items
+    # already placed are in target order, so each item is moved only once.
+    moves = []
+    keys = list(current_keys)
+    for i, key in enumerate(target_keys):
+        if key in in_order:
+            continue
+        range_start = keys.index(key)
+        insert_before = keys.index(target_keys[i - 1]) + 1 if i else 0
+        if range_start != insert_before: # Else already after predecessor
+            moves.append((range_start, insert_before))
+            keys.pop(range_start)
+            if range_start < insert_before:
+                insert_before -= 1
+            keys.insert(insert_before, key)
+
+    return moves
+
+
+def sync_playlist(
+    playlist: str,
+    spot: Spotify,
+    df_songs: pd.DataFrame,
+    playlist_name: str = None
+) -> str:
+    """
+    Updates an existing Spotify playlist to match df_songs, sending only the
+    needed remove, add and reorder requests. Each write is made against the
+    snapshot_id returned by the previous one. Creates a new playlist if no
+    playlist is found, and rewrites the whole playlist if that takes fewer
+    requests than the delta.
+
+    Parameters:
+        playlist (str): ID, URI, URL or name of the playlist to update.
+        spot (Spotify): Authenticated Spotify instance.
+        df_songs (pd.DataFrame): DataFrame with song metadata.
+        playlist_name (str, optional): Name for a new playlist, if none is
+            found. Defaults to playlist.
+
+    Returns:
+        str: Playlist ID.
+    """
+
+    batch_size = 100 # Max items per add/remove/replace call
+
+    playlist_id = find_playlist(spot, playlist)
+    if playlist_id is None:
+        print(f"Playlist '{playlist}' not found. Creating a new playlist.")
+        return create_playlist(playlist_name or playlist, spot, df_songs)
+
+    # Read current state of playlist
+    snapshot_id = retry_spotify_request_or_raise(
+        spot.playlist, playlist_id, fields="snapshot_id"
+    )['snapshot_id']
+    current_uris = get_playlist_song_uris(spot, playlist_id)
+    target_uris = df_songs['Song uri'].tolist()
+
+    # Remove songs not in df_songs. Songs that are in the playlist more
+    # times than in df_songs are removed and added back.
+    target_counts = Counter(target_uris)
+    current_counts = Counter(current_uris)
+    remove_uris = [
+        uri for uri in current_counts
+        if uri is not None and current_counts[uri] > target_counts[uri]
+    ]
+    remove_set = set(remove_uris)
+    remaining_uris = [uri for uri in current_uris if uri not in remove_set]
+
+    # Add missing songs at the end of playlist (in df_songs order)
+    remaining_counts = Counter(remaining_uris)
+    add_uris = []
+    for uri in target_uris:
+        if remaining_counts[uri]:
+            remaining_counts[uri] -= 1
+        else:
+            add_uris.append(uri)
+
+    # Reorder. Repeated songs are told apart by their occurrence number.
+    def occurrence_keys(uris):
+        seen = Counter()
+        keys = []
+        for uri in uris:
+            keys.append((uri, seen[uri]))
+            seen[uri] += 1
+        return keys
+    moves = plan_playlist_moves(
+        occurrence_keys(remaining_uris + add_uris),
+        occurrence_keys(target_uris)
+    )
+
+    # Rewrite the whole playlist if that takes fewer requests, or if it has
+    # items that can't be removed by uri (ex: local files)
+    num_delta_requests = (
+        -(-len(remove_uris) // batch_size)
+        + -(-len(add_uris) // batch_size)
+        + len(moves)
+    )
+    num_rewrite_requests = max(1, -(-len(target_uris) // batch_size))
+    if None in current_counts or num_delta_requests > num_rewrite_requests:
+        retry_spotify_request_or_raise(
+            spot.playlist_replace_items,
+            playlist_id,
+            target_uris[:batch_size]
+        )
+        for i in range(batch_size, len(target_uris), batch_size):
+            retry_spotify_request_or_raise(
+                spot.playlist_add_items,
+                playlist_id,
+                target_uris[i : i + batch_size],
+                idempotent=False
+            )
+        print(f"Rewrote playlist with {num_rewrite_requests} request(s).")
+        return playlist_id
+
+    # Delta requests are never replayed after they may have been applied
+    # (see RetryEngine.call): a replayed add or move can't be caught by the
+    # snapshot_id guard, and would add a batch twice or move songs again
+    for i in range(0, len(remove_uris), batch_size):
+        snapshot_id = retry_spotify_request_or_raise(
+            spot.playlist_remove_all_occurrences_of_items,
+            playlist_id,
+            remove_uris[i : i + batch_size],
+            snapshot_id=snapshot_id,
+            idempotent=False
+        )['snapshot_id']
+    for i in range(0, len(add_uris), batch_size):
+        snapshot_id = retry_spotify_request_or_raise(
+            spot.playlist_add_items,
+            playlist_id,
+            add_uris[i : i + batch_size],
+            idempotent=False
+        )['snapshot_id']
+    for range_start, insert_before in moves:
+        snapshot_id = retry_spotify_request_or_raise(
+            spot.playlist_reorder_items,
+            playlist_id,
+            range_start,
+            insert_before,
+            snapshot_id=snapshot_id,
+            idempotent=False
+        )['snapshot_id']
+
+    print(
+        f"Synced playlist: {len(remove_uris)} removed, {len(add_uris)} "
+        f"added, {len(moves)} moved ({num_delta_requests} request(s))."
+    )
+    return playlist_id
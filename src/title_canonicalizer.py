@@ -0,0 +1,309 @@
+###############################################################################
+#
+# This file contains TitleCanonicalizer, which maps song titles to a
+# canonical form so different versions of the same song (remixes, edits,
+# features, etc.) share one int key. Used by playlist_mods to keep only the
+# most popular version of each song:
+#   - canonicalize_many/canonicalize convert titles with one precompiled
+#      version pattern
+#   - encode converts a column of titles to int keys, canonicalizing each
+#      unique title only once (results are memoized across calls, up to
+#      max_memo_titles titles)
+#   - encode_songs converts (artist, title) pairs to int song keys. Bare
+#      titles are keyed per artist, so 'REMEDY' by Alesso and 'Remedy' by
+#      Matt Sassari stay separate songs. Versioned titles (remixes, features)
+#      join the bare song of the same title, since remixes are often listed
+#      under the remixer's top tracks
+#   - get_default_title_canonicalizer returns the instance shared by a run
+#
+# Ex: all of these map to the same key as 'Where You Are':
+#   'Where You Are - Kaskade Remix', 'Where You Are (Extended Mix)',
+#   'Where You Are [VIP]', 'where you are (feat. John Summit)',
+#   'Where You Are - Radio Edit', 'Where  You  Are'
+#
+###############################################################################
+
+import re
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# Words marking a bracketed part of a title as a version, ex: '(VIP)'
+_VERSION_WORDS = (
+    r"remix|mix(?:ed)?|edit|re-?edit|vip|version|remaster(?:ed)?|bootleg|flip|"
+    r"rework|dub|live|acoustic|instrumental|extended|radio|club|original|"
+    r"mashup|cover|sped up|slowed"
+)
+
+# Version parts of a lowercased, whitespace-collapsed title, combined and
+# compiled once into one pattern, so each title is scanned in one pass:
+_VERSION_PATTERN = re.compile("|".join([
+    # Bracketed features. Ex: '(feat. X)', '[ft. X]', '(with X)'
+    r"\s*[\(\[]\s*(?:feat\.?|ft\.?|featuring|with)\s[^\)\]]*[\)\]]",
+
+    # Bracketed versions. Ex: '(Extended Mix)', '[VIP]', '(2019 Remaster)'
+    rf"\s*[\(\[][^\)\]]*\b(?:{_VERSION_WORDS})\b[^\)\]]*[\)\]]",
+
+    # Unbracketed features, to the end. Ex: ' feat. X', ' ft. X'
+    r"\s+(?:feat\.?|ft\.?|featuring)\s.*$",
+
+    # Anything after ' - ' is a version. Ex: ' - Kaskade Remix'
+    r"\s+-\s+.*$",
+]))
+
+# Bits of a song key holding the canonical title key (see encode_songs)
+_TITLE_KEY_BITS = 32
+
+
+class TitleCanonicalizer:
+    """
+    Converts song titles to canonical titles and int keys. Keys are
+    assigned in order of first use and never change.
+    """
+
+    def __init__(self, max_memo_titles: int = 200_000) -> None:
+        """
+        Initializes the TitleCanonicalizer instance, with empty caches.
+
+        Parameters:
+            max_memo_titles (int): Max titles kept in the keys_by_title memo.
+                When full, the memo is cleared (keys stay the same, since
+                they come from keys_by_canonical).
+        """
+
+        self.max_memo_titles = max_memo_titles
+        self.keys_by_title = {} # Title -> (int key, is version) (memoized)
+        self.keys_by_canonical = {} # Canonical title -> int key
+        self.keys_by_artist = {} # Artist -> int key (from 1)
+        self.lock = Lock()
+
+
+    def canonicalize_versions(
+        self,
+        titles: pd.Series
+    ) -> Tuple[pd.Series, np.ndarray]:
+        """
+        Converts song titles to their canonical form (see module comment),
+        with vectorized string methods, and flags versioned titles.
+
+        Parameters:
+            titles (pd.Series): Song titles.
+
+        Returns:
+            pd.Series: Canonical titles.
+            np.ndarray: True for each title with a version part removed.
+                Ex: 'Sorry - Franky Rizardo Remix', 'Sorry (with Madonna)'
+        """
+
+        # Compatibility form (ex: full-width chars), lowercase, one space
+        folded = (
+            titles.fillna("").astype(str)
+            .str.normalize("NFKC")
+            .str.lower()
+            .str.replace(r"\s+", " ", regex=True)
+            .str.strip()
+        )
+
+        # Remove version parts
+        canonical = (
+            folded.str.replace(_VERSION_PATTERN, "", regex=True).str.strip()
+        )
+
+        # Edge case if the whole title is a version. Ex: '(Intro Edit)'
+        canonical = canonical.where(canonical.str.len() > 0, folded)
+
+        return canonical, (canonical != folded).to_numpy(dtype=bool)
+
+
+    def canonicalize_many(self, titles: pd.Series) -> pd.Series:
+        """
+        Converts song titles to their canonical form (see module comment).
+
+        Parameters:
+            titles (pd.Series): Song titles.
+
+        Returns:
+            pd.Series: Canonical titles.
+        """
+        return self.canonicalize_versions(titles)[0]
+
+
+    def canonicalize(self, title: str) -> str:
+        """Converts one song title to its canonical form."""
+        return self.canonicalize_many(pd.Series([title])).iloc[0]
+
+
+    def encode_versions(
+        self,
+        titles: pd.Series
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Converts song titles to int keys (same key = same song) and flags
+        versioned titles. Only titles not in the memo are canonicalized.
+
+        Parameters:
+            titles (pd.Series): Song titles (ex: df_songs['Song']).
+
+        Returns:
+            np.ndarray: int64 key of each title.
+            np.ndarray: True for each versioned title (see
+                canonicalize_versions).
+        """
+
+        # Look up each unique title in the memo cache (-1 if new)
+        title_codes, unique_titles = pd.factorize(
+            titles, use_na_sentinel=False
+        )
+        unique_titles = np.asarray(unique_titles, dtype=object)
+        with self.lock:
+            get_entry = self.keys_by_title.get
+            unique_entries = np.array(
+                [get_entry(title, (-1, 0)) for title in unique_titles],
+                dtype=np.int64
+            ).reshape(-1, 2)
+            unique_keys = unique_entries[:, 0]
+            unique_is_version = unique_entries[:, 1].astype(bool)
+
+            # Canonicalize new titles, then assign a key to each new
+            # canonical title (once per canonical title, not per title)
+            is_new = unique_keys == -1
+            if is_new.any():
+                new_titles = unique_titles[is_new]
+                canonicals, new_is_version = self.canonicalize_versions(
+                    pd.Series(new_titles)
+                )
+                canonical_codes, canonicals = pd.factorize(canonicals)
+                add_key = self.keys_by_canonical.setdefault
+                canonical_keys = np.fromiter(
+                    (
+                        add_key(canonical, len(self.keys_by_canonical))
+                        for canonical in np.asarray(canonicals, dtype=object)
+                    ),
+                    dtype=np.int64,
+                    count=len(canonicals)
+                )
+                new_keys = canonical_keys[canonical_codes]
+
+                # Memoize new titles, starting over if the memo is full
+                if (
+                    len(self.keys_by_title) + len(new_titles)
+                    > self.max_memo_titles
+                ):
+                    self.keys_by_title.clear()
+                self.keys_by_title.update(zip(
+                    new_titles.tolist(),
+                    zip(new_keys.tolist(), new_is_version.tolist())
+                ))
+                unique_keys[is_new] = new_keys
+                unique_is_version[is_new] = new_is_version
+
+        return unique_keys[title_codes], unique_is_version[title_codes]
+
+
+    def encode(self, titles: pd.Series) -> np.ndarray:
+        """
+        Converts song titles to int keys (same key = same song). Only
+        titles not in the memo are canonicalized.
+
+        Parameters:
+            titles (pd.Series): Song titles (ex: df_songs['Song']).
+
+        Returns:
+            np.ndarray: int64 key of each title.
+        """
+        return self.encode_versions(titles)[0]
+
+
+    def encode_songs(
+        self,
+        artists: pd.Series,
+        titles: pd.Series,
+        bare_song_artists: Optional[Dict[int, List[int]]] = None
+    ) -> np.ndarray:
+        """
+        Converts songs to int keys (same key = versions of one song):
+            - A bare title is keyed by its artist and canonical title, so
+              'REMEDY' by Alesso and 'Remedy' by Matt Sassari get different
+              keys
+            - A versioned title (remix, feature, etc.) gets the key of the
+              bare song with the same canonical title, preferring one by the
+              same artist, else the first one (pass songs most popular
+              first to prefer the hit). If there is none, versions of the
+              title share a key across artists
+        Ex: 'Sorry (with Madonna)' by BLOND:ISH and 'Sorry (with Madonna) -
+        Franky Rizardo Remix' under Franky Rizardo get the same key.
+
+        Parameters:
+            artists (pd.Series): Artist of each song (ex: df_songs['Artist']).
+            titles (pd.Series): Song titles (ex: df_songs['Song']).
+            bare_song_artists (Optional[Dict[int, List[int]]]): Canonical
+                title key -> artist keys with a bare song of that title, in
+                order of first use. Updated with this call's songs; pass the
+                same dict to key songs against earlier calls' songs.
+
+        Returns:
+            np.ndarray: int64 key of each song (stable across calls).
+        """
+
+        if bare_song_artists is None:
+            bare_song_artists = {}
+
+        # Get title keys, then artist keys (0 is kept for "no artist")
+        title_keys, is_version = self.encode_versions(titles)
+        artist_codes, unique_artists = pd.factorize(
+            artists, use_na_sentinel=False
+        )
+        with self.lock:
+            add_key = self.keys_by_artist.setdefault
+            unique_artist_keys = np.fromiter(
+                (
+                    add_key(artist, len(self.keys_by_artist) + 1)
+                    for artist in np.asarray(unique_artists, dtype=object)
+                ),
+                dtype=np.int64,
+                count=len(unique_artists)
+            )
+        artist_keys = unique_artist_keys[artist_codes]
+        song_keys = (artist_keys << _TITLE_KEY_BITS) | title_keys
+
+        # Record the artists of bare songs, in row order
+        _, bare_songs = pd.factorize(song_keys[~is_version])
+        for song_key in bare_songs.tolist():
+            artist_key = song_key >> _TITLE_KEY_BITS
+            title_artists = bare_song_artists.setdefault(
+                song_key & ((1 << _TITLE_KEY_BITS) - 1), []
+            )
+            if artist_key not in title_artists:
+                title_artists.append(artist_key)
+
+        # Give each versioned song the key of its bare song
+        version_codes, version_songs = pd.factorize(song_keys[is_version])
+        version_keys = []
+        for song_key in version_songs.tolist():
+            artist_key = song_key >> _TITLE_KEY_BITS
+            title_key = song_key & ((1 << _TITLE_KEY_BITS) - 1)
+            title_artists = bare_song_artists.get(title_key, [0])
+            if artist_key not in title_artists:
+                artist_key = title_artists[0]
+            version_keys.append((artist_key << _TITLE_KEY_BITS) | title_key)
+        song_keys[is_version] = np.asarray(
+            version_keys, dtype=np.int64
+        )[version_codes]
+
+        return song_keys
+
+
+_default_title_canonicalizer = None
+
+
+def get_default_title_canonicalizer() -> TitleCanonicalizer:
+    """Returns the TitleCanonicalizer shared by the whole run, creating it
+    on first use."""
+
+    global _default_title_canonicalizer
+    if _default_title_canonicalizer is None:
+        _default_title_canonicalizer = TitleCanonicalizer()
+    return _default_title_canonicalizer
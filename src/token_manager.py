@@ -0,0 +1,245 @@
+import os
+import json
+import time
+import base64
+import asyncio
+import threading
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Union
+
+from spotipy import Spotify
+
+from http_transport import (
+    http_post, create_session, get_spotify_api_url,
+    get_spotify_accounts_url
+)
+
+
+class TokenManager:
+    """
+    Caches a Client Credentials Flow bearer token in memory (and optionally
+    on disk) and refreshes it proactively, shortly before it expires. Safe
+    to share between threads and event loops, so concurrent workers all
+    share one token.
+
+    Also implements Spotipy's auth manager interface (get_access_token), so
+    it can back a Spotify client for read-only endpoints (top tracks, audio
+    features, related artists) that don't need user authorization.
+    """
+
+    def __init__(
+        self,
+        client_id: str = None,
+        client_secret: str = None,
+        cache_path: str = None,
+        refresh_margin: float = 300.0,
+        token_url: str = None
+    ) -> None:
+        """
+        Initializes the TokenManager instance.
+
+        Parameters:
+            client_id (str, optional): Defaults to the SPOTIPY_CLIENT_ID
+                environment variable.
+            client_secret (str, optional): Defaults to the
+                SPOTIPY_CLIENT_SECRET environment variable.
+            cache_path (str, optional): JSON file to cache the token in, so
+                it can be reused across runs. Not cached on disk if None.
+            refresh_margin (float): Seconds before expiry to refresh token.
+            token_url (str, optional): Spotify API token url. Defaults to
+                the accounts service's /api/token.
+        """
+
+        self.client_id = client_id or os.getenv("SPOTIPY_CLIENT_ID")
+        self.client_secret = (
+            client_secret or os.getenv("SPOTIPY_CLIENT_SECRET")
+        )
+        self.cache_path = cache_path
+        self.refresh_margin = refresh_margin
+        self.token_url = (
+            token_url or f"{get_spotify_accounts_url()}/api/token"
+        )
+        self.token = None
+        self.expires_at = 0.0 # Unix time
+        self.lock = threading.Lock()
+
+        if cache_path:
+            self._load_cached_token()
+
+
+    def get_access_token(
+        self,
+        as_dict: bool = False
+    ) -> Union[str, Dict[str, Any]]:
+        """
+        Returns a valid access token, refreshing it first if it expires
+        within refresh_margin seconds.
+
+        Parameters:
+            as_dict (bool): Accepted for compatibility with Spotipy auth
+                managers. If True, returns a dict with token info instead.
+
+        Returns:
+            Union[str, Dict[str, Any]]: Access token, or a dict with
+                access_token and expires_at if as_dict.
+        """
+
+        # Fast path without the lock if the token is still fresh
+        if not self._needs_refresh():
+            token = self.token
+        else:
+            with self.lock:
+                # Another thread may have refreshed while this one waited
+                if self._needs_refresh():
+                    self._refresh()
+                token = self.token
+
+        if as_dict:
+            return {"access_token": token, "expires_at": self.expires_at}
+        return token
+
+
+    async def get_access_token_async(self) -> str:
+        """Awaitable get_access_token. Refreshes in a worker thread so the
+        event loop isn't blocked."""
+
+        if not self._needs_refresh():
+            return self.token
+        return await asyncio.to_thread(self.get_access_token)
+
+
+    def get_token_header(self) -> "TokenHeader":
+        """
+        Returns a search header for the Spotify API. The header always holds
+        the current token, so it can be kept for the whole run.
+        """
+        return TokenHeader(self)
+
+
+    def spotify_client(self) -> Spotify:
+        """
+        Returns a Spotify instance for read-only endpoints that uses this
+        token manager instead of the user's OAuth token.
+        """
+
+        # 429s are not retried inside Spotipy (see spotipy_utils.auth_flow)
+        spot = Spotify(auth_manager=self, requests_session=create_session())
+        spot.prefix = f"{get_spotify_api_url()}/"
+
+        return spot
+
+
+    def _needs_refresh(self) -> bool:
+        """True if there is no token or it expires within refresh_margin."""
+        return (
+            self.token is None
+            or time.time() >= self.expires_at - self.refresh_margin
+        )
+
+
+    def _refresh(self) -> None:
+        """Requests a new token. Must be called while holding the lock."""
+
+        # Create authorization string
+        auth_string = f"{self.client_id}:{self.client_secret}"
+        auth_bytes = auth_string.encode("utf-8")
+        auth_base64 = str(base64.b64encode(auth_bytes), "utf-8")
+
+        # Make post request to obtain token
+        response = http_post(
+            self.token_url,
+            headers={
+                "Authorization": "Basic " + auth_base64,
+                "Content-Type": "application/x-www-form-urlencoded"
+            },
+            data={"grant_type": "client_credentials"}
+        )
+        response.raise_for_status()
+
+        # Parse JSON response, keeping the token's expiry time
+        json_response = json.loads(response.content)
+        self.token = json_response["access_token"]
+        self.expires_at = time.time() + json_response.get("expires_in", 3600)
+
+        if self.cache_path:
+            self._save_cached_token()
+
+
+    def _load_cached_token(self) -> None:
+        """Loads a previously cached token from disk, if there is one."""
+
+        try:
+            with open(self.cache_path) as file:
+                cached = json.load(file)
+            if cached["client_id"] != self.client_id: # Other app's token
+                return
+            self.token = cached["access_token"]
+            self.expires_at = cached["expires_at"]
+        except (OSError, ValueError, KeyError):
+            pass # No usable cached token. A new one is requested when needed
+
+
+    def _save_cached_token(self) -> None:
+        """Saves the token to disk, readable by the current user only."""
+
+        cache_dir = os.path.dirname(self.cache_path)
+        if cache_dir and not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+
+        # Write to a temp file then replace, so readers never see half a file
+        temp_path = f"{self.cache_path}.tmp"
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as file:
+            json.dump(
+                {
+                    "client_id": self.client_id,
+                    "access_token": self.token,
+                    "expires_at": self.expires_at,
+                },
+                file
+            )
+        os.replace(temp_path, self.cache_path)
+
+
+class TokenHeader(Mapping):
+    """
+    Read-only dict of search header for the Spotify API. The Authorization
+    value is looked up from the TokenManager every time the header is used,
+    so a long-running job never sends an expired token.
+    """
+
+    def __init__(self, token_manager: TokenManager) -> None:
+        self.token_manager = token_manager
+
+
+    def __getitem__(self, key: str) -> str:
+        if key != "Authorization":
+            raise KeyError(key)
+        return "Bearer " + self.token_manager.get_access_token()
+
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(["Authorization"])
+
+
+    def __len__(self) -> int:
+        return 1
+
+
+# Token manager shared by everything in this process that needs a
+# Client Credentials Flow token (ex: get_token_header)
+_default_token_manager = None
+_default_lock = threading.Lock()
+
+
+def get_default_token_manager() -> TokenManager:
+    """Returns the shared TokenManager, creating it on first use. Its token
+    is cached on disk in output/cache/."""
+
+    global _default_token_manager
+    with _default_lock:
+        if _default_token_manager is None:
+            _default_token_manager = TokenManager(
+                cache_path="output/cache/spotify_token.json"
+            )
+        return _default_token_manager